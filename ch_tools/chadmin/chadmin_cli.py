@@ -1,13 +1,11 @@
 #!/usr/bin/env python3
 import warnings
 from datetime import timedelta
-from typing import Any, List
 
 import cloup
 from click import Context
 
 from ch_tools.chadmin.cli.chadmin_group import Chadmin
-from ch_tools.chadmin.cli.move_group import move_group
 from ch_tools.common.config import load_config
 from ch_tools.common.utils import update_by_key_path
 
@@ -19,40 +17,6 @@ warnings.filterwarnings(
 # pylint: disable=wrong-import-position
 
 from ch_tools import __version__
-from ch_tools.chadmin.cli.chs3_backup_group import chs3_backup_group
-from ch_tools.chadmin.cli.config_command import config_command
-from ch_tools.chadmin.cli.crash_log_group import crash_log_group
-from ch_tools.chadmin.cli.data_store_group import data_store_group
-from ch_tools.chadmin.cli.database_group import database_group
-from ch_tools.chadmin.cli.diagnostics_command import diagnostics_command
-from ch_tools.chadmin.cli.dictionary_group import dictionary_group
-from ch_tools.chadmin.cli.disk_group import disks_group
-from ch_tools.chadmin.cli.flamegraph_group import flamegraph_group
-from ch_tools.chadmin.cli.list_async_metrics_command import list_async_metrics_command
-from ch_tools.chadmin.cli.list_events_command import list_events_command
-from ch_tools.chadmin.cli.list_functions_command import list_functions_command
-from ch_tools.chadmin.cli.list_macros_command import list_macros_command
-from ch_tools.chadmin.cli.list_metrics_command import list_metrics_command
-from ch_tools.chadmin.cli.list_settings_command import list_settings_command
-from ch_tools.chadmin.cli.merge_group import merge_group
-from ch_tools.chadmin.cli.mutation_group import mutation_group
-from ch_tools.chadmin.cli.object_storage_group import object_storage_group
-from ch_tools.chadmin.cli.part_group import part_group
-from ch_tools.chadmin.cli.part_log_group import part_log_group
-from ch_tools.chadmin.cli.partition_group import partition_group
-from ch_tools.chadmin.cli.process_group import process_group
-from ch_tools.chadmin.cli.query_log_group import query_log_group
-from ch_tools.chadmin.cli.replica_group import replica_group
-from ch_tools.chadmin.cli.replicated_fetch_group import replicated_fetch_group
-from ch_tools.chadmin.cli.replication_queue_group import replication_queue_group
-from ch_tools.chadmin.cli.restore_replica_command import restore_replica_command
-from ch_tools.chadmin.cli.s3_credentials_config_group import s3_credentials_config_group
-from ch_tools.chadmin.cli.server_group import server_group
-from ch_tools.chadmin.cli.stack_trace_command import stack_trace_command
-from ch_tools.chadmin.cli.table_group import table_group
-from ch_tools.chadmin.cli.thread_log_group import thread_log_group
-from ch_tools.chadmin.cli.wait_group import wait_group
-from ch_tools.chadmin.cli.zookeeper_group import zookeeper_group
 from ch_tools.common.cli.context_settings import CONTEXT_SETTINGS
 from ch_tools.common.cli.locale_resolver import LocaleResolver
 from ch_tools.common.cli.parameters import TimeSpanParamType, YamlParamType
@@ -113,54 +77,54 @@ def cli(
     ctx.default_map = config["chadmin"]
 
 
-commands: List[Any] = [
-    config_command,
-    diagnostics_command,
-    data_store_group,
-    list_async_metrics_command,
-    list_events_command,
-    list_functions_command,
-    list_macros_command,
-    list_metrics_command,
-    list_settings_command,
-    restore_replica_command,
-    stack_trace_command,
-]
-
-groups: List[Any] = [
-    chs3_backup_group,
-    crash_log_group,
-    data_store_group,
-    database_group,
-    dictionary_group,
-    disks_group,
-    merge_group,
-    move_group,
-    mutation_group,
-    object_storage_group,
-    part_group,
-    part_log_group,
-    s3_credentials_config_group,
-    partition_group,
-    process_group,
-    query_log_group,
-    replicated_fetch_group,
-    replication_queue_group,
-    server_group,
-    table_group,
-    replica_group,
-    thread_log_group,
-    wait_group,
-    zookeeper_group,
-    flamegraph_group,
-]
+# Commands are loaded on demand to avoid importing dependencies of all commands on every run.
+commands = {
+    "config": "ch_tools.chadmin.cli.config_command:config_command",
+    "diagnostics": "ch_tools.chadmin.cli.diagnostics_command:diagnostics_command",
+    "async-metrics": "ch_tools.chadmin.cli.list_async_metrics_command:list_async_metrics_command",
+    "events": "ch_tools.chadmin.cli.list_events_command:list_events_command",
+    "functions": "ch_tools.chadmin.cli.list_functions_command:list_functions_command",
+    "macros": "ch_tools.chadmin.cli.list_macros_command:list_macros_command",
+    "metrics": "ch_tools.chadmin.cli.list_metrics_command:list_metrics_command",
+    "settings": "ch_tools.chadmin.cli.list_settings_command:list_settings_command",
+    "restore-replica": "ch_tools.chadmin.cli.restore_replica_command:restore_replica_command",
+    "stack-trace": "ch_tools.chadmin.cli.stack_trace_command:stack_trace_command",
+}
+
+groups = {
+    "chs3-backup": "ch_tools.chadmin.cli.chs3_backup_group:chs3_backup_group",
+    "crash-log": "ch_tools.chadmin.cli.crash_log_group:crash_log_group",
+    "data-store": "ch_tools.chadmin.cli.data_store_group:data_store_group",
+    "database": "ch_tools.chadmin.cli.database_group:database_group",
+    "dictionary": "ch_tools.chadmin.cli.dictionary_group:dictionary_group",
+    "disks": "ch_tools.chadmin.cli.disk_group:disks_group",
+    "merge": "ch_tools.chadmin.cli.merge_group:merge_group",
+    "move": "ch_tools.chadmin.cli.move_group:move_group",
+    "mutation": "ch_tools.chadmin.cli.mutation_group:mutation_group",
+    "object-storage": "ch_tools.chadmin.cli.object_storage_group:object_storage_group",
+    "part": "ch_tools.chadmin.cli.part_group:part_group",
+    "part-log": "ch_tools.chadmin.cli.part_log_group:part_log_group",
+    "s3-credentials-config": "ch_tools.chadmin.cli.s3_credentials_config_group:s3_credentials_config_group",
+    "partition": "ch_tools.chadmin.cli.partition_group:partition_group",
+    "process": "ch_tools.chadmin.cli.process_group:process_group",
+    "query-log": "ch_tools.chadmin.cli.query_log_group:query_log_group",
+    "replicated-fetch": "ch_tools.chadmin.cli.replicated_fetch_group:replicated_fetch_group",
+    "replication-queue": "ch_tools.chadmin.cli.replication_queue_group:replication_queue_group",
+    "server": "ch_tools.chadmin.cli.server_group:server_group",
+    "table": "ch_tools.chadmin.cli.table_group:table_group",
+    "replica": "ch_tools.chadmin.cli.replica_group:replica_group",
+    "thread-log": "ch_tools.chadmin.cli.thread_log_group:thread_log_group",
+    "wait": "ch_tools.chadmin.cli.wait_group:wait_group",
+    "zookeeper": "ch_tools.chadmin.cli.zookeeper_group:zookeeper_group",
+    "flamegraph": "ch_tools.chadmin.cli.flamegraph_group:flamegraph_group",
+}
 
 section = cloup.Section("Commands")
-for command in commands:
-    cli.add_command(command, section=section)
+for name, import_path in commands.items():
+    cli.add_lazy_command(name, import_path, section=section)
 section = cloup.Section("Groups")
-for group in groups:
-    cli.add_group(group, section=section)
+for name, import_path in groups.items():
+    cli.add_lazy_command(name, import_path, section=section)
 
 
 def main() -> None:
@@ -7,12 +7,13 @@ import cloup
 
 from ch_tools import __version__
 from ch_tools.common import logging
+from ch_tools.common.cli.lazy_group import LazyGroup
 from ch_tools.common.utils import get_full_command_name
 
 # pylint: disable=too-many-ancestors
 
 
-class Chadmin(cloup.Group):
+class Chadmin(LazyGroup):
     def add_command(
         self,
         cmd: click.Command,
@@ -56,6 +57,8 @@ class Chadmin(cloup.Group):
             except Exception:
                 logging.exception("Command failed with error:", short_stdout=True)
                 sys.exit(1)
+            finally:
+                _log_connection_stats(ctx)
 
         cmd.callback = wrapper
         super().add_command(
@@ -78,3 +81,23 @@ class Chadmin(cloup.Group):
             section=section,
             fallback_to_default_section=fallback_to_default_section,
         )
+
+    def add_loaded_command(
+        self, cmd: click.Command, name: str, section: Optional[cloup.Section]
+    ) -> None:
+        if isinstance(cmd, click.Group):
+            self.add_group(cmd, name=name, section=section)
+        else:
+            self.add_command(cmd, name=name, section=section)
+
+
+def _log_connection_stats(ctx: click.Context) -> None:
+    chcli = ctx.obj.get("chcli")
+    if chcli is not None:
+        logging.debug("ClickHouse connection stats: {}", chcli.get_connection_stats())
+
+    zk_request_stats = ctx.obj.get("zk_request_stats")
+    if zk_request_stats is not None:
+        # Printed to stdout in debug mode, otherwise only written to the log.
+        log = logging.info if ctx.obj.get("debug") else logging.debug
+        log("ZooKeeper request stats: {}", zk_request_stats)
@@ -19,6 +19,7 @@ from ch_tools.chadmin.internal.deduplicate import deduplicate
 from ch_tools.chadmin.internal.object_storage.orphaned_objects_state import (
     OrphanedObjectsState,
 )
+from ch_tools.chadmin.internal.object_storage.s3_cleanup import S3DeleteError
 from ch_tools.chadmin.internal.object_storage.s3_cleanup_stats import (
     ResultStat,
     StatisticsPeriod,
@@ -226,6 +227,9 @@ def clean_command(
             ignore_missing_cloud_storage_backups,
             stat_by_period,
         )
+    except S3DeleteError as e:
+        error_msg = str(e)
+        raise
     finally:
         total_size = result_stat.total["total_size"]
         state = OrphanedObjectsState(total_size, error_msg)
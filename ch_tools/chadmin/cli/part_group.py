@@ -1,5 +1,5 @@
 from collections import OrderedDict
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
 from click import Context
 from cloup import Choice, group, option, option_group, pass_context
@@ -134,6 +134,7 @@ def list_parts_command(
 
         return result
 
+    parts: Sequence[Mapping[str, Any]]
     if detached:
         parts = list_detached_parts(ctx, reason=reason, **kwargs)
     else:
@@ -424,6 +425,7 @@ def delete_parts_command(
     **kwargs: Any,
 ) -> None:
     """Delete one or several data parts."""
+    parts: Sequence[Mapping[str, Any]]
     if detached:
         parts = list_detached_parts(
             ctx,
@@ -1,3 +1,4 @@
+import asyncio
 import os
 import time
 from datetime import timedelta
@@ -39,6 +40,11 @@ from ch_tools.chadmin.internal.table_replica import list_table_replicas
 from ch_tools.chadmin.internal.utils import execute_query
 from ch_tools.common import logging
 from ch_tools.common.cli.parameters import TimeSpanParamType
+from ch_tools.common.clickhouse.client.async_client import (
+    AsyncClickhouseClient,
+    gather,
+)
+from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
 from ch_tools.common.clickhouse.client.error import ClickhouseError
 from ch_tools.common.commands.replication_lag import estimate_replication_lag
 from ch_tools.common.result import Result
@@ -141,6 +147,12 @@ def wait_group() -> None:
     default=10,
     help="Max backoff interval for sync query retry in seconds.",
 )
+@option(
+    "--workers",
+    type=int,
+    default=4,
+    help="Max number of replicas to sync simultaneously.",
+)
 @pass_context
 def wait_replication_sync_command(
     ctx: Context,
@@ -157,6 +169,7 @@ def wait_replication_sync_command(
     sync_query_max_retries: int,
     sync_query_max_backoff: int,
     sync_databases: bool,
+    workers: int,
 ) -> None:
     """Wait for ClickHouse server to sync replication with other replicas."""
     # Lightweight sync is added in 23.4
@@ -175,31 +188,36 @@ def wait_replication_sync_command(
     try:
         # Sync replicated databases
         if sync_databases:
-            for database in list_databases(ctx, engine_pattern="Replicated"):
-                query = f"SYSTEM SYNC DATABASE REPLICA `{database['database']}`"
-                sync_replica_with_retries(
-                    ctx,
-                    query,
-                    replica_timeout,
-                    deadline,
-                    sync_query_max_retries,
-                    sync_query_max_backoff,
-                )
+            sync_replicas_with_retries(
+                ctx,
+                [
+                    f"SYSTEM SYNC DATABASE REPLICA `{database['database']}`"
+                    for database in list_databases(ctx, engine_pattern="Replicated")
+                ],
+                workers,
+                replica_timeout,
+                deadline,
+                sync_query_max_retries,
+                sync_query_max_backoff,
+            )
 
         # Sync table replicas
+        queries = []
         for replica in list_table_replicas(ctx):
             full_name = f"`{replica['database']}`.`{replica['table']}`"
             query = f"SYSTEM SYNC REPLICA {full_name}"
             if lightweight:
                 query = f"{query} LIGHTWEIGHT"
-            sync_replica_with_retries(
-                ctx,
-                query,
-                replica_timeout,
-                deadline,
-                sync_query_max_retries,
-                sync_query_max_backoff,
-            )
+            queries.append(query)
+        sync_replicas_with_retries(
+            ctx,
+            queries,
+            workers,
+            replica_timeout,
+            deadline,
+            sync_query_max_retries,
+            sync_query_max_backoff,
+        )
 
     except requests.exceptions.ReadTimeout:
         raise ConnectionError("Read timeout while running query.")
@@ -537,6 +555,37 @@ def exit_if_pid_not_running(track_pid_file: str, pid_check_attempts: int) -> Non
     )
 
 
+def sync_replicas_with_retries(
+    ctx: Context,
+    queries: list[str],
+    workers: int,
+    replica_timeout: timedelta,
+    deadline: float,
+    max_retries: int,
+    max_backoff: int,
+) -> None:
+    """
+    Sync table or database replicas concurrently with up to `workers` queries in flight.
+    """
+
+    async def _sync() -> None:
+        with AsyncClickhouseClient(clickhouse_client(ctx), workers) as client:
+            await gather(
+                client.run(
+                    sync_replica_with_retries,
+                    ctx,
+                    query,
+                    replica_timeout,
+                    deadline,
+                    max_retries,
+                    max_backoff,
+                )
+                for query in queries
+            )
+
+    asyncio.run(_sync())
+
+
 def sync_replica_with_retries(
     ctx: Context,
     query: str,
@@ -1,6 +1,6 @@
 import re
 import sys
-from typing import Any, Generator, Optional
+from typing import Any, Generator, Optional, Tuple
 
 from cloup import (
     Choice,
@@ -24,11 +24,19 @@ from ch_tools.chadmin.internal.table_replica import (
     list_table_replicas,
 )
 from ch_tools.chadmin.internal.utils import chunked
-from ch_tools.chadmin.internal.zero_copy import generate_zero_copy_lock_tasks
+from ch_tools.chadmin.internal.zero_copy import (
+    ZeroCopyLockCreator,
+    ZeroCopyPartLocks,
+    generate_zero_copy_lock_tasks,
+    generate_zero_copy_part_locks,
+)
 from ch_tools.chadmin.internal.zookeeper import (
     check_zk_node,
     create_zk_nodes,
     delete_zk_nodes,
+    find_paths,
+    format_path,
+    get_walk_window,
     get_zk_node,
     get_zk_node_acls,
     list_zk_nodes,
@@ -40,6 +48,11 @@ from ch_tools.chadmin.internal.zookeeper_clean import (
     clean_zk_metadata_for_hosts,
     delete_zero_copy_locks,
 )
+from ch_tools.chadmin.internal.zookeeper_dump import (
+    ZookeeperDump,
+    dump_zk_tree,
+    find_paths_in_dump,
+)
 from ch_tools.common import logging
 from ch_tools.common.cli.formatting import print_json, print_response
 from ch_tools.common.cli.parameters import ListParamType, StringParamType
@@ -88,6 +101,14 @@ PRINT_ZOOKEEPER_NODES_BATCH_SIZE = 10000
     help="Cluster ZooKeeper root path. If not specified,the root path will be used.",
     required=False,
 )
+@option(
+    "--dump",
+    "dump_path",
+    type=str,
+    help="Read nodes from the dump created by 'zookeeper dump' command instead of ZooKeeper. "
+    "Only read-only commands are supported.",
+    required=False,
+)
 @pass_context
 def zookeeper_group(
     ctx: Context,
@@ -100,6 +121,7 @@ def zookeeper_group(
     no_chroot: bool,
     no_ch_config: bool,
     zk_root_path: str,
+    dump_path: Optional[str],
 ) -> None:
     """ZooKeeper management commands.
 
@@ -119,6 +141,11 @@ def zookeeper_group(
         "no_ch_config": no_ch_config,
         "zk_root_path": zk_root_path,
     }
+    if dump_path:
+        # Commands use the client from the context if it is present.
+        dump = ZookeeperDump(dump_path)
+        ctx.obj["zk_client"] = dump
+        ctx.call_on_close(dump.stop)
 
 
 @zookeeper_group.command("get")
@@ -180,6 +207,70 @@ def list_command(ctx: Context, path: str, verbose: bool) -> None:
             logging.info("\n".join(chunk))  # type: ignore
 
 
+@zookeeper_group.command("find")
+@argument("path")
+@argument("regexps", nargs=-1, required=True)
+@option(
+    "-e",
+    "--exclude",
+    "excluded_paths",
+    multiple=True,
+    help="Regular expression for paths to skip with their subtrees. Can be specified multiple times.",
+)
+@pass_context
+def find_command(
+    ctx: Context, path: str, regexps: Tuple[str, ...], excluded_paths: Tuple[str, ...]
+) -> None:
+    """Find ZooKeeper nodes under the path with full paths matching any of regular expressions.
+
+    Subtrees of matched nodes are not searched.
+    Node path can be specified with ClickHouse macros. Example: "/test_table/{shard}/replicas/{replica}".
+    """
+    with zk_client(ctx) as zk:
+        if isinstance(zk, ZookeeperDump):
+            paths = find_paths_in_dump(
+                zk, format_path(ctx, path), list(regexps), list(excluded_paths)
+            )
+        else:
+            paths = find_paths(
+                zk,
+                format_path(ctx, path),
+                list(regexps),
+                list(excluded_paths),
+                window=get_walk_window(ctx),
+            )
+
+    for chunk in chunked(sorted(paths), PRINT_ZOOKEEPER_NODES_BATCH_SIZE):
+        logging.info("\n".join(chunk))
+
+
+@zookeeper_group.command("dump")
+@argument("path")
+@argument("output")
+@option(
+    "--with-data",
+    is_flag=True,
+    help="Dump data of nodes along with their stats.",
+)
+@pass_context
+def dump_command(ctx: Context, path: str, output: str, with_data: bool) -> None:
+    """Dump ZooKeeper subtree to the file.
+
+    The dump keeps paths and stats of nodes and optionally their data. Read-only commands can be run
+    against it with '--dump' option instead of loading ZooKeeper.
+    Node path can be specified with ClickHouse macros. Example: "/test_table/{shard}/replicas/{replica}".
+    """
+    with zk_client(ctx) as zk:
+        stats = dump_zk_tree(
+            zk,
+            format_path(ctx, path),
+            output,
+            with_data=with_data,
+            window=get_walk_window(ctx),
+        )
+    logging.info("Dumped {} to {}", stats, output)
+
+
 @zookeeper_group.command("stat")
 @argument("path")
 @pass_context
@@ -356,10 +447,16 @@ def delete_ddl_task_command(ctx: Context, tasks: list) -> None:
     help="Perform ddl query cleanup.",
     type=bool,
 )
+@option(
+    "--estimate",
+    is_flag=True,
+    default=False,
+    help="Do not delete anything. Estimate the number and data size of nodes to delete by sampling.",
+)
 @argument("fqdn", type=ListParamType())
 @pass_context
 def clickhouse_hosts_command(
-    ctx: Context, fqdn: list, clean_ddl_queue: bool, dry_run: bool
+    ctx: Context, fqdn: list, clean_ddl_queue: bool, dry_run: bool, estimate: bool
 ) -> None:
     # We can't get the ddl queue path from clickhouse config,
     # because in some cases we are changing this path while performing cluster resetup.
@@ -370,12 +467,14 @@ def clickhouse_hosts_command(
         cleanup_ddl_queue=clean_ddl_queue,
         zk_ddl_query_path=config["clickhouse"]["distributed_ddl_path"],
         dry_run=dry_run,
+        estimate=estimate,
     )
     for replica in fqdn:
         delete_zero_copy_locks(
             ctx,
             replica_name=replica,
             dry_run=dry_run,
+            estimate=estimate,
         )
 
 
@@ -390,11 +489,17 @@ def clickhouse_hosts_command(
     default=False,
     help="Enable dry run mode and do not perform any modifying actions.",
 )
+@option(
+    "--estimate",
+    is_flag=True,
+    default=False,
+    help="Do not delete anything. Estimate the number and data size of nodes to delete by sampling.",
+)
 @argument("zookeeper-table-path")
 @argument("fqdn", type=ListParamType())
 @pass_context
 def remove_hosts_from_table(
-    ctx: Context, zookeeper_table_path: str, fqdn: list, dry_run: bool
+    ctx: Context, zookeeper_table_path: str, fqdn: list, dry_run: bool, estimate: bool
 ) -> None:
     clean_zk_metadata_for_hosts(
         ctx,
@@ -403,12 +508,14 @@ def remove_hosts_from_table(
         cleanup_database=False,
         cleanup_ddl_queue=False,
         dry_run=dry_run,
+        estimate=estimate,
     )
     for replica in fqdn:
         delete_zero_copy_locks(
             ctx,
             replica_name=replica,
             dry_run=dry_run,
+            estimate=estimate,
         )
 
 
@@ -476,6 +583,12 @@ def remove_hosts_from_table(
     is_flag=True,
     help=("Do not delete objects. Show only statistics."),
 )
+@option(
+    "--estimate",
+    is_flag=True,
+    default=False,
+    help="Do not delete anything. Estimate the number and data size of nodes to delete by sampling.",
+)
 @pass_context
 def clean_zk_locks_command(
     ctx: Context,
@@ -486,6 +599,7 @@ def clean_zk_locks_command(
     remote_path_prefix: Optional[str] = None,
     replica: Optional[str] = None,
     dry_run: bool = False,
+    estimate: bool = False,
 ) -> None:
     """
     Clean zero copy locks.
@@ -499,6 +613,7 @@ def clean_zk_locks_command(
         remote_path_prefix,
         replica,
         dry_run,
+        estimate,
     )
 
 
@@ -624,6 +739,16 @@ def clean_zk_locks_command(
     is_flag=True,
     help=("Copy the contents of already existing zero-copy locks."),
 )
+@option(
+    "--batched",
+    "batched",
+    is_flag=True,
+    help=(
+        "Check existence of nodes by async requests for batches of parts and create locks "
+        "of many parts in a single transaction instead of running a task per part. "
+        "--max-workers is not used in this mode."
+    ),
+)
 @pass_context
 def create_zk_locks_command(
     ctx: Context,
@@ -642,10 +767,12 @@ def create_zk_locks_command(
     keep_going: bool = False,
     copy_values: bool = False,
     check_exist: bool = True,
+    batched: bool = False,
 ) -> None:
     """
     Create zero copy locks.
     """
+    # pylint: disable=too-many-locals
     tables = list_tables(
         ctx,
         database_name=database,
@@ -656,7 +783,7 @@ def create_zk_locks_command(
     if not tables:
         raise RuntimeError("Couldn't find any replicated tables by given filters")
 
-    def generate_all_tasks(zk: KazooClient) -> Generator[WorkerTask, None, None]:
+    def generate_tables() -> Generator[tuple[TableInfo, str, list[str]], None, None]:
         for table_info in tables:
             zk_path, replicas_to_lock = _get_replicas_and_zk_path(
                 ctx,
@@ -675,6 +802,10 @@ def create_zk_locks_command(
             logging.info(
                 f"Preparing zero-copy lock tasks for table '{table_info['database']}'.'{table_info['name']}', replicas: {', '.join(replicas_to_lock)}"
             )
+            yield table_info, zk_path, replicas_to_lock
+
+    def generate_all_tasks(zk: KazooClient) -> Generator[WorkerTask, None, None]:
+        for table_info, zk_path, replicas_to_lock in generate_tables():
             yield from generate_zero_copy_lock_tasks(
                 ctx,
                 disk,
@@ -691,15 +822,43 @@ def create_zk_locks_command(
                 check_exist,
             )
 
+    def generate_all_part_locks() -> Generator[ZeroCopyPartLocks, None, None]:
+        for table_info, zk_path, replicas_to_lock in generate_tables():
+            yield from generate_zero_copy_part_locks(
+                ctx,
+                disk,
+                table_info,
+                partition_id,
+                part_id,
+                replicas_to_lock,
+                zk_path,
+                zero_copy_path,
+                zero_copy_path_old,
+                copy_values,
+            )
+
     total_tasks = 0
     # Use single zk client because it is thread safe
     with zk_client(ctx) as zk:
-        for batch in chunked(generate_all_tasks(zk), CREATE_ZERO_COPY_LOCKS_BATCH_SIZE):
-            total_tasks += len(batch)
-            logging.info(
-                f"Executing batch of {len(batch)} lock creation tasks with {max_workers} workers"
-            )
-            execute_tasks_in_parallel(batch, max_workers, keep_going)
+        if batched:
+            creator = ZeroCopyLockCreator(zk, dry_run, check_exist, keep_going)
+            for part_batch in chunked(
+                generate_all_part_locks(), CREATE_ZERO_COPY_LOCKS_BATCH_SIZE
+            ):
+                total_tasks += len(part_batch)
+                logging.info(
+                    f"Creating zero-copy locks for batch of {len(part_batch)} parts"
+                )
+                creator.create(part_batch)
+        else:
+            for batch in chunked(
+                generate_all_tasks(zk), CREATE_ZERO_COPY_LOCKS_BATCH_SIZE
+            ):
+                total_tasks += len(batch)
+                logging.info(
+                    f"Executing batch of {len(batch)} lock creation tasks with {max_workers} workers"
+                )
+                execute_tasks_in_parallel(batch, max_workers, keep_going)
 
     if total_tasks > 0:
         logging.info(f"All {total_tasks} zero-copy lock creation tasks completed")
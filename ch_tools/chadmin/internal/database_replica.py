@@ -7,7 +7,7 @@ and table metadata storage in ZooKeeper.
 """
 
 import time
-from typing import Any, Optional, Tuple
+from typing import Any, List, Optional, Tuple
 
 from click import Context
 from kazoo.client import KazooClient
@@ -18,9 +18,16 @@ from ch_tools.chadmin.internal.database import attach_database, detach_database
 from ch_tools.chadmin.internal.system import match_ch_version
 from ch_tools.chadmin.internal.utils import execute_query, replace_macros
 from ch_tools.chadmin.internal.zookeeper import (
+    TRANSACTION_OPERATION_OVERHEAD_BYTES,
+    WRITE_TRANSACTION_MAX_BYTES,
+    WRITE_TRANSACTION_MAX_OPERATIONS,
     ZKTransactionBuilder,
+    bulk_create_zk_nodes,
+    bulk_get_zk_nodes,
+    delete_recursive,
     escape_for_zookeeper,
     format_path,
+    get_walk_window,
     unescape_from_zookeeper,
     zk_client,
 )
@@ -52,6 +59,22 @@ initiator:
 """  # noqa: W291
 
 
+def _fits_into_transaction(
+    builder: ZKTransactionBuilder, nodes: List[Tuple[str, str]]
+) -> bool:
+    """
+    Check if creation of the nodes fits into the transaction along with operations already added to it.
+    """
+    size = builder.size_bytes + sum(
+        len(path.encode()) + len(value.encode()) + TRANSACTION_OPERATION_OVERHEAD_BYTES
+        for path, value in nodes
+    )
+    return (
+        len(builder.path_to_nodes) + len(nodes) <= WRITE_TRANSACTION_MAX_OPERATIONS
+        and size <= WRITE_TRANSACTION_MAX_BYTES
+    )
+
+
 def _get_database_zk_path(
     database_name: str, db_replica_path: Optional[str] = None
 ) -> str:
@@ -271,22 +294,26 @@ def get_replicated_db_tables_zk_metadata(
         if not children:
             return zk_tables_metadata
 
-        for escaped_table_name in children:
-            table_metadata_path = f"{zk_metadata_path}/{escaped_table_name}"
+        paths = {
+            f"{zk_metadata_path}/{escaped_table_name}": escaped_table_name
+            for escaped_table_name in children
+        }
+        metadata = bulk_get_zk_nodes(zk, paths, window=get_walk_window(ctx))
+        for table_metadata_path, escaped_table_name in paths.items():
             # Unescape table name to get original name for dictionary key
             table_name = unescape_from_zookeeper(escaped_table_name)
-            try:
-                metadata_data = zk.get(table_metadata_path)
-                if metadata_data and metadata_data[0]:
-                    zk_tables_metadata[table_name] = metadata_data[0].decode().strip()
-                else:
-                    logging.warning("Empty ZooKeeper metadata for table %s", table_name)
-            except NoNodeError:
+            if table_metadata_path not in metadata:
                 logging.warning(
-                    "ZooKeeper metadata node for table %s was removed concurrently at path %s",
+                    "ZooKeeper metadata node for table {} was removed concurrently at path {}",
                     table_name,
                     table_metadata_path,
                 )
+            elif metadata[table_metadata_path]:
+                zk_tables_metadata[table_name] = (
+                    metadata[table_metadata_path].decode().strip()
+                )
+            else:
+                logging.warning("Empty ZooKeeper metadata for table {}", table_name)
 
     return zk_tables_metadata
 
@@ -488,22 +515,53 @@ class ZookeeperDatabaseManager:
         with zk_client(self.ctx) as zk:
             counter = self._generate_counter(zk, prefix_db_zk_path)
 
-            with ZKTransactionBuilder(self.ctx, zk) as builder:
-                if first_replica:
-                    self._create_first_replica_name_node(
-                        builder, prefix_db_zk_path, database_name
-                    )
-
-                self._create_query_log_entry(builder, prefix_db_zk_path, counter)
-                self._create_replica_registration(
-                    builder, database_name, prefix_db_zk_path
-                )
+            table_metadata_nodes = (
+                self._get_table_metadata_nodes(database_name, prefix_db_zk_path)
+                if first_replica
+                else []
+            )
+            created_metadata_paths: List[str] = []
+            try:
+                with ZKTransactionBuilder(self.ctx, zk) as builder:
+                    if first_replica:
+                        self._create_first_replica_name_node(
+                            builder, prefix_db_zk_path, database_name
+                        )
 
-                if first_replica:
-                    self._create_table_metadata_nodes(
+                    self._create_query_log_entry(builder, prefix_db_zk_path, counter)
+                    self._create_replica_registration(
                         builder, database_name, prefix_db_zk_path
                     )
 
+                    if _fits_into_transaction(builder, table_metadata_nodes):
+                        for path, value in table_metadata_nodes:
+                            builder.create_node(path=path, value=value)
+                    else:
+                        # Metadata of many tables doesn't fit into a single transaction, so it is
+                        # created in batches before the replica registration is committed.
+                        created_metadata_paths = [
+                            format_path(self.ctx, path)
+                            for path, _ in table_metadata_nodes
+                        ]
+                        bulk_create_zk_nodes(
+                            zk,
+                            [
+                                (format_path(self.ctx, path), value.encode())
+                                for path, value in table_metadata_nodes
+                            ],
+                        )
+            except Exception:
+                # Metadata is removed, so the replica can be created again.
+                if created_metadata_paths:
+                    logging.warning(
+                        "Removing table metadata of database {} as the replica was not registered",
+                        database_name,
+                    )
+                    delete_recursive(
+                        zk, created_metadata_paths, window=get_walk_window(self.ctx)
+                    )
+                raise
+
     def _generate_counter(self, zk: KazooClient, db_zk_path: str) -> str:
         """Generate unique counter for log entries using ZK sequence."""
         path_counter = zk.create(
@@ -622,16 +680,15 @@ class ZookeeperDatabaseManager:
             path=f"{replica_node}/max_log_ptr_at_creation", value=DEFAULT_MAX_LOG_PTR
         )
 
-    def _create_table_metadata_nodes(
+    def _get_table_metadata_nodes(
         self,
-        builder: ZKTransactionBuilder,
         database_name: str,
         prefix_db_zk_path: str,
-    ) -> None:
+    ) -> List[Tuple[str, str]]:
         """
-        Store table metadata in ZooKeeper for first replica.
+        Get table metadata nodes to store in ZooKeeper for first replica.
 
-        Creates nodes:
+        Nodes:
         {zk_path}/metadata/{escaped_table_name} = CREATE TABLE statement
 
         Table names are escaped using escapeForFileName() logic to handle
@@ -648,6 +705,7 @@ class ZookeeperDatabaseManager:
             self.ctx, query, database_name=database_name, format_=OutputFormat.JSON
         )
 
+        nodes = []
         for table in rows["data"]:
             table_name = table["name"]
             metadata_path = table["metadata_path"]
@@ -658,13 +716,16 @@ class ZookeeperDatabaseManager:
             with open(metadata_path, "r", encoding="utf-8") as metadata_file:
                 local_table_metadata = metadata_file.read()
 
-                # Escape table name for ZooKeeper node (same as ClickHouse escapeForFileName)
-                escaped_table_name = escape_for_zookeeper(table_name)
-
-                builder.create_node(
-                    path=f"{prefix_db_zk_path}/{ZK_METADATA_SUBPATH}/{escaped_table_name}",
-                    value=local_table_metadata,
+            # Escape table name for ZooKeeper node (same as ClickHouse escapeForFileName)
+            escaped_table_name = escape_for_zookeeper(table_name)
+            nodes.append(
+                (
+                    f"{prefix_db_zk_path}/{ZK_METADATA_SUBPATH}/{escaped_table_name}",
+                    local_table_metadata,
                 )
+            )
+
+        return nodes
 
     def _get_host_id(self, database_name: str, replica: str) -> str:
         """
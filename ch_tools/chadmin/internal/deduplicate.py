@@ -154,6 +154,7 @@ def _get_deduplication_tasks(
                 f"SYSTEM SYNC REPLICA {table_info['database']}.{table_info['name']}",
                 format_=None,
                 dry_run=dry_run,
+                concurrent=True,
             )
 
         if not dry_run:
@@ -12,8 +12,9 @@ from ch_tools.common.clickhouse.config import (
     ClickhouseKeeperConfig,
     ClickhouseUsersConfig,
 )
+from ch_tools.common.utils import DATETIME_FORMAT
 
-from ..utils import DATETIME_FORMAT, clickhouse_client
+from ..utils import clickhouse_client
 from .data import DiagnosticsData, add_command, add_query, execute_query
 
 
@@ -0,0 +1,208 @@
+"""
+Scan of object storage disk metadata stored on the local filesystem.
+
+Each file of a part on object storage disk is a metadata file listing objects that hold its data.
+Parts are immutable, so objects of a part directory are cached by the directory modification time
+and only new or changed directories are parsed on subsequent scans.
+"""
+
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from multiprocessing import get_context
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from ch_tools.chadmin.internal.object_storage.s3_object_metadata import (
+    S3ObjectLocalInfo,
+    S3ObjectLocalMetaData,
+)
+from ch_tools.common import logging
+
+CACHE_FORMAT_VERSION = 1
+# Directories modified recently may be still being written, so they are not cached.
+MIN_CACHED_DIRECTORY_AGE = 60
+PARSE_CHUNK_SIZE = 64
+
+# (key, size, key_is_full)
+CachedObject = Tuple[str, int, bool]
+
+
+@dataclass
+class LocalMetadataScanStats:
+    """
+    Statistics of the local metadata scan.
+    """
+
+    directories: int = 0
+    cached_directories: int = 0
+    parsed_directories: int = 0
+    parse_errors: int = 0
+    objects: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.objects} objects in {self.directories} directories "
+            f"({self.cached_directories} cached, {self.parsed_directories} parsed, "
+            f"{self.parse_errors} parse errors) in {self.elapsed:.2f}s"
+        )
+
+
+@dataclass
+class LocalMetadataCache:
+    """
+    Objects of scanned directories by their relative path, along with directory modification time.
+    """
+
+    path: Optional[str]
+    directories: Dict[str, Tuple[int, List[CachedObject]]] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> "LocalMetadataCache":
+        cache = cls(path)
+        if path is None or not os.path.exists(path):
+            return cache
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == CACHE_FORMAT_VERSION:
+                cache.directories = {
+                    directory: (mtime, [tuple(obj) for obj in objects])  # type: ignore[misc]
+                    for directory, (mtime, objects) in data["directories"].items()
+                }
+        except Exception as e:
+            logging.warning("Ignoring broken local metadata cache {}: {!r}", path, e)
+
+        return cache
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(
+                {"version": CACHE_FORMAT_VERSION, "directories": self.directories}, f
+            )
+        os.replace(tmp_path, self.path)
+
+
+def scan_local_metadata(
+    metadata_path: str,
+    cache_path: Optional[str] = None,
+    workers: int = 1,
+    include_shadow: bool = True,
+    stats: Optional[LocalMetadataScanStats] = None,
+    reuse_cache: bool = True,
+) -> Iterator[Tuple[str, S3ObjectLocalInfo]]:
+    """
+    Iterate over objects referenced by metadata files of the disk. Returns pairs of the metadata
+    file directory relative to `metadata_path` and the object.
+
+    If `cache_path` is specified, objects of unchanged directories are taken from the cache of the
+    previous scan. Changed directories are parsed by `workers` processes. If `reuse_cache` is unset,
+    all directories are parsed and the cache is only updated with the results.
+    """
+    stats = stats if stats is not None else LocalMetadataScanStats()
+    start = time.monotonic()
+    cache = LocalMetadataCache.load(cache_path if reuse_cache else None)
+    new_cache = LocalMetadataCache(cache_path)
+    cache_threshold = time.time_ns() - MIN_CACHED_DIRECTORY_AGE * 10**9
+
+    changed: List[Tuple[str, int]] = []
+    for directory, mtime in _walk_directories(metadata_path, include_shadow):
+        stats.directories += 1
+        cached = cache.directories.get(directory)
+        if cached is not None and cached[0] == mtime:
+            stats.cached_directories += 1
+            new_cache.directories[directory] = cached
+            stats.objects += len(cached[1])
+            yield from _to_objects(directory, cached[1])
+        else:
+            changed.append((directory, mtime))
+
+    paths = [os.path.join(metadata_path, directory) for directory, _ in changed]
+    results = zip(changed, _map(_parse_directory, paths, workers))
+    for (directory, mtime), (objects, errors) in results:
+        stats.parsed_directories += 1
+        stats.parse_errors += errors
+        stats.objects += len(objects)
+        if mtime < cache_threshold:
+            new_cache.directories[directory] = (mtime, objects)
+        yield from _to_objects(directory, objects)
+
+    new_cache.save()
+    stats.elapsed = time.monotonic() - start
+
+
+def parse_metadata_strings(
+    values: Iterable[str], workers: int = 1
+) -> Iterator[S3ObjectLocalInfo]:
+    """
+    Parse contents of metadata files by `workers` processes.
+    """
+    for objects in _map(_parse_string, values, workers):
+        yield from objects
+
+
+def _walk_directories(
+    metadata_path: str, include_shadow: bool
+) -> Iterator[Tuple[str, int]]:
+    """
+    Iterate over directories containing files with their modification times.
+    """
+    for path, dirs, files in os.walk(metadata_path):
+        directory = os.path.relpath(path, metadata_path)
+        if directory == "." and not include_shadow and "shadow" in dirs:
+            dirs.remove("shadow")
+        if files:
+            yield directory, os.stat(path).st_mtime_ns
+
+
+def _map(func: Any, values: Iterable[Any], workers: int) -> Iterator[Any]:
+    if workers <= 1:
+        yield from map(func, values)
+        return
+
+    # Pool can be created from a non-main thread, and forking it while other threads hold locks
+    # may deadlock child processes.
+    with get_context("spawn").Pool(workers) as pool:
+        yield from pool.imap(func, values, chunksize=PARSE_CHUNK_SIZE)
+
+
+def _parse_directory(path: str) -> Tuple[List[CachedObject], int]:
+    objects: List[CachedObject] = []
+    errors = 0
+    try:
+        entries = list(os.scandir(path))
+    except FileNotFoundError:
+        # Part was removed after the directory was listed.
+        return objects, errors
+
+    for entry in entries:
+        try:
+            if not entry.is_file(follow_symlinks=False):
+                continue
+            metadata = S3ObjectLocalMetaData.from_file(Path(entry.path))
+        except FileNotFoundError:
+            continue
+        except Exception:
+            errors += 1
+            continue
+        objects.extend((obj.key, obj.size, obj.key_is_full) for obj in metadata.objects)
+
+    return objects, errors
+
+
+def _parse_string(value: str) -> List[S3ObjectLocalInfo]:
+    return S3ObjectLocalMetaData.from_string(value).objects
+
+
+def _to_objects(
+    directory: str, objects: List[CachedObject]
+) -> Iterator[Tuple[str, S3ObjectLocalInfo]]:
+    for key, size, key_is_full in objects:
+        yield directory, S3ObjectLocalInfo(key=key, size=size, key_is_full=key_is_full)
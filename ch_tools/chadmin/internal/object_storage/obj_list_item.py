@@ -2,7 +2,7 @@ import json
 from dataclasses import dataclass
 from datetime import datetime
 
-from ch_tools.chadmin.internal.utils import DATETIME_FORMAT
+from ch_tools.common.utils import DATETIME_FORMAT
 
 
 @dataclass
@@ -11,6 +11,8 @@ class ObjListItem:
     Item of object storage listing.
     """
 
+    __slots__ = ("last_modified", "path", "size")
+
     last_modified: datetime
     path: str
     size: int
@@ -26,3 +28,9 @@ class ObjListItem:
         parsed_json = json.loads(value)
         last_modified = datetime.strptime(parsed_json["last_modified"], DATETIME_FORMAT)
         return cls(last_modified, parsed_json["obj_path"], int(parsed_json["obj_size"]))
+
+    @classmethod
+    def from_json_compact(cls, value: str) -> "ObjListItem":
+        time_str, path, size = json.loads(value)
+        last_modified = datetime.strptime(time_str, DATETIME_FORMAT)
+        return cls(last_modified, path, int(size))
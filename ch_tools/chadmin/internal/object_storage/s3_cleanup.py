@@ -1,43 +1,236 @@
-from typing import Any, Iterator, List
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Iterable, List, Set
 
-import boto3
-from botocore.client import Config
+from botocore.exceptions import ClientError
 
 from ch_tools.chadmin.internal.object_storage.s3_cleanup_stats import ResultStat
+from ch_tools.chadmin.internal.object_storage.s3_client import create_s3_client
 from ch_tools.chadmin.internal.utils import chunked
+from ch_tools.common import logging
 from ch_tools.common.clickhouse.config.storage_configuration import S3DiskConfiguration
 
 from .obj_list_item import ObjListItem
 
 BULK_DELETE_CHUNK_SIZE = 1000
+DEFAULT_MAX_IN_FLIGHT = 4
+DEFAULT_MAX_RETRIES = 5
+# Error codes of throttled or temporarily failed requests and keys that are worth retrying.
+RETRYABLE_ERROR_CODES = {
+    "SlowDown",
+    "ServiceUnavailable",
+    "InternalError",
+    "RequestLimitExceeded",
+    "Throttling",
+}
+RETRYABLE_HTTP_STATUSES = {500, 503}
+# Limits of the delay added before delete requests when storage throttles them.
+MIN_THROTTLING_DELAY = 0.1
+MAX_THROTTLING_DELAY = 10.0
 
 
-def cleanup_s3_object_storage(
-    disk: S3DiskConfiguration,
-    keys: Iterator[ObjListItem],
-    stat: ResultStat,
-    dry_run: bool = False,
-) -> None:
-    s3 = boto3.resource(
-        "s3",
-        endpoint_url=disk.endpoint_url,
-        aws_access_key_id=disk.access_key_id,
-        aws_secret_access_key=disk.secret_access_key,
-        config=Config(
-            s3={
-                "addressing_style": "auto",
-            },
-        ),
-    )
-    bucket = s3.Bucket(disk.bucket_name)
-
-    for chunk in chunked(keys, BULK_DELETE_CHUNK_SIZE):
-        if not dry_run:
-            _bulk_delete(bucket, chunk)
-        for item in chunk:
-            stat.update_by_item(item)
-
-
-def _bulk_delete(bucket: Any, items: List[ObjListItem]) -> None:
-    objects = [{"Key": item.path} for item in items]
-    bucket.delete_objects(Delete={"Objects": objects, "Quiet": False})
+@dataclass
+class DeleteError:
+    """
+    Object that failed to be deleted.
+    """
+
+    key: str
+    code: str
+    message: str
+
+    def __str__(self) -> str:
+        return f"{self.key}: {self.code} {self.message}"
+
+
+class S3DeleteError(Exception):
+    """
+    Some objects failed to be deleted.
+    """
+
+    def __init__(self, errors: List[DeleteError]) -> None:
+        super().__init__(
+            f"Failed to delete {len(errors)} objects, first error: {errors[0]}"
+        )
+        self.errors = errors
+
+
+class AdaptiveRateLimiter:
+    """
+    Delay before requests that grows exponentially on throttling and decays on successful requests.
+    """
+
+    def __init__(
+        self,
+        min_delay: float = MIN_THROTTLING_DELAY,
+        max_delay: float = MAX_THROTTLING_DELAY,
+    ) -> None:
+        self._min_delay = min_delay
+        self._max_delay = max_delay
+        self._delay = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def delay(self) -> float:
+        return self._delay
+
+    def wait(self) -> None:
+        delay = self._delay
+        if delay:
+            time.sleep(delay)
+
+    def on_throttled(self) -> None:
+        with self._lock:
+            self._delay = min(max(self._delay * 2, self._min_delay), self._max_delay)
+
+    def on_success(self) -> None:
+        with self._lock:
+            self._delay /= 2
+            if self._delay < self._min_delay:
+                self._delay = 0.0
+
+
+class S3ObjectDeleter:  # pylint: disable=too-many-instance-attributes
+    """
+    Delete objects from S3 disk's bucket by DeleteObjects requests executed concurrently.
+
+    Batches are submitted by `delete()` that blocks only when `max_in_flight` requests are
+    in progress. Only keys confirmed as deleted by storage are accounted in `stat`, failed
+    keys are collected in `errors` and reported by `raise_for_errors()`. The pending requests
+    are awaited on `close()`.
+    """
+
+    def __init__(
+        self,
+        disk: S3DiskConfiguration,
+        stat: ResultStat,
+        dry_run: bool = False,
+        max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+    ) -> None:
+        self.errors: List[DeleteError] = []
+        self._bucket = disk.bucket_name
+        self._stat = stat
+        self._dry_run = dry_run
+        self._max_in_flight = max(max_in_flight, 1)
+        self._max_retries = max_retries
+        self._client = (
+            None
+            if dry_run
+            else create_s3_client(disk, max_pool_connections=self._max_in_flight)
+        )
+        self._executor = ThreadPoolExecutor(max_workers=self._max_in_flight)
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._rate_limiter = AdaptiveRateLimiter()
+
+    def delete(self, items: Iterable[ObjListItem]) -> None:
+        """
+        Schedule deletion of objects.
+        """
+        for chunk in chunked(items, BULK_DELETE_CHUNK_SIZE):
+            if self._dry_run:
+                self._account_deleted(chunk)
+                continue
+
+            while len(self._pending) >= self._max_in_flight:
+                self._wait_pending(FIRST_COMPLETED)
+            self._pending.add(self._executor.submit(self._delete_batch, chunk))
+
+    def close(self) -> None:
+        """
+        Wait for pending requests and release resources.
+        """
+        try:
+            self._wait_pending()
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def raise_for_errors(self) -> None:
+        """
+        Raise S3DeleteError if some objects failed to be deleted.
+        """
+        if self.errors:
+            raise S3DeleteError(self.errors)
+
+    def __enter__(self) -> "S3ObjectDeleter":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+    def _wait_pending(self, return_when: str = "ALL_COMPLETED") -> None:
+        done, self._pending = wait(self._pending, return_when=return_when)
+        for future in done:
+            # Propagate unexpected errors of requests.
+            future.result()
+
+    def _delete_batch(self, items: List[ObjListItem]) -> None:
+        items_by_key = {item.path: item for item in items}
+        attempt = 0
+        while True:
+            self._rate_limiter.wait()
+            try:
+                response = self._client.delete_objects(  # type: ignore[union-attr]
+                    Bucket=self._bucket,
+                    Delete={
+                        "Objects": [{"Key": key} for key in items_by_key],
+                        "Quiet": False,
+                    },
+                )
+            except ClientError as e:
+                if attempt >= self._max_retries or not _is_retryable(e):
+                    raise
+                self._on_throttled(attempt, str(e))
+                attempt += 1
+                continue
+
+            self._account_deleted(
+                items_by_key.pop(deleted["Key"])
+                for deleted in response.get("Deleted", [])
+                if deleted["Key"] in items_by_key
+            )
+
+            retry_keys = []
+            for error in response.get("Errors", []):
+                key, code = error["Key"], error.get("Code", "")
+                if code in RETRYABLE_ERROR_CODES and attempt < self._max_retries:
+                    retry_keys.append(key)
+                elif items_by_key.pop(key, None) is not None:
+                    self._account_failed(
+                        DeleteError(key, code, error.get("Message", ""))
+                    )
+
+            if not retry_keys:
+                self._rate_limiter.on_success()
+                return
+
+            items_by_key = {key: items_by_key[key] for key in retry_keys}
+            self._on_throttled(attempt, f"{len(retry_keys)} keys are throttled")
+            attempt += 1
+
+    def _on_throttled(self, attempt: int, reason: str) -> None:
+        self._rate_limiter.on_throttled()
+        logging.debug(
+            "Delete request is throttled ({}), retrying in {:.2f}s, attempt {}",
+            reason,
+            self._rate_limiter.delay,
+            attempt + 1,
+        )
+
+    def _account_deleted(self, items: Iterable[ObjListItem]) -> None:
+        with self._lock:
+            for item in items:
+                self._stat.update_by_item(item)
+
+    def _account_failed(self, error: DeleteError) -> None:
+        with self._lock:
+            self.errors.append(error)
+
+
+def _is_retryable(error: ClientError) -> bool:
+    code = error.response.get("Error", {}).get("Code", "")
+    status = error.response.get("ResponseMetadata", {}).get("HTTPStatusCode")
+    return code in RETRYABLE_ERROR_CODES or status in RETRYABLE_HTTP_STATUSES
@@ -4,7 +4,7 @@ from enum import Enum
 from typing import TypedDict
 
 from ch_tools.chadmin.internal.object_storage.obj_list_item import ObjListItem
-from ch_tools.chadmin.internal.utils import DATETIME_FORMAT
+from ch_tools.common.utils import DATETIME_FORMAT
 
 
 class StatisticsPeriod(str, Enum):
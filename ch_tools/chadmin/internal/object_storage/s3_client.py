@@ -0,0 +1,24 @@
+from typing import Any
+
+import boto3  # type: ignore[import]
+from botocore.client import Config
+
+from ch_tools.common.clickhouse.config.storage_configuration import S3DiskConfiguration
+
+
+def create_s3_client(disk: S3DiskConfiguration, max_pool_connections: int = 10) -> Any:
+    """
+    Create low-level S3 client for the disk. Unlike boto3 resources, the client is thread-safe
+    and can be shared by worker threads.
+    """
+    session = boto3.session.Session()
+    return session.client(
+        "s3",
+        endpoint_url=disk.endpoint_url,
+        aws_access_key_id=disk.access_key_id,
+        aws_secret_access_key=disk.secret_access_key,
+        config=Config(
+            s3={"addressing_style": "auto"},
+            max_pool_connections=max_pool_connections,
+        ),
+    )
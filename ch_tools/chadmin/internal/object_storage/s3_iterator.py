@@ -1,19 +1,123 @@
-from typing import Any, Iterator
+import itertools
+import os
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
 import boto3  # type: ignore[import]
 from botocore.client import Config
 
+from ch_tools.chadmin.internal.object_storage.s3_client import create_s3_client
+from ch_tools.common import logging
 from ch_tools.common.clickhouse.config.storage_configuration import S3DiskConfiguration
 
 ObjectSummary = Any
 IGNORED_OBJECT_NAME_PREFIXES = ["operations", ".SCHEMA_VERSION"]
 
+# Max number of listed pages of a sub-prefix waiting to be consumed.
+MAX_QUEUED_PAGES = 4
+# Max number of levels of sub-prefixes expanded to split the listing into shards.
+MAX_SHARDING_DEPTH = 4
+# Sub-prefix with more objects located directly under it is listed as a whole.
+MAX_EXPANDED_OBJECTS = 1000
+# Interval of checking for interruption of the iteration by workers blocked on a full queue.
+PUT_TIMEOUT = 0.5
+
+
+class S3ObjectSummary(NamedTuple):
+    """
+    Object of S3 listing. Has the same attributes as boto3 ObjectSummary used by listing consumers.
+    """
+
+    key: str
+    last_modified: datetime
+    size: int
+
+
+# Sub-prefix to list or objects located directly under the prefix that are already listed.
+Shard = Tuple[str, Optional[List[S3ObjectSummary]]]
+
+
+class _ListingStopped(Exception):
+    """
+    Iteration over listing is interrupted by the consumer.
+    """
+
+
+@dataclass
+class ShardListingStats:
+    """
+    Listing statistics of a single sub-prefix.
+    """
+
+    prefix: str
+    objects: int = 0
+    bytes: int = 0
+    pages: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def objects_per_second(self) -> float:
+        return self.objects / self.elapsed if self.elapsed else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.bytes / self.elapsed if self.elapsed else 0.0
+
+    def update(self, other: "ShardListingStats") -> None:
+        self.objects += other.objects
+        self.bytes += other.bytes
+        self.pages += other.pages
+        self.elapsed += other.elapsed
+
 
 def s3_object_storage_iterator(
     disk: S3DiskConfiguration,
     *,
     object_name_prefix: str = "",
     skip_ignoring: bool = False,
+    workers: int = 1,
+    ordered: bool = False,
+    stats: Optional[Dict[str, ShardListingStats]] = None,
+) -> Iterator[ObjectSummary]:
+    """
+    Iterate over objects of S3 disk's bucket with the specified prefix.
+
+    If `workers` is greater than 1, sub-prefixes of the prefix are discovered by delimiter listing
+    and listed concurrently. Listed pages are passed to the consumer through bounded queues, so
+    the listing doesn't get ahead of the consumer by more than a few pages per worker. With `ordered` objects are returned in the order of keys (as in
+    sequential listing), otherwise sub-prefixes are returned in the order of listing completion.
+    Listing statistics per sub-prefix are stored to `stats` if it's provided.
+    """
+    if workers > 1:
+        objects = _sharded_listing(disk, object_name_prefix, workers, ordered, stats)
+    else:
+        objects = _sequential_listing(disk, object_name_prefix)
+
+    for obj in objects:
+        if not skip_ignoring and _is_ignored(obj.key):
+            continue
+        yield obj
+
+
+def _sequential_listing(
+    disk: S3DiskConfiguration, object_name_prefix: str
 ) -> Iterator[ObjectSummary]:
     s3 = boto3.resource(
         "s3",
@@ -24,10 +128,252 @@ def s3_object_storage_iterator(
     )
     bucket = s3.Bucket(disk.bucket_name)
 
-    for obj in bucket.objects.filter(Prefix=object_name_prefix):
-        if not skip_ignoring and _is_ignored(obj.key):
+    yield from bucket.objects.filter(Prefix=object_name_prefix)
+
+
+def _sharded_listing(
+    disk: S3DiskConfiguration,
+    object_name_prefix: str,
+    workers: int,
+    ordered: bool,
+    stats: Optional[Dict[str, ShardListingStats]],
+) -> Iterator[S3ObjectSummary]:
+    client = create_s3_client(disk, max_pool_connections=workers)
+    prefix = os.path.join(object_name_prefix, "") if object_name_prefix else ""
+
+    shards = _discover_shards(client, disk.bucket_name, prefix, workers)
+    logging.debug(
+        "Listing {} sub-prefixes of '{}' with {} workers",
+        sum(1 for _, listed in shards if listed is None),
+        prefix,
+        workers,
+    )
+
+    stopped = threading.Event()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+
+        def _submit(sub_prefix: str, pages: "queue.Queue[Any]") -> None:
+            executor.submit(
+                _list_shard, client, disk.bucket_name, sub_prefix, pages, stopped
+            )
+
+        try:
+            if ordered:
+                yield from _consume_ordered(shards, workers, _submit, stats)
+            else:
+                yield from _consume_unordered(shards, workers, _submit, stats)
+        finally:
+            # Unblock workers waiting for the consumer if the iteration is interrupted.
+            stopped.set()
+
+
+def _consume_ordered(
+    shards: List[Shard],
+    workers: int,
+    submit: Callable[[str, "queue.Queue[Any]"], None],
+    stats: Optional[Dict[str, ShardListingStats]],
+) -> Iterator[S3ObjectSummary]:
+    """
+    Return objects of shards in the order of keys. Each shard is listed into its own queue,
+    the number of shards listed ahead of the consumed one is bounded.
+    """
+    max_pending = workers * 2
+    pending: Deque["queue.Queue[Any]"] = deque()
+    shards_iter = iter(shards)
+
+    def _submit_next() -> bool:
+        shard = next(shards_iter, None)
+        if shard is None:
+            return False
+        sub_prefix, listed = shard
+        if listed is not None:
+            pages: "queue.Queue[Any]" = queue.Queue()
+            pages.put(listed)
+            pages.put(ShardListingStats(sub_prefix))
+        else:
+            pages = queue.Queue(maxsize=MAX_QUEUED_PAGES)
+            submit(sub_prefix, pages)
+        pending.append(pages)
+        return True
+
+    while len(pending) < max_pending and _submit_next():
+        pass
+
+    while pending:
+        item = pending[0].get()
+        if isinstance(item, ShardListingStats):
+            pending.popleft()
+            _store_stats(stats, item)
+            _submit_next()
             continue
-        yield obj
+        if isinstance(item, BaseException):
+            raise item
+        yield from item
+
+
+def _consume_unordered(
+    shards: List[Shard],
+    workers: int,
+    submit: Callable[[str, "queue.Queue[Any]"], None],
+    stats: Optional[Dict[str, ShardListingStats]],
+) -> Iterator[S3ObjectSummary]:
+    """
+    Return objects of shards in the order of listing. All shards are listed into a shared queue.
+    """
+    # Objects located directly under prefixes don't require listing, return them first.
+    for _, listed in shards:
+        if listed is not None:
+            yield from listed
+
+    pages: "queue.Queue[Any]" = queue.Queue(maxsize=MAX_QUEUED_PAGES * workers)
+    sub_prefixes = iter(sub_prefix for sub_prefix, listed in shards if listed is None)
+    running = 0
+    for sub_prefix in itertools.islice(sub_prefixes, workers):
+        submit(sub_prefix, pages)
+        running += 1
+
+    while running:
+        item = pages.get()
+        if isinstance(item, ShardListingStats):
+            running -= 1
+            _store_stats(stats, item)
+            next_prefix = next(sub_prefixes, None)
+            if next_prefix is not None:
+                submit(next_prefix, pages)
+                running += 1
+            continue
+        if isinstance(item, BaseException):
+            raise item
+        yield from item
+
+
+def _store_stats(
+    stats: Optional[Dict[str, ShardListingStats]], shard_stats: ShardListingStats
+) -> None:
+    if stats is not None and shard_stats.pages:
+        stats[shard_stats.prefix] = shard_stats
+
+
+def _discover_shards(
+    client: Any, bucket: str, prefix: str, workers: int
+) -> List[Shard]:
+    """
+    Split listing of the prefix into shards. Sub-prefixes are expanded level by level until
+    there are enough of them to keep all workers busy.
+    """
+    shards: List[Shard] = [(prefix, None)]
+    leaves: Set[str] = set()
+    for _ in range(MAX_SHARDING_DEPTH):
+        if sum(1 for _, listed in shards if listed is None) >= workers:
+            break
+
+        expanded: List[Shard] = []
+        for shard_prefix, listed in shards:
+            if listed is None and shard_prefix not in leaves:
+                level = _list_sub_prefixes(client, bucket, shard_prefix)
+                if level is not None:
+                    expanded.extend(_make_shards(shard_prefix, *level))
+                    continue
+                leaves.add(shard_prefix)
+            expanded.append((shard_prefix, listed))
+
+        if expanded == shards:
+            break
+        shards = expanded
+
+    return shards
+
+
+def _make_shards(
+    prefix: str, sub_prefixes: List[str], objects: List[S3ObjectSummary]
+) -> List[Shard]:
+    """
+    Split listing into shards in the order of keys. Each shard is either a sub-prefix to list or
+    a group of already listed objects located directly under the prefix between sub-prefixes.
+    """
+    shards: List[Shard] = []
+    group: List[S3ObjectSummary] = []
+    objects_iter = iter(objects)
+    obj = next(objects_iter, None)
+    for sub_prefix in sub_prefixes:
+        while obj is not None and obj.key < sub_prefix:
+            group.append(obj)
+            obj = next(objects_iter, None)
+        if group:
+            shards.append((prefix, group))
+            group = []
+        shards.append((sub_prefix, None))
+
+    if obj is not None:
+        shards.append((prefix, [obj, *objects_iter]))
+
+    return shards
+
+
+def _list_sub_prefixes(
+    client: Any, bucket: str, prefix: str
+) -> Optional[Tuple[List[str], List[S3ObjectSummary]]]:
+    """
+    Return sub-prefixes of the prefix and objects located directly under it. Return None
+    if there are too many objects directly under the prefix to keep them in memory.
+    """
+    sub_prefixes: List[str] = []
+    objects: List[S3ObjectSummary] = []
+    paginator = client.get_paginator("list_objects_v2")
+    for page in paginator.paginate(Bucket=bucket, Prefix=prefix, Delimiter="/"):
+        sub_prefixes.extend(item["Prefix"] for item in page.get("CommonPrefixes", []))
+        objects.extend(_page_objects(page))
+        if len(objects) > MAX_EXPANDED_OBJECTS:
+            return None
+
+    return sub_prefixes, objects
+
+
+def _list_shard(
+    client: Any,
+    bucket: str,
+    prefix: str,
+    pages: "queue.Queue[Any]",
+    stopped: threading.Event,
+) -> None:
+    """
+    List objects of the sub-prefix into the queue page by page. The listing ends with
+    the shard statistics or the raised exception.
+    """
+    stats = ShardListingStats(prefix)
+    start = time.monotonic()
+    try:
+        paginator = client.get_paginator("list_objects_v2")
+        for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+            objects = list(_page_objects(page))
+            stats.pages += 1
+            stats.objects += len(objects)
+            stats.bytes += sum(obj.size for obj in objects)
+            _put(pages, objects, stopped)
+        stats.elapsed = time.monotonic() - start
+        _put(pages, stats, stopped)
+    except _ListingStopped:
+        pass
+    except Exception as e:
+        try:
+            _put(pages, e, stopped)
+        except _ListingStopped:
+            pass
+
+
+def _put(pages: "queue.Queue[Any]", item: Any, stopped: threading.Event) -> None:
+    while True:
+        try:
+            pages.put(item, timeout=PUT_TIMEOUT)
+            return
+        except queue.Full:
+            if stopped.is_set():
+                raise _ListingStopped()
+
+
+def _page_objects(page: Dict[str, Any]) -> Iterator[S3ObjectSummary]:
+    for item in page.get("Contents", []):
+        yield S3ObjectSummary(item["Key"], item["LastModified"], item["Size"])
 
 
 def _is_ignored(name: str) -> bool:
@@ -1,7 +1,7 @@
 import json
 import os
 import re
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Mapping, Optional, Sequence
 
 from click import Context
 
@@ -34,7 +34,7 @@ def list_parts(
     limit: Optional[int] = None,
     use_part_list_from_json: Optional[str] = None,
     remote_replica: Optional[str] = None,
-) -> List[Dict[str, Any]]:
+) -> Sequence[Mapping[str, Any]]:
     """
     List data parts.
     """
@@ -139,28 +139,29 @@ def list_parts(
         """,
         sensitive_args=sensitive_args,
     )
-    return execute_query(
-        ctx,
+    # Result can contain hundreds of thousands of parts, so it is fetched as compact rows.
+    return clickhouse_client(ctx).query_rows(
         query,
-        database=database,
-        exclude_database_pattern=exclude_database_pattern,
-        table=table,
-        parts_table=parts_table,
-        partition_id=partition_id,
-        min_partition_id=min_partition_id,
-        max_partition_id=max_partition_id,
-        part_name=part_name,
-        disk_name=disk_name,
-        level=level,
-        min_level=min_level,
-        max_level=max_level,
-        min_size=min_size,
-        max_size=max_size,
-        active=active,
-        order_by=order_by,
-        limit=limit,
-        format_="JSON",
-    )["data"]
+        query_args={
+            "database": database,
+            "exclude_database_pattern": exclude_database_pattern,
+            "table": table,
+            "parts_table": parts_table,
+            "partition_id": partition_id,
+            "min_partition_id": min_partition_id,
+            "max_partition_id": max_partition_id,
+            "part_name": part_name,
+            "disk_name": disk_name,
+            "level": level,
+            "min_level": min_level,
+            "max_level": max_level,
+            "min_size": min_size,
+            "max_size": max_size,
+            "active": active,
+            "order_by": order_by,
+            "limit": limit,
+        },
+    )
 
 
 def list_detached_parts(
@@ -594,18 +594,23 @@ def get_table_schema_from_cluster(
     Retrieve CREATE TABLE queries for specified tables from all cluster replicas.
     Returns a dict mapping table names to host-schema pairs for schema comparison.
     """
-    result = {}
-    for table in tables:
-        query = f"""
-            SELECT DISTINCT
-                hostName() as host,
-                create_table_query
-            FROM clusterAllReplicas('{{cluster}}', system.tables)
-            WHERE database='{database}' AND table='{table}'
-        """
-        rows = execute_query(ctx, query, echo=True, format_=OutputFormat.JSON)["data"]
-        # Create a dict mapping host to schema
-        result[table] = {row["host"]: row["create_table_query"] for row in rows}
+    result: Dict[str, Dict[str, str]] = {table: {} for table in tables}
+    if not tables:
+        return result
+
+    tables_list = ",".join(f"'{table}'" for table in tables)
+    query = f"""
+        SELECT DISTINCT
+            hostName() as host,
+            table,
+            create_table_query
+        FROM clusterAllReplicas('{{cluster}}', system.tables)
+        WHERE database='{database}' AND table IN ({tables_list})
+    """
+    rows = execute_query(ctx, query, echo=True, format_=OutputFormat.JSON)["data"]
+    # Create a dict mapping host to schema for every table
+    for row in rows:
+        result[row["table"]][row["host"]] = row["create_table_query"]
     return result
 
 
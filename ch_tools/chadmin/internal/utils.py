@@ -7,17 +7,16 @@ import re
 import shutil
 from enum import Enum
 from itertools import islice
-from typing import Any, Iterable, Iterator, Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 
 from click import Context
 
 from ch_tools.common import logging
+from ch_tools.common.clickhouse.client.async_client import query_on_hosts
 from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
 from ch_tools.common.clickhouse.config.clickhouse import ClickhousePort
 from ch_tools.monrun_checks.clickhouse_info import ClickhouseInfo
 
-DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
-
 
 class Scope(str, Enum):
     """
@@ -74,9 +73,35 @@ def execute_query_on_shard(
     stream: bool = False,
     settings: Optional[Any] = None,
     log_query: bool = True,
+    concurrent: bool = False,
     **kwargs: Any,
 ) -> None:
+    """
+    Execute ClickHouse query on all replicas of the shard.
+
+    By default, replicas are queried one by one and the first failure stops execution on the rest
+    of them, which is what DDL queries need. With `concurrent`, the query is executed on all replicas
+    simultaneously and the first error is raised after all queries complete, so it should be
+    enabled only for queries that are safe to run regardless of results on other replicas.
+    """
     replicas = ClickhouseInfo.get_replicas(ctx)
+    if concurrent:
+        if stream:
+            raise ValueError("`stream` and `concurrent` cannot be set both")
+        execute_query_on_replicas(
+            ctx,
+            query,
+            replicas,
+            timeout=timeout,
+            echo=echo,
+            dry_run=dry_run,
+            format_=format_,
+            settings=settings,
+            log_query=log_query,
+            **kwargs,
+        )
+        return
+
     for replica in replicas:
         execute_query(
             ctx,
@@ -93,6 +118,40 @@ def execute_query_on_shard(
         )
 
 
+def execute_query_on_replicas(
+    ctx: Context,
+    query: str,
+    replicas: list[str],
+    timeout: Optional[int] = None,
+    echo: Optional[bool] = False,
+    dry_run: Optional[bool] = False,
+    format_: Optional[str] = "default",
+    settings: Optional[Any] = None,
+    log_query: bool = True,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Execute ClickHouse query on the specified replicas concurrently and return results by replica.
+    The number of simultaneously executed queries is limited by "clickhouse.fan_out_concurrency" setting.
+    """
+    if format_ == "default":
+        format_ = "PrettyCompact"
+
+    return query_on_hosts(
+        clickhouse_client(ctx),
+        query,
+        replicas,
+        max_concurrency=ctx.obj["config"]["clickhouse"]["fan_out_concurrency"],
+        query_args=kwargs,
+        timeout=timeout,
+        echo=bool(echo),
+        dry_run=bool(dry_run),
+        format_=format_,
+        settings=settings,
+        log_query=log_query,
+    )
+
+
 def get_remote_table_for_hosts(ctx: Context, table: str, replicas: list[str]) -> str:
     """
     Get remote/remoteSecure function for a table with given remote replicas.
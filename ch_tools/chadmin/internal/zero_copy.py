@@ -1,16 +1,22 @@
 import os
 import re
 import traceback
+from dataclasses import dataclass, field
+from functools import partial
 from pathlib import Path
 from typing import (
+    Any,
+    Callable,
     Generator,
+    Mapping,
     Optional,
     TypedDict,
 )
 
 from click import Context
-from kazoo.client import KazooClient
+from kazoo.client import KazooClient, TransactionRequest
 from kazoo.exceptions import NodeExistsError, NoNodeError, RolledBackError
+from kazoo.protocol.states import ZnodeStat
 
 from ch_tools.chadmin.internal.object_storage.s3_object_metadata import (
     S3ObjectLocalMetaData,
@@ -25,6 +31,12 @@ from ch_tools.common.clickhouse.config import get_clickhouse_config
 from ch_tools.common.clickhouse.config.storage_configuration import S3DiskConfiguration
 from ch_tools.common.process_pool import WorkerTask
 
+# Limits of transactions creating zero-copy locks. The size limit is kept well below
+# the default ZooKeeper request size limit (jute.maxbuffer, 1 MB).
+LOCKS_TRANSACTION_MAX_OPERATIONS = 1000
+LOCKS_TRANSACTION_MAX_BYTES = 512 * 1024
+LOCK_OPERATION_OVERHEAD_BYTES = 32
+
 
 class ZeroCopyLockInfo(TypedDict):
     lock_path: str
@@ -32,7 +44,15 @@ class ZeroCopyLockInfo(TypedDict):
     replica: str
 
 
-def generate_zero_copy_lock_tasks(
+class ZeroCopyPartLocks(TypedDict):
+    identifier: str
+    lock_infos: list[ZeroCopyLockInfo]
+    set_value_path: str
+    old_value_path: str
+    copy_values: bool
+
+
+def generate_zero_copy_part_locks(
     ctx: Context,
     disk: str,
     table: TableInfo,
@@ -40,14 +60,11 @@ def generate_zero_copy_lock_tasks(
     part_name: Optional[str],
     replicas_to_lock: list[str],
     table_zk_path: str,
-    zk: KazooClient,
-    dry_run: bool = False,
     zero_copy_path: Optional[str] = None,
     zero_copy_path_old: Optional[str] = None,
     copy_values: bool = False,
-    check_part_exist: bool = True,
-) -> Generator[WorkerTask, None, None]:
-    """Generate tasks for creating zero-copy locks for given table/replicas."""
+) -> Generator[ZeroCopyPartLocks, None, None]:
+    """Generate zero-copy locks to create for parts of given table/replicas."""
     shared_table_id = get_table_shared_id(ctx, table_zk_path)
 
     if not shared_table_id:
@@ -99,23 +116,61 @@ def generate_zero_copy_lock_tasks(
         set_value_path = os.path.join(zero_copy_path, shared_table_id, part["name"])
         old_value_path = os.path.join(zero_copy_path_old, shared_table_id, part["name"])
 
-        task_id = f"{table['database']}.{table['name']}.{part['name']}"
+        yield ZeroCopyPartLocks(
+            identifier=f"{table['database']}.{table['name']}.{part['name']}",
+            lock_infos=lock_infos,
+            set_value_path=set_value_path,
+            old_value_path=old_value_path,
+            copy_values=should_copy_lock_values,
+        )
+
+
+def generate_zero_copy_lock_tasks(
+    ctx: Context,
+    disk: str,
+    table: TableInfo,
+    partition_id: Optional[str],
+    part_name: Optional[str],
+    replicas_to_lock: list[str],
+    table_zk_path: str,
+    zk: KazooClient,
+    dry_run: bool = False,
+    zero_copy_path: Optional[str] = None,
+    zero_copy_path_old: Optional[str] = None,
+    copy_values: bool = False,
+    check_part_exist: bool = True,
+) -> Generator[WorkerTask, None, None]:
+    """Generate tasks for creating zero-copy locks for given table/replicas."""
+    for part_locks in generate_zero_copy_part_locks(
+        ctx,
+        disk,
+        table,
+        partition_id,
+        part_name,
+        replicas_to_lock,
+        table_zk_path,
+        zero_copy_path,
+        zero_copy_path_old,
+        copy_values,
+    ):
         yield WorkerTask(
-            identifier=task_id,
+            identifier=part_locks["identifier"],
             function=_create_single_zero_copy_lock,
             kwargs={
                 "zk": zk,
                 "dry_run": dry_run,
-                "copy_values": should_copy_lock_values,
-                "set_value_path": set_value_path,
-                "old_value_path": old_value_path,
-                "lock_infos": lock_infos,
+                "copy_values": part_locks["copy_values"],
+                "set_value_path": part_locks["set_value_path"],
+                "old_value_path": part_locks["old_value_path"],
+                "lock_infos": part_locks["lock_infos"],
                 "check_part_exist": check_part_exist,
             },
         )
 
 
-def _get_first_checksums_blob_path(object_storage_prefix: str, part: dict) -> str:
+def _get_first_checksums_blob_path(
+    object_storage_prefix: str, part: Mapping[str, Any]
+) -> str:
     checksums_path = os.path.join(part["path"], "checksums.txt")
     metadata = S3ObjectLocalMetaData.from_file(Path(checksums_path))
 
@@ -134,7 +189,7 @@ def _get_zero_copy_lock_info(
     table_zk_path: str,
     zero_copy_path: str,
     table_uuid: str,
-    part: dict,
+    part: Mapping[str, Any],
     replica: str,
 ) -> ZeroCopyLockInfo:
     blob_path = _get_first_checksums_blob_path(object_storage_prefix, part)
@@ -304,6 +359,267 @@ def _create_single_zero_copy_lock(
     logging.info("Created zero-copy locks for replicas: {}", ", ".join(replicas))
 
 
+class ZeroCopyLockCreator:
+    """
+    Create zero-copy locks for batches of parts.
+
+    Existence of locks, parts and parent nodes is requested asynchronously for the whole batch,
+    parent nodes known to exist are cached across batches, and locks of many parts are packed
+    into large transactions. ZooKeeper executes requests of a session in order, so transactions
+    are committed asynchronously too. Parts of failed transactions are processed one by one.
+    """
+
+    def __init__(
+        self,
+        zk: KazooClient,
+        dry_run: bool = False,
+        check_part_exist: bool = True,
+        keep_going: bool = False,
+    ) -> None:
+        self._zk = zk
+        self._dry_run = dry_run
+        self._check_part_exist = check_part_exist
+        self._keep_going = keep_going
+        self._existing_parents: set[str] = set()
+
+    def create(self, parts: list[ZeroCopyPartLocks]) -> None:
+        """Create zero-copy locks for the batch of parts."""
+        prepared = self._prepare(parts)
+        if self._dry_run:
+            for part in prepared:
+                for lock_path in part.locks_to_create:
+                    logging.debug("Would create zero-copy lock {}", lock_path)
+            logging.info(
+                "Would create {} zero-copy locks for {} parts",
+                sum(len(part.locks_to_create) for part in prepared),
+                len(prepared),
+            )
+            return
+        if not prepared:
+            return
+
+        self._prefetch_parents(prepared)
+
+        transactions = []
+        for batch in self._pack(prepared):
+            transaction = self._zk.transaction()
+            for operation in batch.operations:
+                operation(transaction)
+            transactions.append((batch, transaction.commit_async()))
+
+        for batch, request in transactions:
+            error = _get_transaction_error(request.get())
+            if error is None:
+                self._existing_parents.update(batch.parents)
+                continue
+
+            logging.info(
+                "Transaction creating zero-copy locks for {} parts failed: {!r}. Create them one by one",
+                len(batch.parts),
+                error,
+            )
+            for part in batch.parts:
+                self._create_single(part.part_locks)
+
+        logging.info(
+            "Created zero-copy locks for {} parts in {} transactions",
+            len(prepared),
+            len(transactions),
+        )
+
+    def _prepare(self, parts: list[ZeroCopyPartLocks]) -> list["_PreparedPartLocks"]:
+        requests = []
+        for part_locks in parts:
+            lock_requests = [
+                (
+                    lock_info,
+                    self._zk.exists_async(lock_info["lock_path"]),
+                    (
+                        self._zk.exists_async(lock_info["part_path"])
+                        if self._check_part_exist
+                        else None
+                    ),
+                )
+                for lock_info in part_locks["lock_infos"]
+            ]
+            value_request = (
+                self._zk.get_async(part_locks["old_value_path"])
+                if part_locks["copy_values"]
+                else None
+            )
+            requests.append((part_locks, lock_requests, value_request))
+
+        prepared = []
+        for part_locks, lock_requests, value_request in requests:
+            part = _PreparedPartLocks(part_locks)
+            for lock_info, lock_request, part_request in lock_requests:
+                if lock_request.get():
+                    logging.debug(
+                        f"Zero-copy lock path '{lock_info['lock_path']}' already exists. Skip it"
+                    )
+                    continue
+
+                if part_request is not None:
+                    part_stat = part_request.get()
+                    if not part_stat:
+                        logging.debug(
+                            f"Part path '{lock_info['part_path']}' is already removed. Skip it"
+                        )
+                        continue
+                    part.part_checks.append((lock_info["part_path"], part_stat))
+                part.locks_to_create.append(lock_info["lock_path"])
+
+            if not part.locks_to_create:
+                continue
+
+            if value_request is not None:
+                try:
+                    part.value, _ = value_request.get()
+                except NoNodeError:
+                    logging.debug(
+                        f"Old zero-copy lock '{part_locks['old_value_path']}' doesn't exist. Continue"
+                    )
+
+            for lock_path in part.locks_to_create:
+                logging.debug(f"Create zero-copy lock {lock_path} in transaction")
+            prepared.append(part)
+
+        return prepared
+
+    def _prefetch_parents(self, parts: list["_PreparedPartLocks"]) -> None:
+        unknown_parents = {
+            parent
+            for part in parts
+            for lock_path in part.locks_to_create
+            for parent in _get_parent_paths(lock_path)
+            if parent not in self._existing_parents
+        }
+        requests = [
+            (parent, self._zk.exists_async(parent)) for parent in unknown_parents
+        ]
+        for parent, request in requests:
+            if request.get():
+                self._existing_parents.add(parent)
+
+    def _pack(self, parts: list["_PreparedPartLocks"]) -> list["_LocksTransaction"]:
+        transactions = [_LocksTransaction()]
+        scheduled_parents: set[str] = set()
+        for part in parts:
+            operations, parents = _get_part_operations(
+                part, self._existing_parents | scheduled_parents
+            )
+            size = sum(len(path) + LOCK_OPERATION_OVERHEAD_BYTES for path in parents)
+            size += sum(
+                len(path) + LOCK_OPERATION_OVERHEAD_BYTES
+                for path in part.locks_to_create
+            )
+            current = transactions[-1]
+            if current.parts and (
+                len(current.operations) + len(operations)
+                > LOCKS_TRANSACTION_MAX_OPERATIONS
+                or current.size + size > LOCKS_TRANSACTION_MAX_BYTES
+            ):
+                current = _LocksTransaction()
+                transactions.append(current)
+
+            current.parts.append(part)
+            current.operations.extend(operations)
+            current.parents.extend(parents)
+            current.size += size
+            scheduled_parents.update(parents)
+
+        return transactions
+
+    def _create_single(self, part_locks: ZeroCopyPartLocks) -> None:
+        try:
+            _create_single_zero_copy_lock(
+                self._zk,
+                part_locks["lock_infos"],
+                part_locks["set_value_path"],
+                part_locks["old_value_path"],
+                self._dry_run,
+                part_locks["copy_values"],
+                self._check_part_exist,
+            )
+        except Exception as e:
+            if not self._keep_going:
+                raise
+            logging.warning(
+                "Ignoring the exception while creating zero-copy locks for {} due to keep-going flag : {!r}",
+                part_locks["identifier"],
+                e,
+            )
+
+
+@dataclass
+class _PreparedPartLocks:
+    part_locks: ZeroCopyPartLocks
+    part_checks: list[tuple[str, ZnodeStat]] = field(default_factory=list)
+    locks_to_create: list[str] = field(default_factory=list)
+    value: bytes = b""
+
+
+@dataclass
+class _LocksTransaction:
+    parts: list[_PreparedPartLocks] = field(default_factory=list)
+    operations: list[Callable[[TransactionRequest], None]] = field(default_factory=list)
+    parents: list[str] = field(default_factory=list)
+    size: int = 0
+
+
+def _get_part_operations(
+    part: _PreparedPartLocks, existing_parents: set[str]
+) -> tuple[list[Callable[[TransactionRequest], None]], list[str]]:
+    operations: list[Callable[[TransactionRequest], None]] = []
+    for part_path, part_stat in part.part_checks:
+        operations.append(partial(_check, path=part_path, version=part_stat.version))
+
+    parents = sorted(
+        {
+            parent
+            for lock_path in part.locks_to_create
+            for parent in _get_parent_paths(lock_path)
+            if parent not in existing_parents
+        }
+    )
+    set_value_path = part.part_locks["set_value_path"].rstrip("/")
+    for parent in parents:
+        value = part.value if parent == set_value_path else b""
+        operations.append(partial(_create, path=parent, value=value))
+
+    for lock_path in part.locks_to_create:
+        operations.append(partial(_create, path=lock_path, value=b""))
+
+    return operations, parents
+
+
+def _check(transaction: TransactionRequest, path: str, version: int) -> None:
+    transaction.check(path, version)
+
+
+def _create(transaction: TransactionRequest, path: str, value: bytes) -> None:
+    transaction.create(path, value)
+
+
+def _get_transaction_error(results: list[Any]) -> Optional[Exception]:
+    for result in results:
+        if isinstance(result, Exception) and not isinstance(result, RolledBackError):
+            return result
+    return None
+
+
+def _get_parent_paths(path: str) -> list[str]:
+    """
+    Return ancestors of the node from the root, e.g. ['/a', '/a/b'] for '/a/b/c'.
+    """
+    parents = []
+    parent = os.path.dirname(path.rstrip("/"))
+    while parent not in ("/", ""):
+        parents.append(parent)
+        parent = os.path.dirname(parent)
+    return parents[::-1]
+
+
 def _get_parent_paths_to_create(zk: KazooClient, path: str) -> list[str]:
     parents = path.split("/")[:-1]
     parent_path = ""
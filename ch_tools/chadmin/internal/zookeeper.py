@@ -1,3 +1,4 @@
+# pylint: disable=too-many-lines
 """
 ZooKeeper utilities for ClickHouse administration.
 
@@ -7,32 +8,67 @@ and optimized recursive deletion for large node hierarchies.
 """
 
 import os
+import random
 import re
+import threading
+import time
 from collections import deque
 from contextlib import contextmanager
-from math import sqrt
+from dataclasses import dataclass
+from enum import Enum
 from typing import (
     Any,
     Callable,
+    Deque,
     Dict,
     Generator,
     Iterable,
+    Iterator,
     List,
     Optional,
+    Pattern,
     Set,
+    Tuple,
     Union,
 )
 
 from click import Context
 from kazoo.client import KazooClient
-from kazoo.exceptions import NodeExistsError, NoNodeError, NotEmptyError
-from kazoo.protocol.states import ZnodeStat
+from kazoo.exceptions import (
+    NodeExistsError,
+    NoNodeError,
+    NotEmptyError,
+    RolledBackError,
+)
+from kazoo.protocol.states import KeeperState, ZnodeStat
 
-from ch_tools.chadmin.internal.utils import chunked, replace_macros
+from ch_tools.chadmin.internal.utils import replace_macros
+from ch_tools.chadmin.internal.zookeeper_stats import (
+    InstrumentedKazooClient,
+    ZookeeperRequestStats,
+)
 from ch_tools.common import logging
+from ch_tools.common.cli.formatting import format_bytes
 from ch_tools.common.clickhouse.config import get_clickhouse_config, get_macros
 from ch_tools.common.clickhouse.config.clickhouse import ClickhouseConfig
 
+# Number of requests to ZooKeeper executed concurrently by tree traversals.
+DEFAULT_WALK_WINDOW = 100
+DEFAULT_DELETE_IN_FLIGHT_TRANSACTIONS = 4
+# Limits of transactions deleting nodes. The size limit is kept well below
+# the default ZooKeeper request size limit (jute.maxbuffer, 1 MB).
+DELETE_TRANSACTION_MAX_OPERATIONS = 1000
+DELETE_TRANSACTION_MAX_BYTES = 512 * 1024
+TRANSACTION_OPERATION_OVERHEAD_BYTES = 32
+DELETE_PROGRESS_REPORT_INTERVAL = 10
+# Max number of children visited per node by subtree size estimation.
+DEFAULT_ESTIMATE_SAMPLE_SIZE = 20
+# Limits of transactions creating and updating nodes by bulk operations.
+WRITE_TRANSACTION_MAX_OPERATIONS = 1000
+WRITE_TRANSACTION_MAX_BYTES = 512 * 1024
+
+_zk_client_lock = threading.Lock()
+
 
 class ZKTransactionBuilder:
     """
@@ -45,6 +81,8 @@ class ZKTransactionBuilder:
         self.zk = zk
         self.txn = zk.transaction()
         self.path_to_nodes: List[str] = []
+        # Estimated size of the transaction request.
+        self.size_bytes = 0
         self._committed = False
         self._reset_called = False
 
@@ -61,6 +99,11 @@ class ZKTransactionBuilder:
         if self._committed:
             raise RuntimeError("Cannot add operations to committed transaction")
         self.path_to_nodes.append(path)
+        self.size_bytes += (
+            len(path.encode())
+            + len(value.encode())
+            + TRANSACTION_OPERATION_OVERHEAD_BYTES
+        )
         self.txn.create(path=format_path(self.ctx, path), value=value.encode())
         return self
 
@@ -68,6 +111,7 @@ class ZKTransactionBuilder:
         if self._committed:
             raise RuntimeError("Cannot add operations to committed transaction")
         self.path_to_nodes.append(path)
+        self.size_bytes += _delete_operation_size(path)
         self.txn.delete(path=format_path(self.ctx, path))
         return self
 
@@ -84,6 +128,7 @@ class ZKTransactionBuilder:
 
     def reset(self) -> None:
         self.path_to_nodes = []
+        self.size_bytes = 0
         self.txn = self.zk.transaction()
         self._committed = False
         self._reset_called = True
@@ -152,14 +197,10 @@ def list_zk_nodes(
     ctx: Context, path: str, verbose: bool = False
 ) -> Union[List[str], List[Dict[str, Any]]]:
     def _stat_node(zk: KazooClient, node: str) -> Dict[str, Any]:
-        descendants_count = 0
-        queue = [node]
-        while queue:
-            item = queue.pop()
-            children = get_children(zk, item)
-            descendants_count += len(children)
-            queue.extend(os.path.join(item, node) for node in children)
-
+        descendants_count = sum(
+            len(item.children)
+            for item in walk_zk_tree(zk, [node], window=get_walk_window(ctx))
+        )
         return {
             "path": node,
             "nodes": descendants_count,
@@ -185,6 +226,12 @@ def create_zk_nodes(
         value = b""
 
     with zk_client(ctx) as zk:
+        if not make_parents and not exists_ok:
+            bulk_create_zk_nodes(
+                zk, [(format_path(ctx, path), value) for path in paths]
+            )
+            return
+
         for path in paths:
             try:
                 zk.create(
@@ -203,8 +250,7 @@ def update_zk_nodes(ctx: Context, paths: List[str], value: Union[str, bytes]) ->
         value = value.encode()
 
     with zk_client(ctx) as zk:
-        for path in paths:
-            zk.set(format_path(ctx, path), value)
+        bulk_set_zk_nodes(zk, [(format_path(ctx, path), value) for path in paths])
 
 
 def update_acls_zk_node(ctx: Context, path: str, acls: Any) -> None:
@@ -219,7 +265,27 @@ def delete_zk_node(ctx: Context, path: str, dry_run: bool = False) -> None:
 def delete_zk_nodes(ctx: Context, paths: List[str], dry_run: bool = False) -> None:
     paths_formated = [format_path(ctx, path) for path in paths]
     with zk_client(ctx) as zk:
-        delete_recursive(zk, paths_formated, dry_run)
+        delete_recursive(
+            zk,
+            paths_formated,
+            dry_run,
+            window=get_walk_window(ctx),
+            max_in_flight_transactions=get_delete_in_flight_transactions(ctx),
+        )
+
+
+def get_walk_window(ctx: Context) -> int:
+    """
+    Return number of concurrent requests for ZooKeeper tree traversals.
+    """
+    return ctx.obj["config"]["zookeeper"]["walk_window"]
+
+
+def get_delete_in_flight_transactions(ctx: Context) -> int:
+    """
+    Return number of concurrent transactions for recursive deletion.
+    """
+    return ctx.obj["config"]["zookeeper"]["delete_in_flight_transactions"]
 
 
 def format_path(ctx: Context, path: str) -> str:
@@ -241,66 +307,251 @@ def set_node_value(zk: KazooClient, path: str, value: str) -> None:
             logging.warning("Can not set for node: {}  value : {}", path, value)
 
 
+class WalkOrder(str, Enum):
+    """
+    Order of ZooKeeper tree traversal.
+    """
+
+    # Breadth-first order. Discovered nodes are visited in FIFO order.
+    BFS = "bfs"
+    # Depth-first order. Discovered nodes are visited in LIFO order, that keeps
+    # the number of discovered but not yet visited nodes small on wide trees.
+    DFS = "dfs"
+
+
+class WalkPrefetch(str, Enum):
+    """
+    Node information requested along with node children.
+    """
+
+    DATA = "data"
+    STAT = "stat"
+
+
+@dataclass
+class ZookeeperNode:
+    """
+    Node visited by tree traversal.
+
+    Nodes deleted during traversal are returned without children, data and stat.
+    """
+
+    path: str
+    children: List[str]
+    data: Optional[bytes] = None
+    stat: Optional[ZnodeStat] = None
+
+
+def walk_zk_tree(
+    zk: KazooClient,
+    root_paths: Iterable[str],
+    *,
+    order: WalkOrder = WalkOrder.BFS,
+    window: int = DEFAULT_WALK_WINDOW,
+    prefetch: Optional[WalkPrefetch] = None,
+    expand: Optional[Callable[[ZookeeperNode], bool]] = None,
+    child_filter: Optional[Callable[[str], bool]] = None,
+) -> Iterator[ZookeeperNode]:
+    """
+    Traverse ZooKeeper tree from the root paths and return visited nodes with their children.
+
+    Requests for up to `window` nodes are executed concurrently by async API, so traversal
+    doesn't wait a round trip per node. Nodes are returned in the order of requests, each node
+    is returned before its children.
+
+    The traversal is pruned by predicates:
+        expand(node) -> whether to visit children of the visited node;
+        child_filter(path) -> whether to visit the child node with the path.
+    """
+    pending: Deque[str] = deque(root_paths)
+    in_flight: Deque[Tuple[str, Any, Any]] = deque()
+
+    def _send_requests() -> None:
+        while pending and len(in_flight) < window:
+            path = pending.popleft() if order == WalkOrder.BFS else pending.pop()
+            if prefetch == WalkPrefetch.DATA:
+                info_request = zk.get_async(path)
+            elif prefetch == WalkPrefetch.STAT:
+                info_request = zk.exists_async(path)
+            else:
+                info_request = None
+            in_flight.append((path, zk.get_children_async(path), info_request))
+
+    _send_requests()
+    while in_flight:
+        path, children_request, info_request = in_flight.popleft()
+        node = _get_walked_node(path, children_request, info_request, prefetch)
+
+        children = [os.path.join(path, child) for child in node.children]
+        if child_filter:
+            children = [child for child in children if child_filter(child)]
+        if children and (expand is None or expand(node)):
+            if order == WalkOrder.BFS:
+                pending.extend(children)
+            else:
+                # Children are visited in the sorted order.
+                pending.extend(sorted(children, reverse=True))
+
+        _send_requests()
+        yield node
+
+
+def _get_walked_node(
+    path: str,
+    children_request: Any,
+    info_request: Any,
+    prefetch: Optional[WalkPrefetch],
+) -> ZookeeperNode:
+    try:
+        node = ZookeeperNode(path, children_request.get())
+        if prefetch == WalkPrefetch.DATA:
+            node.data, node.stat = info_request.get()
+        elif prefetch == WalkPrefetch.STAT:
+            node.stat = info_request.get()
+        return node
+    except NoNodeError:
+        # in the case ZK deletes a znode while we traverse the tree
+        return ZookeeperNode(path, [])
+
+
 def find_paths(
     zk: KazooClient,
     root_path: str,
     included_paths_regexp: List[str],
     excluded_paths: Optional[List[str]] = None,
+    window: int = DEFAULT_WALK_WINDOW,
 ) -> List[str]:
     """
     Traverse zookeeper tree from root_path with bfs approach.
 
     Return paths of nodes that match the include regular expression and do not match the excluded one.
     """
-    paths: Set[str] = set()
-    queue: deque[str] = deque([root_path])
     included_regexp = re.compile("|".join(included_paths_regexp))
     excluded_regexp = re.compile("|".join(excluded_paths)) if excluded_paths else None
-    while len(queue):
-        path = queue.popleft()
-        if excluded_regexp and re.match(excluded_regexp, path):
-            continue
-        for child_node in get_children(zk, path):
-            subpath = os.path.join(path, child_node)
-            if re.match(included_regexp, subpath):
+
+    def _is_excluded(path: str) -> bool:
+        return bool(excluded_regexp and excluded_regexp.match(path))
+
+    def _should_visit(path: str) -> bool:
+        return not included_regexp.match(path) and not _is_excluded(path)
+
+    if _is_excluded(root_path):
+        return []
+
+    paths: Set[str] = set()
+    for node in walk_zk_tree(
+        zk, [root_path], window=window, child_filter=_should_visit
+    ):
+        for child_node in node.children:
+            subpath = os.path.join(node.path, child_node)
+            if included_regexp.match(subpath):
                 paths.add(subpath)
-            else:
-                queue.append(os.path.join(path, subpath))
 
     return list(paths)
 
 
 def find_leafs_and_nodes(
-    zk: KazooClient, root_path: str, predicate: Callable
+    zk: KazooClient,
+    root_path: str,
+    predicate: Callable,
+    window: int = DEFAULT_WALK_WINDOW,
+    child_filter: Optional[Callable[[str], bool]] = None,
 ) -> Iterable[str]:
     """
     Recursively traverses zookeeper directory and returns all paths that satisfy the predicate.
 
     The predicate is applied on the leaf nodes only.
     If all nodes in a directory satisfy the predicate, then path of the node is also returned.
+    Subtrees of nodes rejected by `child_filter` are not traversed and considered as not matching.
     """
+    # Visited nodes with unprocessed subtrees: path -> [unprocessed children, matched children, all children].
+    counters: Dict[str, List[int]] = {}
 
-    def _gen_matched_paths(path: str) -> Iterable[str]:
-        children = set(get_children(zk, path))
-        matched_children = 0
-
-        if not children:
-            if predicate(path):
+    def _process_subtree(path: str, matched: bool) -> Iterable[str]:
+        # The parent subtree is processed along with the last processed child subtree.
+        while True:
+            if matched:
                 yield path
+            if path == root_path:
+                return
+
+            parent_path = os.path.dirname(path)
+            parent_counters = counters[parent_path]
+            parent_counters[0] -= 1
+            parent_counters[1] += matched
+            if parent_counters[0]:
+                return
+
+            del counters[parent_path]
+            matched = parent_counters[1] == parent_counters[2]
+            path = parent_path
+
+    for node in walk_zk_tree(
+        zk, [root_path], order=WalkOrder.DFS, window=window, child_filter=child_filter
+    ):
+        if not node.children:
+            yield from _process_subtree(node.path, bool(predicate(node.path)))
+            continue
 
-        for child in children:
-            child_path = os.path.join(path, child)
-            for matched_path in _gen_matched_paths(child_path):
-                # Check if returned path is a direct children
-                matched_path_dir = os.path.dirname(matched_path)
-                if path == matched_path_dir:
-                    matched_children += 1
-                yield matched_path
+        children_to_visit = len(node.children)
+        if child_filter:
+            children_to_visit = sum(
+                1
+                for child in node.children
+                if child_filter(os.path.join(node.path, child))
+            )
+        if children_to_visit:
+            counters[node.path] = [children_to_visit, 0, len(node.children)]
+        else:
+            yield from _process_subtree(node.path, False)
 
-        if children and matched_children == len(children):
-            yield path
 
-    yield from _gen_matched_paths(root_path)
+class PathLevelsMatcher:
+    """
+    Matcher of paths under the root path with a separate condition for each level of the path.
+
+    A level is either a literal node name or a regular expression that must match the whole node name.
+    Traversals can prune subtrees at the first mismatching level and start from the deepest node
+    defined by leading literal levels.
+    """
+
+    def __init__(self, root_path: str, levels: List[Union[str, Pattern[str]]]) -> None:
+        self.root_path = root_path.rstrip("/") or "/"
+        self._levels = levels
+
+        start_path = self.root_path
+        for level in levels:
+            if not isinstance(level, str):
+                break
+            start_path = os.path.join(start_path, level)
+        self.start_path = start_path
+
+    def matches(self, path: str) -> bool:
+        """
+        Return True if the path matches all levels.
+        """
+        names = self._names(path)
+        return len(names) == len(self._levels) and self._match_names(names)
+
+    def should_visit(self, path: str) -> bool:
+        """
+        Return True if descendants of the path can match.
+        """
+        names = self._names(path)
+        return len(names) <= len(self._levels) and self._match_names(names)
+
+    def _names(self, path: str) -> List[str]:
+        relative_path = os.path.relpath(path, self.root_path)
+        return [] if relative_path == "." else relative_path.split("/")
+
+    def _match_names(self, names: List[str]) -> bool:
+        for name, level in zip(names, self._levels):
+            if isinstance(level, str):
+                if name != level:
+                    return False
+            elif not level.fullmatch(name):
+                return False
+        return True
 
 
 def delete_nodes_transaction(
@@ -319,11 +570,15 @@ def delete_nodes_transaction(
         # Transaction completed successfully, exit.
         return
 
+    _delete_nodes_one_by_one(zk, to_delete_in_trasaction)
+
+
+def _delete_nodes_one_by_one(zk: KazooClient, nodes: List[str]) -> None:
     logging.info(
         "Delete transaction have failed. Fallthrough to single delete operations for zk_nodes : {}",
-        to_delete_in_trasaction,
+        nodes,
     )
-    for node in to_delete_in_trasaction:
+    for node in nodes:
         successful_delete = False
         while not successful_delete:
             try:
@@ -360,41 +615,437 @@ def remove_subpaths(paths: List[str]) -> List[str]:
     return ["/".join(path) for path in normalized_paths]
 
 
-def delete_recursive(zk: KazooClient, paths: List[str], dry_run: bool = False) -> None:
+@dataclass
+class DeleteStats:
+    """
+    Statistics of recursive deletion.
+    """
+
+    deleted: int = 0
+    transactions: int = 0
+    failed_transactions: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def nodes_per_second(self) -> float:
+        return self.deleted / self.elapsed if self.elapsed else 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.deleted} nodes in {self.transactions} transactions "
+            f"({self.failed_transactions} failed) in {self.elapsed:.2f}s, "
+            f"{self.nodes_per_second:.0f} nodes/s"
+        )
+
+
+class _PostOrderDeleter:  # pylint: disable=too-many-instance-attributes
+    """
+    Delete visited nodes as soon as their subtrees are deleted.
+
+    Nodes ready to delete are united in transactions limited by the number of operations and
+    the request size. Up to `max_in_flight` transactions are committed concurrently. A parent
+    becomes ready only after transactions with all its children are completed, so only nodes
+    with unfinished subtrees are kept in memory.
+    """
+
+    def __init__(
+        self,
+        zk: KazooClient,
+        root_paths: List[str],
+        dry_run: bool,
+        max_in_flight: int,
+        stats: DeleteStats,
+    ) -> None:
+        self._zk = zk
+        self._root_paths = set(root_paths)
+        self._dry_run = dry_run
+        self._max_in_flight = max(max_in_flight, 1)
+        self._stats = stats
+        # Visited nodes with children that are not deleted yet: path -> number of such children.
+        self._remaining_children: Dict[str, int] = {}
+        self._ready: Deque[str] = deque()
+        self._ready_bytes = 0
+        self._in_flight: Deque[Tuple[List[str], Any]] = deque()
+        self._start = time.monotonic()
+        self._last_report = self._start
+
+    def add(self, node: ZookeeperNode) -> None:
+        if node.children:
+            self._remaining_children[node.path] = len(node.children)
+        else:
+            self._add_ready(node.path)
+        self._send_transactions(partial=False)
+
+    def finish(self) -> None:
+        while self._ready or self._in_flight:
+            if self._ready:
+                self._send_transactions(partial=True)
+            else:
+                self._complete_oldest_transaction()
+        self._stats.elapsed = time.monotonic() - self._start
+
+    def _add_ready(self, path: str) -> None:
+        self._ready.append(path)
+        self._ready_bytes += _delete_operation_size(path)
+
+    def _send_transactions(self, partial: bool) -> None:
+        while self._ready and (
+            partial
+            or len(self._ready) >= DELETE_TRANSACTION_MAX_OPERATIONS
+            or self._ready_bytes >= DELETE_TRANSACTION_MAX_BYTES
+        ):
+            batch: List[str] = []
+            batch_bytes = 0
+            while self._ready and len(batch) < DELETE_TRANSACTION_MAX_OPERATIONS:
+                size = _delete_operation_size(self._ready[0])
+                if batch and batch_bytes + size > DELETE_TRANSACTION_MAX_BYTES:
+                    break
+                batch.append(self._ready.popleft())
+                batch_bytes += size
+            self._ready_bytes -= batch_bytes
+            self._send_transaction(batch)
+
+    def _send_transaction(self, batch: List[str]) -> None:
+        if self._dry_run:
+            logging.info("Would delete nodes: {}", batch)
+            self._on_deleted(batch)
+            return
+
+        while len(self._in_flight) >= self._max_in_flight:
+            self._complete_oldest_transaction()
+
+        transaction = self._zk.transaction()
+        for path in batch:
+            transaction.delete(path)
+        self._in_flight.append((batch, transaction.commit_async()))
+
+    def _complete_oldest_transaction(self) -> None:
+        batch, request = self._in_flight.popleft()
+        result = request.get()
+        self._stats.transactions += 1
+        if result.count(True) != len(result):
+            self._stats.failed_transactions += 1
+            _delete_nodes_one_by_one(self._zk, batch)
+        self._on_deleted(batch)
+
+    def _on_deleted(self, batch: List[str]) -> None:
+        self._stats.deleted += len(batch)
+        for path in batch:
+            if path in self._root_paths:
+                continue
+            parent = os.path.dirname(path)
+            self._remaining_children[parent] -= 1
+            if not self._remaining_children[parent]:
+                del self._remaining_children[parent]
+                self._add_ready(parent)
+
+        now = time.monotonic()
+        if now - self._last_report >= DELETE_PROGRESS_REPORT_INTERVAL:
+            self._last_report = now
+            self._stats.elapsed = now - self._start
+            logging.info("Delete progress: {}", self._stats)
+
+
+def _delete_operation_size(path: str) -> int:
+    return len(path.encode()) + TRANSACTION_OPERATION_OVERHEAD_BYTES
+
+
+def delete_recursive(
+    zk: KazooClient,
+    paths: List[str],
+    dry_run: bool = False,
+    window: int = DEFAULT_WALK_WINDOW,
+    max_in_flight_transactions: int = DEFAULT_DELETE_IN_FLIGHT_TRANSACTIONS,
+) -> DeleteStats:
     """
     Kazoo already has the ability to recursively delete nodes, but the implementation is quite naive
     and has poor performance with a large number of nodes being deleted.
 
     In this implementation we unite the nodes to delete in transactions to do single operation for batch of nodes.
-    To delete in correct order first of all we perform topological sort using bfs approach.
+    The tree is traversed in depth-first order listing up to `window` nodes concurrently, and nodes are
+    deleted in post-order as soon as their children are deleted, so the whole tree is never kept in memory.
+    Up to `max_in_flight_transactions` transactions are committed concurrently.
     """
-
+    stats = DeleteStats()
     if len(paths) == 0:
-        return
+        return stats
 
     logging.debug("Node to recursive delete {}", paths)
     paths = remove_subpaths(paths)
-    nodes_to_delete = []
-    queue = deque(paths)
 
-    while queue:
-        path = queue.popleft()
-        nodes_to_delete.append(path)
-        for child_node in get_children(zk, path):
-            queue.append(os.path.join(path, child_node))
+    deleter = _PostOrderDeleter(zk, paths, dry_run, max_in_flight_transactions, stats)
+    for node in walk_zk_tree(zk, paths, order=WalkOrder.DFS, window=window):
+        deleter.add(node)
+    deleter.finish()
 
-    logging.info("Got {} nodes to remove.", len(nodes_to_delete))
     if dry_run:
-        logging.info("Would delete nodes: {}", nodes_to_delete)
-        return
+        logging.info("Would delete {} nodes", stats.deleted)
+    else:
+        logging.info("Deleted {}", stats)
+    return stats
 
-    # When number of nodes to delete is large preferable to use greater transaction size.
-    operations_in_transaction = max(100, int(sqrt(len(nodes_to_delete))))
 
-    for transaction_orerations in chunked(
-        reversed(nodes_to_delete), operations_in_transaction
-    ):
-        delete_nodes_transaction(zk, transaction_orerations)
+@dataclass
+class SubtreeEstimate:
+    """
+    Estimated number of nodes and data size of ZooKeeper subtrees.
+    """
+
+    nodes: float = 0.0
+    data_bytes: float = 0.0
+    exact: bool = True
+
+    def __str__(self) -> str:
+        approx = "" if self.exact else "~"
+        return (
+            f"{approx}{round(self.nodes)} nodes, "
+            f"{approx}{format_bytes(round(self.data_bytes))} of data"
+        )
+
+
+def estimate_zk_subtrees(
+    zk: KazooClient,
+    paths: List[str],
+    sample_size: int = DEFAULT_ESTIMATE_SAMPLE_SIZE,
+    window: int = DEFAULT_WALK_WINDOW,
+) -> SubtreeEstimate:
+    """
+    Estimate the number of nodes and data size of subtrees with the root paths.
+
+    Nodes are sized by `numChildren` and `dataLength` of their stats, so children are listed only for
+    nodes having them. Up to `sample_size` randomly chosen children of a node are visited, and their
+    sizes are scaled to all children. The estimate is exact if no node has more children than
+    `sample_size`. Subtrees are visited in depth-first order, so the number of pending nodes is
+    bounded by the depth of the subtrees multiplied by `sample_size`.
+    """
+    estimate = SubtreeEstimate()
+    # Nodes to visit: (path, number of nodes represented by the node, stat if already known).
+    pending: List[Tuple[str, float, Optional[ZnodeStat]]] = [
+        (path, 1.0, None) for path in reversed(remove_subpaths(list(paths)))
+    ]
+    in_flight: Deque[Tuple[str, float, Optional[ZnodeStat], Any]] = deque()
+
+    def _send_requests() -> None:
+        while pending and len(in_flight) < window:
+            path, weight, stat = pending.pop()
+            if stat is None:
+                request = zk.exists_async(path)
+            else:
+                request = zk.get_children_async(path)
+            in_flight.append((path, weight, stat, request))
+
+    _send_requests()
+    while in_flight:
+        path, weight, stat, request = in_flight.popleft()
+        try:
+            result = request.get()
+        except NoNodeError:
+            result = None
+
+        if stat is None:
+            if result is not None:
+                estimate.nodes += weight
+                estimate.data_bytes += weight * result.dataLength
+                if result.numChildren:
+                    pending.append((path, weight, result))
+        elif result:
+            sampled = result
+            if len(result) > sample_size:
+                sampled = random.sample(result, sample_size)
+                estimate.exact = False
+            child_weight = weight * len(result) / len(sampled)
+            pending.extend(
+                (os.path.join(path, child), child_weight, None) for child in sampled
+            )
+
+        _send_requests()
+
+    return estimate
+
+
+def estimate_matching_zk_subtrees(
+    zk: KazooClient,
+    matcher: PathLevelsMatcher,
+    sample_size: int = DEFAULT_ESTIMATE_SAMPLE_SIZE,
+    window: int = DEFAULT_WALK_WINDOW,
+) -> SubtreeEstimate:
+    """
+    Estimate the number of nodes and data size of subtrees with the root paths matching the matcher.
+
+    The tree is traversed level by level from the start path of the matcher. Up to `sample_size`
+    nodes are chosen uniformly at random among children of the visited nodes passing the matcher,
+    and sizes of their subtrees are scaled to all of them. So the number of requests is bounded
+    by the number of levels multiplied by `sample_size`, regardless of the number of matching nodes.
+    """
+    estimate = SubtreeEstimate()
+    # Nodes of the current level: path -> number of nodes represented by the node.
+    level: Dict[str, float] = {matcher.start_path: 1.0}
+    while level:
+        matched = {
+            path: weight for path, weight in level.items() if matcher.matches(path)
+        }
+        for path, stat in bulk_get_zk_stats(zk, matched, window).items():
+            subtree = SubtreeEstimate(nodes=1.0, data_bytes=stat.dataLength)
+            if stat.numChildren:
+                subtree = estimate_zk_subtrees(zk, [path], sample_size, window)
+            estimate.nodes += matched[path] * subtree.nodes
+            estimate.data_bytes += matched[path] * subtree.data_bytes
+            estimate.exact = estimate.exact and subtree.exact
+
+        to_expand = [
+            path for path in level if path not in matched and matcher.should_visit(path)
+        ]
+        # Reservoir sampling of children passing the matcher.
+        sample: List[Tuple[str, float]] = []
+        count = 0
+        for path, children in _bulk_read(
+            zk.get_children_async, to_expand, window
+        ).items():
+            for child in children:
+                child_path = os.path.join(path, child)
+                if not matcher.should_visit(child_path):
+                    continue
+                count += 1
+                if len(sample) < sample_size:
+                    sample.append((child_path, level[path]))
+                else:
+                    i = random.randrange(count)
+                    if i < sample_size:
+                        sample[i] = (child_path, level[path])
+
+        scale = count / len(sample) if sample else 1.0
+        if scale > 1:
+            estimate.exact = False
+        level = {path: weight * scale for path, weight in sample}
+
+    return estimate
+
+
+def bulk_get_zk_nodes(
+    zk: KazooClient, paths: Iterable[str], window: int = DEFAULT_WALK_WINDOW
+) -> Dict[str, bytes]:
+    """
+    Get data of nodes sending up to `window` requests concurrently.
+
+    Returns data by path. Nodes that don't exist are omitted.
+    """
+    return {
+        path: data
+        for path, (data, _) in _bulk_read(zk.get_async, paths, window).items()
+    }
+
+
+def bulk_get_zk_stats(
+    zk: KazooClient, paths: Iterable[str], window: int = DEFAULT_WALK_WINDOW
+) -> Dict[str, ZnodeStat]:
+    """
+    Get stats of nodes sending up to `window` requests concurrently.
+
+    Returns stats by path. Nodes that don't exist are omitted.
+    """
+    return {
+        path: stat
+        for path, stat in _bulk_read(zk.exists_async, paths, window).items()
+        if stat is not None
+    }
+
+
+def _bulk_read(
+    send: Callable[[str], Any], paths: Iterable[str], window: int
+) -> Dict[str, Any]:
+    result: Dict[str, Any] = {}
+    in_flight: Deque[Tuple[str, Any]] = deque()
+
+    def _complete_oldest() -> None:
+        path, request = in_flight.popleft()
+        try:
+            result[path] = request.get()
+        except NoNodeError:
+            pass
+
+    for path in paths:
+        if len(in_flight) >= window:
+            _complete_oldest()
+        in_flight.append((path, send(path)))
+    while in_flight:
+        _complete_oldest()
+
+    return result
+
+
+def bulk_create_zk_nodes(
+    zk: KazooClient,
+    nodes: Iterable[Tuple[str, bytes]],
+    max_in_flight_transactions: int = DEFAULT_DELETE_IN_FLIGHT_TRANSACTIONS,
+) -> None:
+    """
+    Create nodes with given values packing them into multi-op transactions.
+
+    Transactions are limited by the number of operations and the request size and are
+    committed concurrently, so parents must exist or be created in preceding transactions.
+    Nodes are not created atomically: on failure the error of the first failed transaction is raised,
+    while nodes of other transactions may be already created.
+    """
+    _bulk_write(
+        zk, "create", nodes, max_in_flight_transactions=max_in_flight_transactions
+    )
+
+
+def bulk_set_zk_nodes(
+    zk: KazooClient,
+    nodes: Iterable[Tuple[str, bytes]],
+    max_in_flight_transactions: int = DEFAULT_DELETE_IN_FLIGHT_TRANSACTIONS,
+) -> None:
+    """
+    Set values of nodes packing updates into multi-op transactions. See `bulk_create_zk_nodes`.
+    """
+    _bulk_write(
+        zk, "set_data", nodes, max_in_flight_transactions=max_in_flight_transactions
+    )
+
+
+def _bulk_write(
+    zk: KazooClient,
+    operation: str,
+    nodes: Iterable[Tuple[str, bytes]],
+    max_in_flight_transactions: int,
+) -> None:
+    in_flight: Deque[Tuple[List[str], Any]] = deque()
+
+    def _complete_oldest() -> None:
+        paths, request = in_flight.popleft()
+        for path, result in zip(paths, request.get()):
+            if isinstance(result, Exception) and not isinstance(
+                result, RolledBackError
+            ):
+                logging.error("Failed to {} node {}: {!r}", operation, path, result)
+                raise result
+
+    def _send(batch: List[Tuple[str, bytes]]) -> None:
+        if len(in_flight) >= max_in_flight_transactions:
+            _complete_oldest()
+        transaction = zk.transaction()
+        for path, value in batch:
+            getattr(transaction, operation)(path, value)
+        in_flight.append(([path for path, _ in batch], transaction.commit_async()))
+
+    batch: List[Tuple[str, bytes]] = []
+    batch_size = 0
+    for path, value in nodes:
+        size = len(path.encode()) + len(value) + TRANSACTION_OPERATION_OVERHEAD_BYTES
+        if batch and (
+            len(batch) >= WRITE_TRANSACTION_MAX_OPERATIONS
+            or batch_size + size > WRITE_TRANSACTION_MAX_BYTES
+        ):
+            _send(batch)
+            batch, batch_size = [], 0
+        batch.append((path, value))
+        batch_size += size
+    if batch:
+        _send(batch)
+
+    while in_flight:
+        _complete_oldest()
 
 
 def escape_for_zookeeper(s: str) -> str:
@@ -461,27 +1112,44 @@ def zk_client(ctx: Context) -> Generator[KazooClient, None, None]:
     """
     Context manager for providing a started ZooKeeper client.
 
-    Uses an existing client from the context if present,
-    otherwise creates, starts, and injects a new one for the context.
-    Cleans up (stops and removes) the client on exit if it was created here.
+    The client is created and started on first use and cached in the context, so all calls
+    within the command share the same session. Kazoo reconnects and reestablishes the lost session
+    by itself, so the client is started again only if it was closed. The client is stopped on close
+    of the root context or by `stop_zk_client`.
     """
-
-    if "zk_client" in ctx.obj:
-        yield ctx.obj["zk_client"]
-    else:
-        zk = _get_zk_client(ctx)
-        zk.start()
-        try:
+    with _zk_client_lock:
+        zk = ctx.obj.get("zk_client")
+        if zk is None:
+            zk = _get_zk_client(ctx)
             ctx.obj["zk_client"] = zk
-            yield zk
-        finally:
-            del ctx.obj["zk_client"]
+            ctx.find_root().call_on_close(lambda: stop_zk_client(ctx))
+        start_lock = ctx.obj.setdefault("zk_client_start_lock", threading.Lock())
+
+    # The client is started outside of the global lock, so waiting for the connection doesn't
+    # block clients of other contexts.
+    if isinstance(zk, KazooClient) and zk.client_state == KeeperState.CLOSED:
+        with start_lock:
+            if zk.client_state == KeeperState.CLOSED:
+                zk.start()
+
+    yield zk
+
+
+def stop_zk_client(ctx: Context) -> None:
+    """
+    Stop and remove ZooKeeper client cached in the context.
+    """
+    with _zk_client_lock:
+        zk = ctx.obj.pop("zk_client", None)
+        ctx.obj.pop("zk_client_start_lock", None)
+        if isinstance(zk, KazooClient):
             zk.stop()
+            zk.close()
 
 
 def _get_zk_client(ctx: Context) -> KazooClient:
     """
-    Create and return KazooClient.
+    Create and return KazooClient. Statistics of its requests are accumulated in the context.
     """
     args = ctx.obj.get("zk_client_args", {})
     host = args.get("host")
@@ -521,8 +1189,9 @@ def _get_zk_client(ctx: Context) -> KazooClient:
     if zkcli_identity is not None:
         auth_data = [("digest", zkcli_identity)]
 
-    return KazooClient(
+    return InstrumentedKazooClient(
         connect_str,
+        request_stats=ctx.obj.setdefault("zk_request_stats", ZookeeperRequestStats()),
         auth_data=auth_data,
         timeout=timeout,
         logger=logging.getNativeLogger("kazoo"),
@@ -2,15 +2,12 @@ import ast
 import os
 import re
 import time
-from collections import defaultdict, deque
-from dataclasses import dataclass
-from functools import partial
+from collections import defaultdict
 from typing import (
     Any,
     Callable,
-    Deque,
     Dict,
-    Generator,
+    Iterable,
     List,
     Optional,
     Tuple,
@@ -19,14 +16,6 @@ from typing import (
 from click import BadParameter, Context
 from kazoo.client import KazooClient
 from kazoo.exceptions import NoNodeError
-from kazoo.interfaces import IAsyncResult
-from tenacity import (
-    retry,
-    retry_if_exception_message,
-    retry_if_exception_type,
-    stop_after_attempt,
-    wait_random_exponential,
-)
 
 from ch_tools.chadmin.internal.database_replica import system_database_drop_replica
 from ch_tools.chadmin.internal.system import match_ch_version
@@ -40,21 +29,37 @@ from ch_tools.chadmin.internal.zero_copy import (
     _get_zero_copy_zookeeper_path_for_disk_type,
 )
 from ch_tools.chadmin.internal.zookeeper import (
+    PathLevelsMatcher,
+    SubtreeEstimate,
+    WalkPrefetch,
+    ZookeeperNode,
+    bulk_get_zk_stats,
     delete_recursive,
     delete_zk_nodes,
     escape_for_zookeeper,
+    estimate_matching_zk_subtrees,
+    estimate_zk_subtrees,
     find_leafs_and_nodes,
     find_paths,
     format_path,
     get_children,
+    get_delete_in_flight_transactions,
+    get_walk_window,
+    walk_zk_tree,
     zk_client,
 )
 from ch_tools.common import logging
 from ch_tools.common.clickhouse.client import ClickhouseError
-from ch_tools.common.process_pool import WorkerTask, execute_tasks_in_parallel
+from ch_tools.common.process_pool import (
+    RetryPolicy,
+    TaskCheckpoint,
+    WorkerTask,
+    execute_tasks_with_retries,
+)
 
 REPLICATED_DATABASE_MARKER = bytes("DatabaseReplicated", "utf-8")
 ZERO_COPY_LOCKS_TO_DELETE_BATCH = 10000
+ZERO_COPY_LOCKS_ESTIMATE_SAMPLE_SIZE = 1000
 
 
 def replace_macros_in_nodes(func: Callable) -> Callable:
@@ -65,146 +70,6 @@ def replace_macros_in_nodes(func: Callable) -> Callable:
     return wrapper
 
 
-@dataclass
-class ZookeeperNode:
-    path: str
-    children: List[str]
-
-
-@dataclass
-class GetChildrenTask:
-    path: str
-    get_children_request: IAsyncResult
-
-
-class ZookeeperTreeInspector:
-    """
-    Class for traversal zookeeper tree.
-    It is based on 3 queues (pending, active, finished). We are performing several (max_parrallel_tasks) async request,
-    so active queue has limited size.
-    Note: It doesn't inserts nodes, user should do it manually.
-
-    There are two main methods:
-        add() -> add list nodes to get children.
-        get() -> get the one node with list of children.
-    """
-
-    def __init__(self, zk: KazooClient, max_parrallel_tasks: int = 5) -> None:
-        self._zk_client = zk
-        self._max_active_tasks = max_parrallel_tasks
-
-        self._queue_pending: Deque[str] = deque()
-        self._queue_active: Deque[GetChildrenTask] = deque(
-            maxlen=self._max_active_tasks
-        )
-        self._queue_finished: Deque[ZookeeperNode] = deque()
-
-    def _update_pending_queue(self) -> None:
-        """
-        Moves tasks to active and creates async get_children requests.
-        """
-
-        number_tasks_to_move_to_active = min(
-            len(self._queue_pending), self._max_active_tasks - len(self._queue_active)
-        )
-
-        for _ in range(0, number_tasks_to_move_to_active):
-            path = self._queue_pending.popleft()
-            async_task = self._zk_client.get_children_async(path)
-            self._queue_active.append(GetChildrenTask(path, async_task))
-
-    def _update_active_queue(self) -> None:
-        """
-        Moves executed tasks from active to finished queues.
-        """
-
-        while (
-            len(self._queue_active)
-            and self._queue_active[0].get_children_request.ready()
-        ):
-            async_task = self._queue_active.popleft()
-            if async_task.get_children_request.successful():
-                self._queue_finished.append(
-                    ZookeeperNode(
-                        async_task.path, async_task.get_children_request.get()
-                    )
-                )
-            else:
-                if isinstance(async_task.get_children_request.exception, NoNodeError):
-                    logging.warning(
-                        "Ignoring node {}, because someone delete it", async_task.path
-                    )
-                    continue
-                raise async_task.get_children_request.exception
-
-    def _update_queues(self) -> None:
-        """
-        Perform queues updates.
-        """
-
-        self._update_active_queue()
-        self._update_pending_queue()
-
-    def _exists_tasks_to_do(self) -> bool:
-        """
-        Check that exists tasks in queues.
-        """
-
-        return (
-            len(self._queue_finished)
-            + len(self._queue_pending)
-            + len(self._queue_active)
-        ) > 0
-
-    def _wait_for_task_finished(self) -> None:
-        """
-        Wait until one of the tasks will be finished if it's possible.
-        """
-
-        while self._exists_tasks_to_do() and len(self._queue_finished) == 0:
-            self._update_pending_queue()
-            self._queue_active[0].get_children_request.wait()
-            self._update_active_queue()
-
-    def _get_impl(self) -> Optional[ZookeeperNode]:
-        """
-        Implementation of get functions.
-        """
-        self._update_queues()
-
-        if len(self._queue_finished):
-            return self._queue_finished.popleft()
-
-        self._wait_for_task_finished()
-
-        if not self._exists_tasks_to_do():
-            return None
-        return self._queue_finished.popleft()
-
-    def add(self, pathes_to_inspect: List[str]) -> None:
-        """
-        Add list of paths in pending queue.
-        """
-        self._queue_pending.extend(pathes_to_inspect)
-        self._update_queues()
-
-    def get(self) -> Optional[ZookeeperNode]:
-        """
-        Get one finished task, if exists.
-        """
-        return self._get_impl()
-
-    def tree_iterator(self) -> Generator[ZookeeperNode, None, None]:
-        """
-        Iterator for tree.
-        """
-        while True:
-            next_zk_node = self.get()
-            if not next_zk_node:
-                return
-            yield next_zk_node
-
-
 # pylint: disable=too-many-statements
 @replace_macros_in_nodes
 def clean_zk_metadata_for_hosts(
@@ -216,39 +81,38 @@ def clean_zk_metadata_for_hosts(
     cleanup_ddl_queue: bool = True,
     zk_ddl_query_path: Optional[str] = None,
     dry_run: bool = False,
+    estimate: bool = False,
 ) -> None:
     """
     Perform cleanup in zookeeper after deleting hosts in the cluster or whole cluster deleting.
+
+    If `estimate` is set, the number and data size of replica nodes to remove are reported instead.
     """
 
     def _traverse_zk_tree_and_find_objects(
         zk: KazooClient,
         zk_root_path: str,
         excluded_paths: List[str],
-        max_workers: int = 4,
     ) -> List[ZookeeperNode]:
         """
         Traverse zk tree and find replicated objects.
         """
 
-        inspector = ZookeeperTreeInspector(zk, max_parrallel_tasks=max_workers)
-        inspector.add([zk_root_path])
-
-        objects_paths: List[ZookeeperNode] = []
-
         excluded_regexp = re.compile("|".join(excluded_paths))
 
-        for zk_node in inspector.tree_iterator():
-            if "replicas" in zk_node.children:
-                objects_paths.append(zk_node)
-                continue
-
-            children_to_traverse: List[str] = []
-            for children in zk_node.children:
-                children_full_path = os.path.join(zk_node.path, children)
-                if not re.match(excluded_regexp, children_full_path):
-                    children_to_traverse.append(children_full_path)
-            inspector.add(children_to_traverse)
+        # Data of nodes is used to distinguish replicated databases from replicated tables.
+        objects_paths: List[ZookeeperNode] = [
+            zk_node
+            for zk_node in walk_zk_tree(
+                zk,
+                [zk_root_path],
+                window=get_walk_window(ctx),
+                prefetch=WalkPrefetch.DATA,
+                expand=lambda zk_node: "replicas" not in zk_node.children,
+                child_filter=lambda path: not excluded_regexp.match(path),
+            )
+            if "replicas" in zk_node.children
+        ]
 
         logging.info("Found {} replicated objects", len(objects_paths))
         return objects_paths
@@ -259,7 +123,6 @@ def clean_zk_metadata_for_hosts(
         collect_tables: bool,
         collect_database: bool,
         excluded_paths: List[str],
-        max_workers: int = 4,
     ) -> Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, List[str]]]:
         """
         Gets list of all replicated objects in zk, determine tables and databases for cleanup.
@@ -269,7 +132,6 @@ def clean_zk_metadata_for_hosts(
             zk,
             zk_root_path,
             excluded_paths=excluded_paths,
-            max_workers=max_workers,
         )
 
         nodes_set = set(nodes)
@@ -286,16 +148,7 @@ def clean_zk_metadata_for_hosts(
             #
             # Replicated Database
             # https://github.com/ClickHouse/ClickHouse/blob/eb984db51ea0309dd607eaf98280315b42347f65/src/Databases/DatabaseReplicated.cpp#L1529
-            try:
-                is_database = (
-                    zk.get(replicated_object.path)[0] == REPLICATED_DATABASE_MARKER
-                )
-            except NoNodeError:
-                logging.warning(
-                    "Someone delete node {}, ignore it", replicated_object.path
-                )
-                continue
-
+            is_database = replicated_object.data == REPLICATED_DATABASE_MARKER
             is_table = not is_database
             if is_database and not collect_database:
                 continue
@@ -332,7 +185,6 @@ def clean_zk_metadata_for_hosts(
         table_zk_path: str,
         replica: str,
         dry_run: bool,
-        retry_decorator: Any,
     ) -> None:
         """
         Workaround for the problem from:
@@ -345,51 +197,40 @@ def clean_zk_metadata_for_hosts(
         if len(list_replicas):
             database = list_replicas[0]["database"]
             table = list_replicas[0]["table"]
-            retry_decorator(system_table_drop_replica)(
-                ctx, replica, database, table, dry_run
-            )
+            system_table_drop_replica(ctx, replica, database, table, dry_run)
         else:
-            retry_decorator(system_table_drop_replica_by_zk_path)(
-                ctx, replica, table_zk_path, dry_run
-            )
+            system_table_drop_replica_by_zk_path(ctx, replica, table_zk_path, dry_run)
 
     def _drop_database_replica_task(
         ctx: Context,
         database_zk_path: str,
         replica: str,
         dry_run: bool,
-        retry_decorator: Any,
     ) -> None:
         """
-        Task for the system drop database replica query with retry.
+        Task for the system drop database replica query.
         """
-        retry_decorator(system_database_drop_replica)(
-            ctx, database_zk_path, replica, dry_run
-        )
+        system_database_drop_replica(ctx, database_zk_path, replica, dry_run)
 
     def cleanup_tables_and_databases(zk: KazooClient) -> None:
         """
         Collects all objects that have nodes to be deleted and runs drop replica for them.
+
+        Drops failed because the replica is still active are retried with a delay without
+        occupying workers. The number of concurrent drops of objects sharing the parent node
+        is limited.
         """
         clean_zk_metadata_config = ctx.obj["config"]["chadmin"]["zookeeper"][
             "clean_zk_metadata_for_hosts"
         ]
         max_workers: int = clean_zk_metadata_config["workers"]
-        min_wait_time_sec: int = clean_zk_metadata_config["retry_min_wait_sec"]
-        max_wait_time_sec: int = clean_zk_metadata_config["retry_max_wait_sec"]
-        max_retries: int = clean_zk_metadata_config["max_retries"]
         excluded_paths: List[str] = clean_zk_metadata_config["excluded_paths"]
 
-        retry_decorator = retry(
-            retry=(
-                retry_if_exception_type(ClickhouseError)
-                & (
-                    retry_if_exception_message(match=".*because it's active.*")
-                    | retry_if_exception_message(match=".*is active.*")
-                )
-            ),
-            wait=wait_random_exponential(min=min_wait_time_sec, max=max_wait_time_sec),
-            stop=stop_after_attempt(max_retries),
+        retry_policy = RetryPolicy(
+            should_retry=_is_replica_active_error,
+            min_wait=clean_zk_metadata_config["retry_min_wait_sec"],
+            max_wait=clean_zk_metadata_config["retry_max_wait_sec"],
+            max_attempts=clean_zk_metadata_config["max_retries"],
         )
 
         database_to_drop, tables_to_drop = _collect_objects_for_cleanup(
@@ -398,23 +239,38 @@ def clean_zk_metadata_for_hosts(
             collect_database=cleanup_database,
             collect_tables=cleanup_tables,
             excluded_paths=excluded_paths,
-            max_workers=max_workers,
         )
 
+        if estimate:
+            replica_paths = [
+                os.path.join(zk_table_path, "replicas", node)
+                for zk_table_path, list_of_nodes in tables_to_drop.items()
+                for node in list_of_nodes
+            ] + [
+                os.path.join(zk_database_path, "replicas", f"{node[0]}|{node[1]}")
+                for zk_database_path, list_of_nodes in database_to_drop.items()
+                for node in list_of_nodes
+            ]
+            logging.info(
+                "Metadata of {} replicas to remove: {}",
+                len(replica_paths),
+                estimate_zk_subtrees(zk, replica_paths, window=get_walk_window(ctx)),
+            )
+            return
+
         tasks: List[WorkerTask] = []
         if cleanup_tables:
             for zk_table_path, list_of_nodes in tables_to_drop.items():
                 for node in list_of_nodes:
                     tasks.append(
                         WorkerTask(
-                            f"drop_replica_task_{node}",
+                            f"drop_replica_task_{zk_table_path}_{node}",
                             _drop_table_replica_task,
                             {
                                 "ctx": ctx,
                                 "table_zk_path": zk_table_path,
                                 "replica": node,
                                 "dry_run": dry_run,
-                                "retry_decorator": retry_decorator,
                             },
                         )
                     )
@@ -426,14 +282,13 @@ def clean_zk_metadata_for_hosts(
                         replica = f"{node[0]}|{node[1]}"
                         tasks.append(
                             WorkerTask(
-                                f"system_database_drop_replica_{replica}",
+                                f"system_database_drop_replica_{zk_database_path}_{replica}",
                                 _drop_database_replica_task,
                                 {
                                     "ctx": ctx,
                                     "database_zk_path": zk_database_path,
                                     "replica": replica,
                                     "dry_run": dry_run,
-                                    "retry_decorator": retry_decorator,
                                 },
                             )
                         )
@@ -442,7 +297,37 @@ def clean_zk_metadata_for_hosts(
                     "Ch version is too old, will skip replicated database cleanup."
                 )
 
-        execute_tasks_in_parallel(tasks, max_workers=max_workers)
+        checkpoint = None
+        checkpoint_path = clean_zk_metadata_config["checkpoint_path"]
+        if checkpoint_path and not dry_run:
+            checkpoint = TaskCheckpoint(
+                checkpoint_path, {"nodes": sorted(nodes), "root_path": zk_root_path}
+            )
+            if checkpoint.completed:
+                _verify_checkpoint(zk, checkpoint, tasks, window=get_walk_window(ctx))
+                logging.info(
+                    "Resuming from checkpoint {}, {} of {} replicas are already dropped",
+                    checkpoint_path,
+                    len(checkpoint.completed),
+                    len(tasks),
+                )
+
+        completed = False
+        try:
+            execute_tasks_with_retries(
+                tasks,
+                retry_policy,
+                max_workers=max_workers,
+                get_group=_get_object_zk_path_prefix,
+                max_workers_per_group=clean_zk_metadata_config[
+                    "max_workers_per_zk_path_prefix"
+                ],
+                checkpoint=checkpoint,
+            )
+            completed = True
+        finally:
+            if checkpoint is not None:
+                checkpoint.close(remove=completed)
 
     def _get_hosts_from_ddl(zk: KazooClient, ddl_task_path: str) -> Dict[str, str]:
         """
@@ -561,7 +446,7 @@ def clean_zk_metadata_for_hosts(
     with zk_client(ctx) as zk:
         cleanup_tables_and_databases(zk)
 
-        if cleanup_ddl_queue:
+        if cleanup_ddl_queue and not estimate:
             if not zk_ddl_query_path:
                 raise BadParameter(
                     "Trying to clean ddl queue, but the ddl queue path is not specified."
@@ -570,64 +455,179 @@ def clean_zk_metadata_for_hosts(
             mark_finished_ddl_query(zk)
 
 
-def _clean_zero_copy_locks_for_table_and_part(
+def _is_replica_active_error(e: Exception) -> bool:
+    return isinstance(e, ClickhouseError) and bool(
+        re.search("because it's active|is active", str(e))
+    )
+
+
+def _get_object_zk_path(task: WorkerTask) -> str:
+    return task.kwargs.get("table_zk_path") or task.kwargs["database_zk_path"]
+
+
+def _get_object_zk_path_prefix(task: WorkerTask) -> str:
+    return os.path.dirname(_get_object_zk_path(task).rstrip("/"))
+
+
+def _verify_checkpoint(
+    zk: KazooClient, checkpoint: TaskCheckpoint, tasks: List[WorkerTask], window: int
+) -> None:
+    """
+    Discard drops from the checkpoint whose replicas still exist in ZooKeeper, so they are executed again.
+    """
+    replica_paths = {
+        task.identifier: os.path.join(
+            _get_object_zk_path(task), "replicas", task.kwargs["replica"]
+        )
+        for task in tasks
+        if task.identifier in checkpoint.completed
+    }
+    existing = bulk_get_zk_stats(zk, replica_paths.values(), window=window)
+    for identifier, path in replica_paths.items():
+        if path in existing:
+            logging.warning(
+                "Replica {} from checkpoint still exists, it will be dropped again",
+                path,
+            )
+            checkpoint.completed.discard(identifier)
+
+
+def _get_zero_copy_locks_paths_for_table_and_part(
+    ctx: Context,
     zk: KazooClient,
     zero_copy_path: str,
     table_uuid: Optional[str],
     part_id: Optional[str],
-    dry_run: bool,
-) -> None:
+) -> List[str]:
     """
     No need to find every replica's path. Removing part's or table's directory is enough.
     """
     if part_id:
         template = re.escape(rf"{zero_copy_path}/{table_uuid}/{part_id}")
-        paths = find_paths(zk, zero_copy_path, [template])
+        paths = find_paths(zk, zero_copy_path, [template], window=get_walk_window(ctx))
         if not paths:
-            return
+            return []
         table_path = os.path.dirname(paths[0])
         # Checking if we can just delete the table's directory instead
         if len(get_children(zk, table_path)) == 1:
             paths = [table_path]
-    else:
-        paths = [f"{zero_copy_path}/{table_uuid}"] if table_uuid else []
+        return paths
 
-    delete_recursive(zk, paths, dry_run)
+    return [f"{zero_copy_path}/{table_uuid}"] if table_uuid else []
 
 
-def _clean_zero_copy_locks_for_remote_path_and_replica(
-    zk: KazooClient,
+def _get_zero_copy_locks_matcher(
     zero_copy_path: str,
     table_uuid: Optional[str],
     part_id: Optional[str],
     remote_path_prefix: Optional[str],
     replica_name: Optional[str],
-    dry_run: bool,
-) -> None:
+) -> PathLevelsMatcher:
     """
-    Find and delete all zero-copy locks for given replica.
+    Return matcher of zero-copy lock paths for given replica.
+
+    The lock path template is matched level by level, so subtrees are pruned at the first
+    mismatching level and the traversal starts from the deepest node defined by fixed levels.
     """
-    anything = r".+"
-    table_uuid = re.escape(table_uuid) if table_uuid else anything
-    part_id = re.escape(part_id) if part_id else anything
-    remote_path = (
-        rf"{re.escape(remote_path_prefix)}.*" if remote_path_prefix else anything
+    anything = re.compile(r".+")
+    return PathLevelsMatcher(
+        zero_copy_path,
+        [
+            table_uuid or anything,
+            part_id or anything,
+            (
+                re.compile(rf"{re.escape(remote_path_prefix)}.*")
+                if remote_path_prefix
+                else anything
+            ),
+            replica_name or anything,
+        ],
     )
-    replica_name = re.escape(replica_name) if replica_name else anything
-    template = rf"{zero_copy_path}/{table_uuid}/{part_id}/{remote_path}/{replica_name}"
-    predicate = partial(re.match, template)
 
+
+def _clean_zero_copy_locks_for_remote_path_and_replica(
+    ctx: Context, zk: KazooClient, matcher: PathLevelsMatcher, dry_run: bool
+) -> None:
+    """
+    Find and delete all zero-copy locks matching the matcher.
+    """
     paths_to_delete = []
-    for path_to_delete in find_leafs_and_nodes(zk, zero_copy_path, predicate):
-        # Do not delete root path
-        if zero_copy_path == path_to_delete:
-            continue
+    for path_to_delete in _find_zero_copy_locks(ctx, zk, matcher):
         paths_to_delete.append(path_to_delete)
         if len(paths_to_delete) >= ZERO_COPY_LOCKS_TO_DELETE_BATCH:
-            delete_recursive(zk, paths_to_delete, dry_run)
+            _delete_recursive(ctx, zk, paths_to_delete, dry_run)
             paths_to_delete = []
 
-    delete_recursive(zk, paths_to_delete, dry_run)
+    _delete_recursive(ctx, zk, paths_to_delete, dry_run)
+
+
+def _estimate_zero_copy_locks_for_remote_path_and_replica(
+    ctx: Context, zk: KazooClient, matcher: PathLevelsMatcher
+) -> SubtreeEstimate:
+    """
+    Locks are estimated by a sample of subtrees on every level of the lock path, so only a fraction
+    of nodes visited by the cleanup are read. Empty ancestors removed along with locks are not counted.
+    """
+    return estimate_matching_zk_subtrees(
+        zk,
+        matcher,
+        sample_size=ZERO_COPY_LOCKS_ESTIMATE_SAMPLE_SIZE,
+        window=get_walk_window(ctx),
+    )
+
+
+def _find_zero_copy_locks(
+    ctx: Context, zk: KazooClient, matcher: PathLevelsMatcher
+) -> Iterable[str]:
+    if matcher.start_path != matcher.root_path and not zk.exists(matcher.start_path):
+        return
+
+    ancestors: List[str] = []
+    for path in find_leafs_and_nodes(
+        zk,
+        matcher.start_path,
+        matcher.matches,
+        window=get_walk_window(ctx),
+        child_filter=matcher.should_visit,
+    ):
+        # Do not delete root path
+        if path == matcher.root_path:
+            continue
+        # Ancestors are found before the start path is yielded, as the consumer may delete it.
+        if path == matcher.start_path:
+            ancestors = _find_single_child_ancestors(zk, matcher)
+        yield path
+
+    yield from ancestors
+
+
+def _find_single_child_ancestors(
+    zk: KazooClient, matcher: PathLevelsMatcher
+) -> List[str]:
+    """
+    Return ancestors of the start path below the root path, whose only descendant is the start path.
+    """
+    ancestors = []
+    path = matcher.start_path
+    while os.path.dirname(path) != matcher.root_path:
+        name = os.path.basename(path)
+        path = os.path.dirname(path)
+        if zk.get_children(path) != [name]:
+            break
+        ancestors.append(path)
+    return ancestors
+
+
+def _delete_recursive(
+    ctx: Context, zk: KazooClient, paths: List[str], dry_run: bool
+) -> None:
+    delete_recursive(
+        zk,
+        paths,
+        dry_run,
+        window=get_walk_window(ctx),
+        max_in_flight_transactions=get_delete_in_flight_transactions(ctx),
+    )
 
 
 def _validate_args(
@@ -678,9 +678,12 @@ def delete_zero_copy_locks(
     remote_path_prefix: Optional[str] = None,
     replica_name: Optional[str] = None,
     dry_run: bool = False,
+    estimate: bool = False,
 ) -> None:
     """
     Recursively find all zero-copy lock's paths by regex and delete them.
+
+    If `estimate` is set, the number and data size of nodes to delete are reported instead.
     """
     _validate_args(ctx, zero_copy_path, table_uuid, part_id, remote_path_prefix)
 
@@ -689,17 +692,29 @@ def delete_zero_copy_locks(
     )
 
     with zk_client(ctx) as zk:
+        estimate_result: Optional[SubtreeEstimate] = None
         if replica_name or remote_path_prefix:
-            _clean_zero_copy_locks_for_remote_path_and_replica(
-                zk,
-                zero_copy_path,
-                table_uuid,
-                part_id,
-                remote_path_prefix,
-                replica_name,
-                dry_run,
+            matcher = _get_zero_copy_locks_matcher(
+                zero_copy_path, table_uuid, part_id, remote_path_prefix, replica_name
             )
+            if estimate:
+                estimate_result = _estimate_zero_copy_locks_for_remote_path_and_replica(
+                    ctx, zk, matcher
+                )
+            else:
+                _clean_zero_copy_locks_for_remote_path_and_replica(
+                    ctx, zk, matcher, dry_run
+                )
         else:
-            _clean_zero_copy_locks_for_table_and_part(
-                zk, zero_copy_path, table_uuid, part_id, dry_run
+            paths = _get_zero_copy_locks_paths_for_table_and_part(
+                ctx, zk, zero_copy_path, table_uuid, part_id
             )
+            if estimate:
+                estimate_result = estimate_zk_subtrees(
+                    zk, paths, window=get_walk_window(ctx)
+                )
+            else:
+                _delete_recursive(ctx, zk, paths, dry_run)
+
+        if estimate_result is not None:
+            logging.info("Zero-copy locks to delete: {}", estimate_result)
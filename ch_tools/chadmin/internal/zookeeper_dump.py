@@ -0,0 +1,294 @@
+"""
+Snapshot of ZooKeeper subtree stored on disk.
+
+The dump is a SQLite database with a row per node. Nodes are indexed by path, so children of a node
+and nodes under a path prefix are found without scanning the whole dump. `ZookeeperDump` implements
+the read-only part of `KazooClient` interface, so traversals and read-only commands can run against
+the dump instead of the live ensemble.
+"""
+
+import os
+import re
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator, List, Optional, Set, Tuple
+
+from kazoo.client import KazooClient
+from kazoo.exceptions import NoNodeError
+from kazoo.protocol.states import ZnodeStat
+
+from ch_tools.chadmin.internal.utils import chunked
+from ch_tools.chadmin.internal.zookeeper import (
+    DEFAULT_WALK_WINDOW,
+    WalkOrder,
+    WalkPrefetch,
+    ZookeeperNode,
+    walk_zk_tree,
+)
+from ch_tools.common import logging
+
+DUMP_FORMAT_VERSION = 1
+INSERT_BATCH_SIZE = 10000
+
+STAT_COLUMNS = ZnodeStat._fields
+
+SCHEMA = f"""
+CREATE TABLE meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE nodes (
+    path TEXT PRIMARY KEY,
+    parent TEXT NOT NULL,
+    {", ".join(f"{column} INTEGER" for column in STAT_COLUMNS)},
+    data BLOB
+) WITHOUT ROWID;
+CREATE INDEX nodes_parent ON nodes (parent);
+"""
+
+
+@dataclass
+class DumpStats:
+    """
+    Statistics of ZooKeeper subtree dump.
+    """
+
+    nodes: int = 0
+    data_bytes: int = 0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return f"{self.nodes} nodes, {self.data_bytes} bytes of data in {self.elapsed:.2f}s"
+
+
+def dump_zk_tree(
+    zk: KazooClient,
+    root_path: str,
+    dump_path: str,
+    with_data: bool = False,
+    window: int = DEFAULT_WALK_WINDOW,
+) -> DumpStats:
+    """
+    Stream nodes of the subtree with their stats and optionally data into the dump file.
+
+    The dump is written to a temporary file that replaces `dump_path` on success.
+    """
+    stats = DumpStats()
+    start = time.monotonic()
+    tmp_path = f"{dump_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    connection = sqlite3.connect(tmp_path)
+    try:
+        connection.executescript(SCHEMA)
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            [
+                ("version", str(DUMP_FORMAT_VERSION)),
+                ("root_path", root_path),
+                ("with_data", str(int(with_data))),
+                ("created_at", str(int(time.time()))),
+            ],
+        )
+
+        # Depth-first order keeps the number of pending nodes bounded by the depth of the tree
+        # rather than its width.
+        nodes = walk_zk_tree(
+            zk,
+            [root_path],
+            order=WalkOrder.DFS,
+            window=window,
+            prefetch=WalkPrefetch.DATA if with_data else WalkPrefetch.STAT,
+        )
+        placeholders = ", ".join("?" * (len(STAT_COLUMNS) + 3))
+        for batch in chunked(nodes, INSERT_BATCH_SIZE):
+            rows = [_to_row(node) for node in batch if node.stat is not None]
+            connection.executemany(f"INSERT INTO nodes VALUES ({placeholders})", rows)
+            stats.nodes += len(rows)
+            stats.data_bytes += sum(len(row[-1] or b"") for row in rows)
+            logging.debug("Dumped {} nodes", stats.nodes)
+
+        connection.commit()
+    finally:
+        connection.close()
+
+    os.replace(tmp_path, dump_path)
+    stats.elapsed = time.monotonic() - start
+    return stats
+
+
+def _to_row(node: ZookeeperNode) -> Tuple[Any, ...]:
+    assert node.stat is not None
+    return (node.path, os.path.dirname(node.path), *node.stat, node.data)
+
+
+class _CompletedResult:
+    """
+    Result of the request to the dump. Mimics the part of `IAsyncResult` interface used by traversals.
+    """
+
+    def __init__(self, value: Any = None, exception: Optional[Exception] = None):
+        self._value = value
+        self.exception = exception
+
+    def ready(self) -> bool:
+        return True
+
+    def successful(self) -> bool:
+        return self.exception is None
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # pylint: disable=unused-argument
+        return True
+
+    def get(self, block: bool = True, timeout: Optional[float] = None) -> Any:
+        # pylint: disable=unused-argument
+        if self.exception is not None:
+            raise self.exception
+        return self._value
+
+
+class ZookeeperDump:
+    """
+    Read-only ZooKeeper client serving requests from the dump.
+    """
+
+    def __init__(self, dump_path: str) -> None:
+        if not os.path.exists(dump_path):
+            raise FileNotFoundError(f"ZooKeeper dump '{dump_path}' doesn't exist")
+
+        self._connection = sqlite3.connect(
+            f"file:{dump_path}?mode=ro", uri=True, check_same_thread=False
+        )
+        meta = dict(self._connection.execute("SELECT key, value FROM meta"))
+        if int(meta["version"]) != DUMP_FORMAT_VERSION:
+            raise RuntimeError(
+                f"Unsupported ZooKeeper dump format version {meta['version']}"
+            )
+        self.root_path: str = meta["root_path"]
+        self.with_data = bool(int(meta["with_data"]))
+
+    def start(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        self._connection.close()
+
+    def exists(self, path: str) -> Optional[ZnodeStat]:
+        row = self._connection.execute(
+            f"SELECT {', '.join(STAT_COLUMNS)} FROM nodes WHERE path = ?",
+            (_normalize(path),),
+        ).fetchone()
+        return ZnodeStat(*row) if row else None
+
+    def get(self, path: str) -> Tuple[bytes, ZnodeStat]:
+        row = self._connection.execute(
+            f"SELECT data, {', '.join(STAT_COLUMNS)} FROM nodes WHERE path = ?",
+            (_normalize(path),),
+        ).fetchone()
+        if row is None:
+            raise NoNodeError(path)
+        if row[0] is None and not self.with_data:
+            raise RuntimeError("ZooKeeper dump was created without node data")
+        return row[0], ZnodeStat(*row[1:])
+
+    def get_children(self, path: str) -> List[str]:
+        path = _normalize(path)
+        children = [
+            os.path.basename(child)
+            for (child,) in self._connection.execute(
+                "SELECT path FROM nodes WHERE parent = ? AND path != '/'", (path,)
+            )
+        ]
+        if not children and self.exists(path) is None:
+            raise NoNodeError(path)
+        return children
+
+    def get_acls(self, path: str) -> Tuple[List[Any], ZnodeStat]:
+        stat = self.exists(path)
+        if stat is None:
+            raise NoNodeError(path)
+        # ACLs are not dumped.
+        return [], stat
+
+    def exists_async(self, path: str) -> _CompletedResult:
+        return self._complete(self.exists, path)
+
+    def get_async(self, path: str) -> _CompletedResult:
+        return self._complete(self.get, path)
+
+    def get_children_async(self, path: str) -> _CompletedResult:
+        return self._complete(self.get_children, path)
+
+    def iter_paths(self, path: str) -> Iterator[str]:
+        """
+        Iterate over paths of the dumped node and its descendants in lexicographic order.
+        """
+        path = _normalize(path)
+        if path == "/":
+            query, args = "SELECT path FROM nodes ORDER BY path", ()
+        else:
+            # Range condition on descendants allows to use the index by path. It starts with
+            # "<path>/" and ends before "<path>0", as "0" follows "/" in ASCII.
+            query = (
+                "SELECT path FROM nodes WHERE path = ? OR (path >= ? AND path < ?)"
+                " ORDER BY path"
+            )
+            args = (path, f"{path}/", f"{path}0")  # type: ignore[assignment]
+
+        for (node_path,) in self._connection.execute(query, args):
+            yield node_path
+
+    def __getattr__(self, name: str) -> Any:
+        raise RuntimeError(f"Operation '{name}' is not supported for ZooKeeper dump")
+
+    @staticmethod
+    def _complete(func: Any, path: str) -> _CompletedResult:
+        try:
+            return _CompletedResult(func(path))
+        except NoNodeError as e:
+            return _CompletedResult(exception=e)
+
+
+def find_paths_in_dump(
+    dump: ZookeeperDump,
+    root_path: str,
+    included_paths_regexp: List[str],
+    excluded_paths: Optional[List[str]] = None,
+) -> List[str]:
+    """
+    The same as `find_paths`, but scans the sorted paths of the dump instead of traversing the tree.
+    """
+    included_regexp = re.compile("|".join(included_paths_regexp))
+    excluded_regexp = re.compile("|".join(excluded_paths)) if excluded_paths else None
+    root_path = _normalize(root_path)
+    if excluded_regexp and excluded_regexp.match(root_path):
+        return []
+
+    # Matched and excluded nodes whose subtrees are skipped.
+    pruned: Set[str] = set()
+
+    def _is_pruned(path: str) -> bool:
+        while path != root_path:
+            path = os.path.dirname(path)
+            if path in pruned:
+                return True
+        return False
+
+    paths = []
+    for path in dump.iter_paths(root_path):
+        if path == root_path or _is_pruned(path):
+            continue
+        if included_regexp.match(path):
+            paths.append(path)
+            pruned.add(path)
+        elif excluded_regexp and excluded_regexp.match(path):
+            pruned.add(path)
+
+    return paths
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath("/" + path.lstrip("/"))
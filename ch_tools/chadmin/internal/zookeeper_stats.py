@@ -0,0 +1,236 @@
+"""
+Accounting of requests sent to ZooKeeper.
+
+`InstrumentedKazooClient` records the number of requests, errors, approximate payload sizes
+and latency histogram of every operation into `ZookeeperRequestStats`. Latency is measured from
+enqueueing the request to dispatching its result, so it includes time spent in the client queues.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field, replace
+from typing import Any, Dict, List, Optional
+
+from kazoo.client import KazooClient
+from kazoo.protocol.states import ZnodeStat
+
+from ch_tools.common.cli.formatting import format_bytes
+
+# Upper bounds of latency histogram buckets in seconds.
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+# Size of serialized ZnodeStat.
+STAT_SIZE = 68
+
+OPERATION_NAMES = {
+    "GetChildren": "get_children",
+    "GetChildren2": "get_children",
+    "GetData": "get",
+    "Exists": "exists",
+    "Transaction": "multi",
+    "Create": "create",
+    "Create2": "create",
+    "Delete": "delete",
+    "SetData": "set",
+    "GetACL": "get_acls",
+    "SetACL": "set_acls",
+    "CheckVersion": "check",
+}
+
+
+@dataclass
+class ZookeeperOperationStats:
+    """
+    Statistics of requests of a single operation.
+    """
+
+    requests: int = 0
+    errors: int = 0
+    sent_bytes: int = 0
+    received_bytes: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+    # The last bucket counts requests slower than the last bound.
+    histogram: List[int] = field(
+        default_factory=lambda: [0] * (len(LATENCY_BUCKETS) + 1)
+    )
+
+    def record(self, latency: float, sent: int, received: int, failed: bool) -> None:
+        self.requests += 1
+        self.errors += failed
+        self.sent_bytes += sent
+        self.received_bytes += received
+        self.total_latency += latency
+        self.max_latency = max(self.max_latency, latency)
+        self.histogram[bisect_left(LATENCY_BUCKETS, latency)] += 1
+
+    def latency_quantile(self, level: float) -> float:
+        """
+        Return the upper bound of the histogram bucket containing the quantile.
+        """
+        threshold = level * self.requests
+        count = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, self.histogram):
+            count += bucket_count
+            if count >= threshold:
+                return bound
+        return self.max_latency
+
+    def __str__(self) -> str:
+        if not self.requests:
+            return "0 requests"
+        average = self.total_latency / self.requests
+        return (
+            f"{self.requests} requests, {self.errors} errors, "
+            f"sent {format_bytes(self.sent_bytes)}, received {format_bytes(self.received_bytes)}, "
+            f"latency avg {_format_latency(average)}, "
+            f"p50 <= {_format_latency(self.latency_quantile(0.5))}, "
+            f"p99 <= {_format_latency(self.latency_quantile(0.99))}, "
+            f"max {_format_latency(self.max_latency)}"
+        )
+
+
+class ZookeeperRequestStats:
+    """
+    Statistics of ZooKeeper requests by operation. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self.operations: Dict[str, ZookeeperOperationStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        operation: str,
+        latency: float,
+        sent: int = 0,
+        received: int = 0,
+        failed: bool = False,
+    ) -> None:
+        with self._lock:
+            stats = self.operations.get(operation)
+            if stats is None:
+                stats = self.operations[operation] = ZookeeperOperationStats()
+            stats.record(latency, sent, received, failed)
+
+    @property
+    def requests(self) -> int:
+        return sum(stats.requests for stats in self.snapshot().values())
+
+    def snapshot(self) -> Dict[str, ZookeeperOperationStats]:
+        """
+        Return a consistent copy of statistics of operations.
+        """
+        with self._lock:
+            return {
+                operation: replace(stats, histogram=list(stats.histogram))
+                for operation, stats in self.operations.items()
+            }
+
+    def histogram(self) -> str:
+        """
+        Return latency histogram of all operations.
+        """
+        return _format_histogram(self.snapshot())
+
+    def __str__(self) -> str:
+        operations = self.snapshot()
+        if not operations:
+            return "no requests"
+        requests = sum(stats.requests for stats in operations.values())
+        lines = [
+            f"{requests} requests, latency histogram: {_format_histogram(operations)}"
+        ]
+        for operation, stats in sorted(operations.items()):
+            lines.append(f"  {operation}: {stats}")
+        return "\n".join(lines)
+
+
+class InstrumentedKazooClient(KazooClient):
+    """
+    KazooClient recording statistics of sent requests.
+    """
+
+    def __init__(
+        self,
+        *args: Any,
+        request_stats: Optional[ZookeeperRequestStats] = None,
+        **kwargs: Any,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.request_stats = (
+            request_stats if request_stats is not None else ZookeeperRequestStats()
+        )
+
+    def _call(self, request: Any, async_object: Any) -> Any:
+        if async_object is None:
+            return super()._call(request, async_object)
+
+        operation = get_operation_name(request)
+        sent = _get_request_size(request)
+        start = time.monotonic()
+
+        def _on_complete(result: Any) -> None:
+            failed = not result.successful()
+            self.request_stats.record(
+                operation,
+                time.monotonic() - start,
+                sent,
+                0 if failed else get_payload_size(result.value),
+                failed,
+            )
+
+        async_object.rawlink(_on_complete)
+        return super()._call(request, async_object)
+
+
+def get_operation_name(request: Any) -> str:
+    name = type(request).__name__
+    return OPERATION_NAMES.get(name, name.lower())
+
+
+def get_payload_size(value: Any) -> int:
+    """
+    Return approximate size of the response payload: node names, data and stats.
+    """
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    if isinstance(value, ZnodeStat):
+        return STAT_SIZE
+    if isinstance(value, (list, tuple)):
+        return sum(get_payload_size(item) for item in value)
+    return 0
+
+
+def _get_request_size(request: Any) -> int:
+    """
+    Return approximate size of the request payload: paths and data of its operations.
+
+    The size is estimated from fields of the request, as serialization of the request is costly.
+    """
+    operations = getattr(request, "operations", None)
+    if operations is not None:
+        return sum(_get_request_size(operation) for operation in operations)
+    path = getattr(request, "path", None)
+    data = getattr(request, "data", None)
+    return (len(path) if isinstance(path, str) else 0) + (
+        len(data) if isinstance(data, (bytes, str)) else 0
+    )
+
+
+def _format_histogram(operations: Dict[str, ZookeeperOperationStats]) -> str:
+    total = [0] * (len(LATENCY_BUCKETS) + 1)
+    for stats in operations.values():
+        total = [a + b for a, b in zip(total, stats.histogram)]
+
+    bounds = [f"<= {_format_latency(bound)}" for bound in LATENCY_BUCKETS]
+    bounds.append(f"> {_format_latency(LATENCY_BUCKETS[-1])}")
+    return ", ".join(
+        f"{bound}: {count}" for bound, count in zip(bounds, total) if count
+    )
+
+
+def _format_latency(seconds: float) -> str:
+    if seconds < 1:
+        return f"{seconds * 1000:g}ms"
+    return f"{seconds:g}s"
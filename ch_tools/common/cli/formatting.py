@@ -1,5 +1,8 @@
 """
 Formatting module.
+
+Modules of pygments, deepdiff and tabulate are imported on first use as the module is imported on
+startup of all tools through command-line parameters.
 """
 
 import csv
@@ -8,33 +11,35 @@ import sys
 from collections import OrderedDict
 from datetime import date, datetime, timedelta
 from decimal import Decimal
+from functools import lru_cache
 from itertools import chain
 from typing import Any, Callable, Dict, List, Mapping, Optional, Union
 
 import humanfriendly
 from click import Context, style
 from cloup import Color
-from deepdiff.helper import notpresent
-from pygments import highlight
-from pygments.formatters.terminal256 import Terminal256Formatter
-from pygments.lexers.data import JsonLexer, YamlLexer
-from pygments.style import Style
-from pygments.token import Token
-from tabulate import tabulate
 from termcolor import colored
 
-from ch_tools.chadmin.internal.utils import DATETIME_FORMAT
+from ch_tools.common.utils import DATETIME_FORMAT
 
 from ..yaml import dump_yaml
 from .utils import get_timezone
 
 
-class FormatStyle(Style):
-    styles = {
-        Token.Name.Tag: "bold ansibrightblue",
-        Token.Punctuation: "bold ansiwhite",
-        Token.String: "ansigreen",
-    }
+@lru_cache(maxsize=1)
+def _get_format_style() -> Any:
+    # pylint: disable=import-outside-toplevel
+    from pygments.style import Style
+    from pygments.token import Token
+
+    class FormatStyle(Style):
+        styles = {
+            Token.Name.Tag: "bold ansibrightblue",
+            Token.Punctuation: "bold ansiwhite",
+            Token.String: "ansigreen",
+        }
+
+    return FormatStyle
 
 
 def print_header(header: str) -> None:
@@ -192,6 +197,9 @@ def print_diff(diff: Dict, key_separator: str = ".") -> None:
 
 
 def _print_diff_item(item: Any, key_separator: str) -> None:
+    # pylint: disable=import-outside-toplevel
+    from deepdiff.helper import notpresent
+
     item_path = item.path(output_format="list")
     if item_path:
         print("@ " + key_separator.join(str(value) for value in item_path))
@@ -217,10 +225,10 @@ def print_json(ctx: Context, value: Any) -> None:
     """
     json_dump = json.dumps(value, indent=2, ensure_ascii=False)
     if _color(ctx):
-        print(
-            highlight(json_dump, JsonLexer(), Terminal256Formatter(style=FormatStyle)),
-            end="",
-        )
+        # pylint: disable=import-outside-toplevel
+        from pygments.lexers.data import JsonLexer
+
+        print(_highlight(json_dump, JsonLexer()), end="")
     else:
         print(json_dump)
 
@@ -231,15 +239,26 @@ def print_yaml(ctx: Context, value: Any) -> None:
     """
     yaml_dump = dump_yaml(value)
     if _color(ctx):
-        print(
-            highlight(yaml_dump, YamlLexer(), Terminal256Formatter(style=FormatStyle)),
-            end="",
-        )
+        # pylint: disable=import-outside-toplevel
+        from pygments.lexers.data import YamlLexer
+
+        print(_highlight(yaml_dump, YamlLexer()), end="")
     else:
         print(yaml_dump)
 
 
+def _highlight(code: str, lexer: Any) -> str:
+    # pylint: disable=import-outside-toplevel
+    from pygments import highlight
+    from pygments.formatters.terminal256 import Terminal256Formatter
+
+    return highlight(code, lexer, Terminal256Formatter(style=_get_format_style()))
+
+
 def print_table(value: List[Dict]) -> None:
+    # pylint: disable=import-outside-toplevel
+    from tabulate import tabulate
+
     print(tabulate(value, headers="keys"))
 
 
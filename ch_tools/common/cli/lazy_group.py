@@ -0,0 +1,76 @@
+"""
+Command group loading modules of subcommands on demand.
+"""
+
+from importlib import import_module
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+import cloup
+
+# pylint: disable=too-many-ancestors
+
+
+class LazyGroup(cloup.Group):
+    """
+    Group of commands which modules are imported only when the command is resolved. It allows
+    to avoid importing heavy dependencies of all commands on invocation of a single one.
+
+    Lazy commands are registered by name and import path in the form "module:attribute".
+    The loaded command is registered by `add_command`, so subclasses wrapping commands
+    handle it the same way as eagerly added ones. The help listing loads all commands.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._lazy_commands: Dict[str, Tuple[str, Optional[cloup.Section]]] = {}
+
+    def add_lazy_command(
+        self,
+        name: str,
+        import_path: str,
+        section: Optional[cloup.Section] = None,
+    ) -> None:
+        self._lazy_commands[name] = (import_path, section)
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return sorted({*super().list_commands(ctx), *self._lazy_commands})
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        if cmd_name in self._lazy_commands:
+            self._load_command(cmd_name)
+        return super().get_command(ctx, cmd_name)
+
+    def format_commands(
+        self, ctx: click.Context, formatter: click.HelpFormatter
+    ) -> None:
+        for name in list(self._lazy_commands):
+            self._load_command(name)
+        super().format_commands(ctx, formatter)
+
+    def add_loaded_command(
+        self, cmd: click.Command, name: str, section: Optional[cloup.Section]
+    ) -> None:
+        """
+        Register the loaded lazy command.
+        """
+        self.add_command(cmd, name=name, section=section)
+
+    def _load_command(self, name: str) -> None:
+        import_path, section = self._lazy_commands.pop(name)
+        module_name, attribute = import_path.split(":")
+        cmd = getattr(import_module(module_name), attribute)
+        if cmd.name != name:
+            raise RuntimeError(
+                f"Command {import_path} is named {cmd.name}, expected {name}"
+            )
+        self.add_loaded_command(cmd, name, section)
+
+
+def get_root_commands(ctx: click.Context, names: List[str]) -> List[click.Command]:
+    """
+    Return commands of the root group by names loading lazy ones.
+    """
+    root = ctx.find_root()
+    group: Any = root.command
+    return [group.get_command(root, name) for name in names]
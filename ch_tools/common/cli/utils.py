@@ -9,7 +9,6 @@ from typing import Any, Optional, Tuple, Union
 import humanfriendly
 from click import Context
 from dateutil.tz import gettz, tzfile
-from deepdiff import DeepDiff
 
 
 def parse_timespan(value: str) -> timedelta:
@@ -34,10 +33,14 @@ def get_timezone(ctx: Context) -> tzfile:
     return ctx.obj["timezone"]
 
 
-def diff_objects(value1: Any, value2: Any) -> DeepDiff:
+def diff_objects(value1: Any, value2: Any) -> Any:
     """
     Calculate structural diff between 2 values.
     """
+    # Imported on first use as the module is imported on startup of all tools.
+    # pylint: disable=import-outside-toplevel
+    from deepdiff import DeepDiff
+
     return DeepDiff(
         value1,
         value2,
@@ -2,11 +2,13 @@
 ClickHouse client.
 """
 
+from .async_client import AsyncClickhouseClient
 from .clickhouse_client import ClickhouseClient
 from .error import ClickhouseError
 from .query_output_format import OutputFormat
 
 __all__ = [
+    "AsyncClickhouseClient",
     "ClickhouseClient",
     "ClickhouseError",
     "OutputFormat",
@@ -0,0 +1,152 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+from typing_extensions import Self
+
+from ch_tools.common.clickhouse.client.query import Query
+
+from ..config.clickhouse import ClickhousePort
+from .clickhouse_client import ClickhouseClient
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+class AsyncClickhouseClient:
+    """
+    Asyncio wrapper for ClickHouse client.
+
+    Queries are executed by the wrapped synchronous client in a bounded thread pool, so they share
+    its connection pool and have the same query masking and retry semantics. The number of queries
+    executed at the same time is limited by `max_concurrency`.
+    """
+
+    def __init__(
+        self: Self,
+        client: ClickhouseClient,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    ) -> None:
+        self.client = client
+        self._max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency)
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    async def query(
+        self: Self,
+        query: Union[str, Query],
+        query_args: Optional[Dict[str, Any]] = None,
+        format_: Optional[str] = None,
+        post_data: Any = None,
+        timeout: Optional[int] = None,
+        echo: bool = False,
+        dry_run: bool = False,
+        settings: Optional[dict] = None,
+        host: Optional[str] = None,
+        port: Optional[ClickhousePort] = None,
+        log_query: bool = True,
+    ) -> Any:
+        """
+        Execute query.
+        """
+        return await self.run(
+            self.client.query,
+            query=query,
+            query_args=query_args,
+            format_=format_,
+            post_data=post_data,
+            timeout=timeout,
+            echo=echo,
+            dry_run=dry_run,
+            settings=settings,
+            host=host,
+            port=port,
+            log_query=log_query,
+        )
+
+    async def query_json_data(
+        self: Self,
+        query: Union[str, Query],
+        query_args: Optional[Dict[str, Any]] = None,
+        compact: bool = True,
+        post_data: Any = None,
+        timeout: Optional[int] = None,
+        echo: bool = False,
+        dry_run: bool = False,
+        settings: Optional[dict] = None,
+        host: Optional[str] = None,
+        port: Optional[ClickhousePort] = None,
+    ) -> Any:
+        """
+        Execute ClickHouse query formatted as JSON and return data.
+        """
+        return await self.run(
+            self.client.query_json_data,
+            query=query,
+            query_args=query_args,
+            compact=compact,
+            post_data=post_data,
+            timeout=timeout,
+            echo=echo,
+            dry_run=dry_run,
+            settings=settings,
+            host=host,
+            port=port,
+        )
+
+    async def run(self: Self, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        """
+        Run blocking function respecting concurrency limit of the client.
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async with self._semaphore:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                self._executor, partial(func, *args, **kwargs)
+            )
+
+    def close(self: Self) -> None:
+        self._executor.shutdown(wait=True)
+
+    def __enter__(self: Self) -> Self:
+        return self
+
+    def __exit__(self: Self, *args: Any) -> None:
+        self.close()
+
+
+async def gather(aws: Iterable[Awaitable]) -> List[Any]:
+    """
+    Wait for all awaitables and return their results in the original order.
+    If some of them failed, the exception of the first one in order is raised after all completed.
+    """
+    results = await asyncio.gather(*aws, return_exceptions=True)
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+
+    return results
+
+
+def query_on_hosts(
+    client: ClickhouseClient,
+    query: Union[str, Query],
+    hosts: Iterable[str],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    **kwargs: Any,
+) -> Dict[str, Any]:
+    """
+    Execute query on the specified hosts concurrently and return results by host.
+    Per-host timeout is controlled by `timeout` argument as for `ClickhouseClient.query`.
+    """
+    hosts = list(hosts)
+
+    async def _run() -> List[Any]:
+        with AsyncClickhouseClient(client, max_concurrency) as async_client:
+            return await gather(
+                async_client.query(query, host=host, **kwargs) for host in hosts
+            )
+
+    return dict(zip(hosts, asyncio.run(_run())))
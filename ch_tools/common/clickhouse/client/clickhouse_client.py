@@ -1,11 +1,14 @@
 import json
 import subprocess
+import threading
 from datetime import timedelta
-from typing import Any, Dict, Optional, Tuple, Union
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import requests
 from click import Context
-from jinja2 import Environment
+from jinja2 import Environment, Template
+from requests.adapters import HTTPAdapter
 from typing_extensions import Self
 
 from ch_tools.common import logging
@@ -15,7 +18,14 @@ from ch_tools.common.utils import version_ge
 from ..config import get_clickhouse_config
 from ..config.clickhouse import ClickhousePort
 from .error import ClickhouseError
+from .native import (
+    JSON_FORMATS,
+    NativeClientPool,
+    is_supported_format,
+    native_driver_available,
+)
 from .retry import retry
+from .rows import Row, make_rows
 from .utils import _format_str_imatch, _format_str_match
 
 PORTS_PRIORITY = [
@@ -25,8 +35,15 @@ PORTS_PRIORITY = [
     ClickhousePort.TCP,
 ]
 
+DEFAULT_POOL_SIZE = 10
+TEMPLATE_CACHE_SIZE = 256
 
-class ClickhouseClient:
+_TEMPLATE_ENV = Environment()
+_TEMPLATE_ENV.globals["format_str_match"] = _format_str_match
+_TEMPLATE_ENV.globals["format_str_imatch"] = _format_str_imatch
+
+
+class ClickhouseClient:  # pylint: disable=too-many-instance-attributes
     """
     ClickHouse client wrapper.
     """
@@ -42,6 +59,9 @@ class ClickhouseClient:
         cert_path: Optional[str] = None,
         timeout: int,
         settings: Optional[Dict[str, Any]] = None,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        native_protocol: bool = False,
+        compression: bool = False,
     ) -> None:
         self.host = host
         self.insecure = insecure
@@ -52,6 +72,21 @@ class ClickhouseClient:
         self._settings = settings or {}
         self._timeout = timeout
         self._ch_version: Optional[str] = None
+        self._pool_size = pool_size
+        self._session: Optional[requests.Session] = None
+        self._session_lock = threading.Lock()
+        self._native_protocol = native_protocol and native_driver_available()
+        if native_protocol and not self._native_protocol:
+            logging.warning(
+                "Native protocol is enabled, but clickhouse-driver package is not installed"
+            )
+        self._native_pool = NativeClientPool(
+            user=user,
+            password=password,
+            cert_path=cert_path,
+            insecure=insecure,
+            compression=compression,
+        )
 
     def get_clickhouse_version(self) -> str:
         """
@@ -69,6 +104,54 @@ class ClickhouseClient:
         seconds = int(self.query("SELECT uptime()"))
         return timedelta(seconds=seconds)
 
+    def _get_session(self) -> requests.Session:
+        """
+        Return HTTP session with keep-alive connection pool. The session is created on first use
+        and shared by all threads using the client.
+        """
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    adapter = HTTPAdapter(pool_maxsize=self._pool_size)
+                    session = requests.Session()
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    self._session = session
+
+        return self._session
+
+    def get_connection_stats(self) -> Dict[str, int]:
+        """
+        Return the number of HTTP requests sent and connections opened and reused by the client.
+        """
+        requests_count = 0
+        opened_count = 0
+        if self._session is not None:
+            for adapter in set(self._session.adapters.values()):
+                pools = adapter.poolmanager.pools  # type: ignore[attr-defined]
+                for key in pools.keys():
+                    pool = pools.get(key)
+                    if pool is None:
+                        continue
+                    requests_count += pool.num_requests
+                    opened_count += pool.num_connections
+
+        return {
+            "requests": requests_count,
+            "connections_opened": opened_count,
+            "connections_reused": max(requests_count - opened_count, 0),
+        }
+
+    def close(self) -> None:
+        """
+        Close pooled HTTP and native protocol connections.
+        """
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        self._native_pool.close()
+
     def _execute_http(
         self,
         query: Optional[Query],
@@ -88,9 +171,12 @@ class ClickhouseClient:
         if self.password:
             headers["X-ClickHouse-Key"] = self.password
         verify = self.cert_path if port == ClickhousePort.HTTPS else None
+        session = self._get_session()
+        # Data in ClickHouse input formats is sent as is, other values are encoded to JSON.
+        raw_data = isinstance(post_data, (str, bytes))
         try:
             if query:
-                response = requests.post(
+                response = session.post(
                     url,
                     params={
                         **self._settings,
@@ -98,14 +184,15 @@ class ClickhouseClient:
                         **per_query_settings,  # overwrites previous settings
                     },
                     headers=headers,
-                    json=post_data,
+                    data=post_data if raw_data else None,
+                    json=None if raw_data else post_data,
                     timeout=timeout,
                     stream=stream,
                     verify=verify,
                 )
             else:
                 # Used for ping
-                response = requests.get(
+                response = session.get(
                     url,
                     headers=headers,
                     timeout=timeout,
@@ -118,7 +205,7 @@ class ClickhouseClient:
             if stream:
                 return response
 
-            if format_ in ("JSON", "JSONCompact"):
+            if format_ in JSON_FORMATS:
                 return response.json()
 
             return response.text.strip()
@@ -129,6 +216,7 @@ class ClickhouseClient:
         self,
         query: Optional[Query],
         format_: Optional[str],
+        post_data: Optional[Union[str, bytes]],
         host: str,
         port: ClickhousePort,
     ) -> Any:
@@ -152,18 +240,26 @@ class ClickhouseClient:
         if not query:
             raise RuntimeError(1, "Can't send empty query in tcp(s) port")
 
+        if post_data is None:
+            stdin = query.for_execute().encode()
+        else:
+            # Query is passed as an argument and stdin is used for the data to insert.
+            cmd.extend(("--query", query.for_execute()))
+            masked_cmd.extend(("--query", str(query)))
+            stdin = post_data.encode() if isinstance(post_data, str) else post_data
+
         # pylint: disable=consider-using-with
         proc = subprocess.Popen(
             cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE  # type: ignore[arg-type]
         )
-        stdout, stderr = proc.communicate(input=query.for_execute().encode())
+        stdout, stderr = proc.communicate(input=stdin)
 
         if proc.returncode:
             raise RuntimeError(f'"{masked_cmd}" failed with: {stderr.decode()}')
 
         response = stdout.decode().strip()
 
-        if format_ in ("JSON", "JSONCompact"):
+        if format_ in JSON_FORMATS:
             return json.loads(response)
 
         return response.strip()
@@ -193,6 +289,9 @@ class ClickhouseClient:
         if query_args:
             query.value = self.render_query(query.value, **query_args)
 
+        # Native protocol transfers data in blocks, so results are formatted on the client side.
+        native_query = query
+
         if format_:
             query += f" FORMAT {format_}"
 
@@ -230,7 +329,23 @@ class ClickhouseClient:
                 host,
                 port,
             )
-        return self._execute_tcp(query, format_, host, port)
+        if (
+            self._native_protocol
+            and native_query is not None
+            and post_data is None
+            and is_supported_format(format_)
+        ):
+            return self._native_pool.execute(
+                native_query,
+                format_,
+                timeout,
+                stream,
+                {**self._settings, **per_query_settings},
+                host,
+                self.ports[port],
+                port == ClickhousePort.TCP_SECURE,
+            )
+        return self._execute_tcp(query, format_, post_data, host, port)
 
     def query_json_data(
         self: Self,
@@ -270,17 +385,47 @@ class ClickhouseClient:
     def query_json_data_first_row(self, **kwargs: Any) -> Any:
         return self.query_json_data(**kwargs)[0]
 
-    def render_query(self, query: str, **kwargs: Any) -> str:
-        env = Environment()
+    def query_rows(
+        self: Self,
+        query: Union[str, Query],
+        query_args: Optional[Dict[str, Any]] = None,
+        timeout: Optional[int] = None,
+        echo: bool = False,
+        dry_run: bool = False,
+        settings: Optional[dict] = None,
+        host: Optional[str] = None,
+        port: Optional[ClickhousePort] = None,
+    ) -> List[Row]:
+        """
+        Execute ClickHouse query and return rows as read-only mappings from column names to values.
 
-        env.globals["version_ge"] = lambda version: version_ge(
-            self.get_clickhouse_version(), version
+        Unlike `query_json_data(compact=False)`, column names are transferred and stored once
+        for the whole result, so it's preferable for large results.
+        """
+        result = self.query(
+            query=query,
+            query_args=query_args,
+            timeout=timeout,
+            format_="JSONCompact",
+            echo=echo,
+            dry_run=dry_run,
+            settings=settings,
+            host=host,
+            port=port,
         )
-        env.globals["format_str_match"] = _format_str_match
-        env.globals["format_str_imatch"] = _format_str_imatch
+        if result is None:
+            return []
 
-        template = env.from_string(query)
-        return template.render(kwargs)
+        return make_rows(result)
+
+    def render_query(self, query: str, **kwargs: Any) -> str:
+        template = compile_template(query)
+        return template.render(
+            kwargs,
+            version_ge=lambda version: version_ge(
+                self.get_clickhouse_version(), version
+            ),
+        )
 
     def check_port(self, port: ClickhousePort) -> bool:
         return port in self.ports
@@ -292,6 +437,14 @@ class ClickhouseClient:
         return self.query(query=None, port=port)
 
 
+@lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(query: str) -> Template:
+    """
+    Compile query template. Compiled templates are cached by template text.
+    """
+    return _TEMPLATE_ENV.from_string(query)
+
+
 def clickhouse_client(ctx: Context) -> ClickhouseClient:
     """
     Return ClickHouse client from the context if it exists.
@@ -310,6 +463,9 @@ def clickhouse_client(ctx: Context) -> ClickhouseClient:
             insecure=tools_config["insecure"],
             timeout=tools_config["timeout"],
             settings=tools_config["settings"],
+            pool_size=tools_config["pool_size"],
+            native_protocol=tools_config["native_protocol"],
+            compression=tools_config["compression"],
         )
 
     return ctx.obj["chcli"]
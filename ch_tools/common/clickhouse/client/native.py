@@ -0,0 +1,321 @@
+"""
+Query execution over ClickHouse native TCP protocol.
+
+The protocol is implemented by the optional `clickhouse-driver` package. Result blocks are converted
+into the same representation that HTTP interface returns for the supported output formats.
+"""
+
+import importlib.util
+import json
+import re
+import threading
+from contextlib import contextmanager
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import requests
+
+from ch_tools.common.clickhouse.client.query import Query
+
+from .error import ClickhouseError
+
+JSON_FORMATS = ("JSON", "JSONCompact")
+TSV_FORMATS = ("TabSeparated", "TSV")
+TSV_RAW_FORMATS = ("TabSeparatedRaw", "TSVRaw")
+STREAM_FORMATS = ("JSONEachRow", "JSONCompactEachRow")
+SUPPORTED_FORMATS = (
+    None,
+    *JSON_FORMATS,
+    *TSV_FORMATS,
+    *TSV_RAW_FORMATS,
+    *STREAM_FORMATS,
+)
+
+# Integers that ClickHouse outputs as quoted strings in JSON formats (output_format_json_quote_64bit_integers).
+QUOTED_INT_TYPE_RE = re.compile(r"\bU?Int(64|128|256)\b")
+
+TSV_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n"})
+
+ColumnsWithTypes = Sequence[Tuple[str, str]]
+
+
+def native_driver_available() -> bool:
+    """
+    Return True if the package implementing native protocol is installed.
+    """
+    return importlib.util.find_spec("clickhouse_driver") is not None
+
+
+def is_supported_format(format_: Optional[str]) -> bool:
+    """
+    Return True if query results in the specified format can be produced from native protocol blocks.
+    """
+    return format_ in SUPPORTED_FORMATS
+
+
+class NativeClientPool:
+    """
+    Pool of native protocol connections. Each thread keeps its own connection per host and port
+    that is reused by subsequent queries.
+    """
+
+    def __init__(
+        self,
+        *,
+        user: Optional[str],
+        password: Optional[str],
+        cert_path: Optional[str],
+        insecure: bool,
+        compression: bool,
+    ) -> None:
+        self._user = user
+        self._password = password
+        self._cert_path = cert_path
+        self._insecure = insecure
+        self._compression = compression
+        self._local = threading.local()
+        self._clients: List[Any] = []
+        self._clients_lock = threading.Lock()
+
+    def execute(
+        self,
+        query: Query,
+        format_: Optional[str],
+        timeout: Optional[int],
+        stream: bool,
+        settings: Dict[str, Any],
+        host: str,
+        port: int,
+        secure: bool,
+    ) -> Any:
+        """
+        Execute query and return result in the specified format.
+        """
+        if stream:
+            # Streamed query occupies the connection until the result is consumed,
+            # so it is executed on a dedicated connection.
+            client = self._new_client(host, port, secure, timeout)
+            rows = client.execute_iter(
+                query.for_execute(), settings=settings, with_column_types=True
+            )
+            return NativeStreamResponse(client, rows, format_, str(query))
+
+        client = self._get_client(host, port, secure, timeout)
+        with _translate_errors(str(query)):
+            rows, columns = client.execute(
+                query.for_execute(), settings=settings, with_column_types=True
+            )
+
+        return format_result(rows, columns, format_)
+
+    def close(self) -> None:
+        """
+        Close all connections.
+        """
+        with self._clients_lock:
+            for client in self._clients:
+                client.disconnect()
+            self._clients.clear()
+        self._local = threading.local()
+
+    def _get_client(
+        self, host: str, port: int, secure: bool, timeout: Optional[int]
+    ) -> Any:
+        clients = getattr(self._local, "clients", None)
+        if clients is None:
+            clients = self._local.clients = {}
+
+        client = clients.get((host, port))
+        if client is None:
+            client = self._new_client(host, port, secure, timeout)
+            clients[(host, port)] = client
+            with self._clients_lock:
+                self._clients.append(client)
+        else:
+            _set_timeout(client, timeout)
+
+        return client
+
+    def _new_client(
+        self, host: str, port: int, secure: bool, timeout: Optional[int]
+    ) -> Any:
+        # pylint: disable=import-outside-toplevel
+        from clickhouse_driver import Client
+
+        return Client(
+            host=host,
+            port=port,
+            user=self._user or "default",
+            password=self._password or "",
+            secure=secure,
+            verify=not self._insecure,
+            ca_certs=self._cert_path if secure else None,
+            compression=self._compression,
+            send_receive_timeout=timeout,
+        )
+
+
+class NativeStreamResponse:
+    """
+    Streamed query result. Mimics the part of `requests.Response` interface used for
+    iterating over results of streamed HTTP queries.
+    """
+
+    def __init__(
+        self, client: Any, rows: Iterator[Any], format_: Optional[str], query: str
+    ) -> None:
+        self._client = client
+        self._rows = rows
+        self._format = format_
+        self._query = query
+
+    def iter_lines(self) -> Iterator[bytes]:
+        """
+        Iterate over result rows formatted as lines.
+        """
+        with _translate_errors(self._query):
+            columns = next(self._rows, None)
+            if columns is not None:
+                for row in self._rows:
+                    yield format_line(row, columns, self._format).encode()
+
+    def close(self) -> None:
+        # Connection with partially consumed result can't be used anymore.
+        self._client.disconnect()
+
+    def __enter__(self) -> "NativeStreamResponse":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def format_result(
+    rows: Sequence[Sequence[Any]], columns: ColumnsWithTypes, format_: Optional[str]
+) -> Any:
+    """
+    Convert query result to the representation returned by HTTP interface for the specified format.
+    """
+    if format_ in JSON_FORMATS:
+        data: List[Any] = []
+        for row in rows:
+            values = _json_row(row, columns)
+            if format_ == "JSON":
+                data.append({name: value for (name, _), value in zip(columns, values)})
+            else:
+                data.append(values)
+
+        return {
+            "meta": [{"name": name, "type": type_} for name, type_ in columns],
+            "data": data,
+            "rows": len(data),
+        }
+
+    return "\n".join(format_line(row, columns, format_) for row in rows).strip()
+
+
+def format_line(
+    row: Sequence[Any], columns: ColumnsWithTypes, format_: Optional[str]
+) -> str:
+    """
+    Format a single result row in the specified line-oriented format.
+    """
+    if format_ in STREAM_FORMATS:
+        values = _json_row(row, columns)
+        if format_ == "JSONCompactEachRow":
+            return json.dumps(values)
+        return json.dumps({name: value for (name, _), value in zip(columns, values)})
+
+    raw = format_ in TSV_RAW_FORMATS
+    return "\t".join(_tsv_value(value, raw) for value in row)
+
+
+def _json_row(row: Sequence[Any], columns: ColumnsWithTypes) -> List[Any]:
+    return [
+        _json_value(value, bool(QUOTED_INT_TYPE_RE.search(type_)))
+        for value, (_, type_) in zip(row, columns)
+    ]
+
+
+def _json_value(value: Any, quote_ints: bool) -> Any:
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, int):
+        return str(value) if quote_ints else value
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (str, float)):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_json_value(item, quote_ints) for item in value]
+    if isinstance(value, dict):
+        return {str(k): _json_value(v, quote_ints) for k, v in value.items()}
+    return _scalar_str(value)
+
+
+def _tsv_value(value: Any, raw: bool) -> str:
+    if value is None:
+        return "\\N"
+    if isinstance(value, str):
+        return value if raw else value.translate(TSV_ESCAPES)
+    if isinstance(value, (list, tuple)):
+        items = ",".join(_tsv_nested_value(item) for item in value)
+        return f"[{items}]" if isinstance(value, list) else f"({items})"
+    if isinstance(value, dict):
+        items = ",".join(
+            f"{_tsv_nested_value(k)}:{_tsv_nested_value(v)}" for k, v in value.items()
+        )
+        return f"{{{items}}}"
+    return _scalar_str(value)
+
+
+def _tsv_nested_value(value: Any) -> str:
+    if value is None:
+        return "NULL"
+    if isinstance(value, (int, float, Decimal, list, tuple, dict)):
+        return _tsv_value(value, raw=True)
+    escaped = _scalar_str(value).replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+def _scalar_str(value: Any) -> str:
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None).isoformat(sep=" ")
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value)
+
+
+def _set_timeout(client: Any, timeout: Optional[int]) -> None:
+    connection = client.connection
+    connection.send_receive_timeout = timeout
+    if connection.socket is not None:
+        connection.socket.settimeout(timeout)
+
+
+def _error_response(text: str) -> requests.Response:
+    """
+    Build HTTP-like response for the error, so errors are handled uniformly regardless of protocol.
+    """
+    response = requests.Response()
+    response.status_code = 500
+    response._content = text.encode()  # pylint: disable=protected-access
+    return response
+
+
+@contextmanager
+def _translate_errors(query: str) -> Iterator[None]:
+    # pylint: disable=import-outside-toplevel
+    from clickhouse_driver import errors
+
+    try:
+        yield
+    except errors.ServerException as e:
+        raise ClickhouseError(query, _error_response(str(e))) from None
+    except errors.SocketTimeoutError as e:
+        raise requests.exceptions.ReadTimeout(str(e)) from None
+    except errors.NetworkError as e:
+        raise requests.exceptions.ConnectionError(str(e)) from None
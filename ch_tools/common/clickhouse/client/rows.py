@@ -0,0 +1,37 @@
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List
+
+
+class Row(Mapping):
+    """
+    Read-only row of query result.
+
+    Values are stored in a list and accessed by column name through an index shared by all rows
+    of the result, so a row takes a fraction of the memory of the equivalent dict.
+    """
+
+    __slots__ = ("_index", "_values")
+
+    def __init__(self, index: Dict[str, int], values: List[Any]) -> None:
+        self._index = index
+        self._values = values
+
+    def __getitem__(self, key: str) -> Any:
+        return self._values[self._index[key]]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self)})"
+
+
+def make_rows(result: Dict[str, Any]) -> List[Row]:
+    """
+    Make rows from query result in JSONCompact format.
+    """
+    index = {column["name"]: i for i, column in enumerate(result["meta"])}
+    return [Row(index, values) for values in result["data"]]
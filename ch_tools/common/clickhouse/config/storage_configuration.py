@@ -2,6 +2,8 @@ from dataclasses import dataclass
 from urllib.parse import urlparse
 
 OBJECT_STORAGE_TYPES = ["s3", "hdfs", "azure_blob_storage", "local_blob_storage", "web"]
+# Location of metadata of disks without explicit metadata_path setting.
+DEFAULT_DISKS_METADATA_PATH = "/var/lib/clickhouse/disks"
 
 
 @dataclass
@@ -42,6 +44,7 @@ class S3DiskConfiguration(ObjectStorageDiskConfiguration):
     secret_access_key: str
     bucket_name: str
     prefix: str
+    metadata_path: str
     OBJECT_STORAGE_TYPE = "s3"
 
     @staticmethod
@@ -67,6 +70,9 @@ class S3DiskConfiguration(ObjectStorageDiskConfiguration):
             secret_access_key=secret_access_key,
             bucket_name=bucket_name,
             prefix=prefix,
+            metadata_path=disk.get(
+                "metadata_path", f"{DEFAULT_DISKS_METADATA_PATH}/{name}"
+            ).rstrip("/"),
         )
 
     @staticmethod
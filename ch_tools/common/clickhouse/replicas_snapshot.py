@@ -0,0 +1,205 @@
+"""
+Snapshot of system.replicas optionally joined with aggregated system.replication_queue.
+
+Checks of replicated tables evaluate the snapshot instead of querying system tables separately,
+so a run of all checks puts one query's worth of load on the server. Columns requiring requests
+to ZooKeeper and the replication queue are fetched only by checks that need them.
+"""
+
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+from click import Context
+
+# Default value of max_replicated_merges_in_queue setting in ClickHouse.
+DEFAULT_MAX_REPLICATED_MERGES_IN_QUEUE = 16
+
+# Columns of system.replicas that don't require requests to ZooKeeper.
+REPLICAS_COLUMNS = """
+        database,
+        table,
+        zookeeper_path,
+        replica_path,
+        is_readonly,
+        absolute_delay,
+        future_parts,
+        parts_to_check,
+        queue_size,
+        inserts_in_queue,
+        merges_in_queue,
+        last_queue_update_exception,
+        zookeeper_exception"""
+
+SNAPSHOT_QUERY = f"""
+    SELECT{REPLICAS_COLUMNS}
+    FROM system.replicas
+"""
+
+REPLICATION_QUEUE_SNAPSHOT_QUERY = f"""
+    SELECT{REPLICAS_COLUMNS},
+        total_replicas,
+        q.tasks AS tasks,
+        q.errors AS errors,
+        q.max_execution AS max_execution,
+        q.exceptions AS exceptions,
+        q.max_execution_part AS max_execution_part,
+        q.retried_merges AS retried_merges,
+        (
+            SELECT toUInt64OrZero(any(value))
+            FROM system.merge_tree_settings
+            WHERE name = 'max_replicated_merges_in_queue'
+        ) AS max_replicated_merges_in_queue
+    FROM system.replicas
+    LEFT JOIN
+    (
+        SELECT
+            database,
+            table,
+            count() AS tasks,
+            countIf(last_exception != '' AND postpone_reason = '') AS errors,
+            max(IF(is_currently_executing, dateDiff('second', last_attempt_time, now()), 0)) AS max_execution,
+            groupUniqArray(IF(last_exception != '', concat(IF(postpone_reason = '', '     ', '<pr> '), last_exception), '')) AS exceptions,
+            argMax(new_part_name, IF(is_currently_executing, dateDiff('second', last_attempt_time, now()), 0)) AS max_execution_part,
+            countIf(type = 'MERGE_PARTS' AND num_tries >= 1000) AS retried_merges
+        FROM system.replication_queue
+        GROUP BY database, table
+    ) AS q USING (database, table)
+"""
+
+INT_COLUMNS = (
+    "absolute_delay",
+    "future_parts",
+    "parts_to_check",
+    "queue_size",
+    "inserts_in_queue",
+    "merges_in_queue",
+)
+
+REPLICATION_QUEUE_INT_COLUMNS = (
+    "total_replicas",
+    "tasks",
+    "errors",
+    "max_execution",
+    "retried_merges",
+)
+
+
+@dataclass
+class ReplicasSnapshot:
+    """
+    Rows of system.replicas, optionally with aggregated replication queue of the table.
+    """
+
+    replicas: List[Dict[str, Any]] = field(default_factory=list)
+    # Whether rows contain total_replicas and the aggregated replication queue.
+    with_replication_queue: bool = False
+    max_replicated_merges_in_queue: int = DEFAULT_MAX_REPLICATED_MERGES_IN_QUEUE
+    # Monotonic time of the snapshot creation.
+    created_at: float = 0.0
+
+    @classmethod
+    def fetch(
+        cls, ch_client: Any, with_replication_queue: bool = False
+    ) -> "ReplicasSnapshot":
+        query = (
+            REPLICATION_QUEUE_SNAPSHOT_QUERY
+            if with_replication_queue
+            else SNAPSHOT_QUERY
+        )
+        rows = ch_client.query_json_data(query=query, compact=False)
+        snapshot = cls(
+            with_replication_queue=with_replication_queue, created_at=time.monotonic()
+        )
+        int_columns: Tuple[str, ...] = INT_COLUMNS
+        if with_replication_queue:
+            int_columns += REPLICATION_QUEUE_INT_COLUMNS
+        for row in rows:
+            for column in int_columns:
+                row[column] = int(row[column])
+            row["is_readonly"] = bool(int(row["is_readonly"]))
+            if with_replication_queue:
+                max_merges = int(row.pop("max_replicated_merges_in_queue"))
+                if max_merges:
+                    snapshot.max_replicated_merges_in_queue = max_merges
+            snapshot.replicas.append(row)
+        return snapshot
+
+    def filter(self, database_pattern: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return replicas of databases matching the pattern. The pattern has the same meaning
+        as in `format_str_match` query template function.
+        """
+        if not database_pattern:
+            return self.replicas
+        regex = _pattern_to_regex(database_pattern)
+        return [row for row in self.replicas if regex.fullmatch(row["database"])]
+
+
+class ReplicasSnapshotCache:
+    """
+    Thread-safe cache of the snapshot shared by checks executed within a single run.
+    """
+
+    def __init__(self, max_age: float) -> None:
+        self._max_age = max_age
+        self._lock = threading.Lock()
+        self._snapshot: Optional[ReplicasSnapshot] = None
+
+    def get(
+        self, ch_client: Any, with_replication_queue: bool = False
+    ) -> ReplicasSnapshot:
+        """
+        Return the cached snapshot if it's fresh and has requested columns, otherwise fetch a new one.
+        """
+        with self._lock:
+            if (
+                self._snapshot is None
+                or time.monotonic() - self._snapshot.created_at > self._max_age
+                or (
+                    with_replication_queue and not self._snapshot.with_replication_queue
+                )
+            ):
+                self._snapshot = ReplicasSnapshot.fetch(
+                    ch_client, with_replication_queue
+                )
+            return self._snapshot
+
+
+def get_replicas_snapshot(
+    ctx: Context, with_replication_queue: bool = False
+) -> ReplicasSnapshot:
+    """
+    Return the snapshot from the cache in the context if there is one, otherwise fetch a new one.
+
+    If `with_replication_queue` is set, rows of the snapshot contain total_replicas, which costs
+    requests to ZooKeeper for every table, and the aggregated replication queue of the table.
+    """
+    # The module is imported by ch-monitoring root command, so the client with its dependencies
+    # is loaded only by checks using the snapshot.
+    # pylint: disable=import-outside-toplevel
+    from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
+
+    cache = ctx.obj.get("replicas_snapshot_cache")
+    if cache is None:
+        return ReplicasSnapshot.fetch(clickhouse_client(ctx), with_replication_queue)
+    return cache.get(clickhouse_client(ctx), with_replication_queue)
+
+
+def _pattern_to_regex(pattern: str) -> "re.Pattern[str]":
+    if "," in pattern:
+        return re.compile(
+            "|".join(re.escape(item.strip()) for item in pattern.split(","))
+        )
+
+    regex = ""
+    for char in pattern:
+        if char == "%":
+            regex += ".*"
+        elif char == "_":
+            regex += "."
+        else:
+            regex += re.escape(char)
+    return re.compile(regex, re.DOTALL)
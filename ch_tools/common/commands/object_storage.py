@@ -1,3 +1,4 @@
+import json
 import os
 import re
 import subprocess
@@ -13,18 +14,23 @@ from typing import Any, Callable, Dict, Generator, Iterator, List, Optional, Tup
 from click import Context
 from humanfriendly import format_size
 
-from ch_tools.chadmin.internal.object_storage import cleanup_s3_object_storage
+from ch_tools.chadmin.internal.object_storage import S3ObjectDeleter
+from ch_tools.chadmin.internal.object_storage.local_metadata_scan import (
+    LocalMetadataScanStats,
+    parse_metadata_strings,
+    scan_local_metadata,
+)
 from ch_tools.chadmin.internal.object_storage.obj_list_item import ObjListItem
 from ch_tools.chadmin.internal.object_storage.s3_cleanup_stats import (
     ResultStat,
     StatisticsPeriod,
 )
 from ch_tools.chadmin.internal.object_storage.s3_iterator import (
+    ShardListingStats,
     s3_object_storage_iterator,
 )
 from ch_tools.chadmin.internal.object_storage.s3_object_metadata import (
     S3ObjectLocalInfo,
-    S3ObjectLocalMetaData,
 )
 from ch_tools.chadmin.internal.process import kill_process
 from ch_tools.chadmin.internal.system import match_ch_backup_version, match_ch_version
@@ -35,12 +41,12 @@ from ch_tools.chadmin.internal.table import (
     table_exists,
 )
 from ch_tools.chadmin.internal.utils import (
-    DATETIME_FORMAT,
     Scope,
     assert_equal_table_schema_on_cluster,
     chunked,
     execute_query,
     execute_query_on_shard,
+    get_remote_table_for_hosts,
     get_table_function_for_scope,
 )
 from ch_tools.chadmin.internal.zookeeper import has_zk
@@ -50,13 +56,16 @@ from ch_tools.common.clickhouse.client.clickhouse_client import (
     ClickhouseClient,
     clickhouse_client,
 )
+from ch_tools.common.clickhouse.client.native import TSV_ESCAPES
 from ch_tools.common.clickhouse.client.query import Query
 from ch_tools.common.clickhouse.config.storage_configuration import S3DiskConfiguration
+from ch_tools.common.process_pool import execute_pipeline
+from ch_tools.common.utils import DATETIME_FORMAT
+from ch_tools.monrun_checks.clickhouse_info import ClickhouseInfo
 
-# Batch size for inserts in a listing table
-# Set not very big value due to default ClickHouse 'http_max_field_value_size' settings value 128Kb
-# TODO: streaming upload in POST body while INSERT
-INSERT_BATCH_SIZE = 500
+# Batch size for inserts in blobs tables. Data is sent in POST body, so batches are not limited by
+# ClickHouse 'http_max_field_value_size' setting.
+INSERT_BATCH_SIZE = 100000
 # The guard interval is used for S3 objects for which metadata is not found.
 # And for metadata for which object is not found in S3.
 # These objects are not counted if their last modified time fall in the interval from the moment of starting analyzing.
@@ -144,11 +153,17 @@ def clean(
         keep_table=keep_paths,
         use_saved=use_saved_list,
         ignore_missing_cloud_storage_backups=ignore_missing_cloud_storage_backups,
+        # Stale cache entries would make live objects look orphaned, so they are not trusted
+        # when objects are deleted.
+        reuse_local_metadata_cache=False,
     ) as (remote_blobs_table, local_blobs_table, orphaned_blobs_table):
         timeout = config["antijoin_timeout"]
         query_settings = {"receive_timeout": timeout, "max_execution_time": 0}
+        # The same time window is used for checks and deletion, so objects that get into
+        # the window after the checks are not deleted unchecked.
+        time_range_args = _time_range_args(from_time, to_time)
         orphaned_objects_iterator = _object_list_generator(
-            ctx, orphaned_blobs_table, from_time, to_time, query_settings, timeout
+            ctx, orphaned_blobs_table, time_range_args, query_settings, timeout
         )
         listing_size_in_bucket = int(
             ch_client.query_json_data_first_row(
@@ -161,10 +176,12 @@ def clean(
         if ctx.obj["config"]["object_storage"]["clean"]["verify"]:
             _sanity_check_before_cleanup(
                 ctx,
-                orphaned_objects_iterator,
                 ch_client,
                 listing_size_in_bucket,
                 orphaned_blobs_table,
+                time_range_args,
+                query_settings,
+                timeout,
                 verify_paths_regex,
                 dry_run,
             )
@@ -177,6 +194,7 @@ def clean(
             max_size_to_delete_fraction,
             stat_partitioning,
             dry_run,
+            ctx.obj["config"]["object_storage"]["clean"]["delete_in_flight_requests"],
         )
 
     return result_stat
@@ -280,7 +298,7 @@ def _calculate_size_limits(
 def _process_objects_batch(
     objects: List[ObjListItem],
     max_size_to_delete: int,
-    result_stat: ResultStat,
+    scheduled_size: int,
 ) -> Tuple[List[ObjListItem], bool]:
     """
     Processes a batch of objects, fitting them to size constraints.
@@ -289,12 +307,12 @@ def _process_objects_batch(
     batch_size = sum(obj.size for obj in objects)
     is_last_batch = False
 
-    if result_stat.total["total_size"] + batch_size > max_size_to_delete:
+    if scheduled_size + batch_size > max_size_to_delete:
         # To fit into the size restriction: sort all objects by size
         # And remove elements from the end
         is_last_batch = True
         objects = sorted(objects, key=lambda obj: obj.size)
-        while result_stat.total["total_size"] + batch_size > max_size_to_delete:
+        while scheduled_size + batch_size > max_size_to_delete:
             batch_size -= objects[-1].size
             objects.pop()
 
@@ -309,6 +327,7 @@ def _cleanup_orphaned_objects(
     max_size_to_delete_fraction: float,
     stat_partitioning: StatisticsPeriod,
     dry_run: bool,
+    max_in_flight: int,
 ) -> ResultStat:
     """
     Performs the main logic for cleaning up orphaned objects.
@@ -319,21 +338,26 @@ def _cleanup_orphaned_objects(
         listing_size_in_bucket, max_size_to_delete_bytes, max_size_to_delete_fraction
     )
 
-    for objects in chunked(orphaned_objects_iterator(), KEYS_BATCH_SIZE):
-        objects, is_last_batch = _process_objects_batch(
-            objects, max_size_to_delete, result_stat
-        )
+    # Size of objects scheduled for deletion. Deletion is asynchronous, so result_stat is behind it.
+    scheduled_size = 0
+    with S3ObjectDeleter(disk_conf, result_stat, dry_run, max_in_flight) as deleter:
+        for objects in chunked(orphaned_objects_iterator(), KEYS_BATCH_SIZE):
+            objects, is_last_batch = _process_objects_batch(
+                objects, max_size_to_delete, scheduled_size
+            )
 
-        cleanup_s3_object_storage(disk_conf, iter(objects), result_stat, dry_run)
+            deleter.delete(objects)
+            scheduled_size += sum(obj.size for obj in objects)
 
-        if is_last_batch:
-            break
+            if is_last_batch:
+                break
 
     deleted = result_stat.total["deleted"]
     total_size = format_size(result_stat.total["total_size"], binary=True)
     logging.info(
         f"{'Would delete' if dry_run else 'Deleted'} {deleted} objects with total size {total_size} from bucket [{disk_conf.bucket_name}]",
     )
+    deleter.raise_for_errors()
 
     return result_stat
 
@@ -426,6 +450,7 @@ def _get_blobs_tables(
     keep_table: bool = True,
     use_saved: bool = False,
     ignore_missing_cloud_storage_backups: bool = False,
+    reuse_local_metadata_cache: bool = True,
 ) -> Generator[Tuple[str, str, str], None, None]:
     """
     Returns tuple: (remote_blobs_table, local_blobs_table, orphaned_blobs_table)
@@ -444,6 +469,7 @@ def _get_blobs_tables(
         _local_blobs_table(
             ctx,
             ignore_missing_cloud_storage_backups=ignore_missing_cloud_storage_backups,
+            reuse_local_metadata_cache=reuse_local_metadata_cache,
         ) as local_blobs_table,
         _orphaned_blobs_table(
             ctx, local_blobs_table, remote_blobs_table
@@ -459,6 +485,7 @@ def _local_blobs_table(
     keep_table: bool = True,
     use_saved: bool = False,
     ignore_missing_cloud_storage_backups: bool = False,
+    reuse_local_metadata_cache: bool = True,
 ) -> Generator[str, None, None]:
     """
     Context manager for creating and managing the local_blobs table.
@@ -485,22 +512,15 @@ def _local_blobs_table(
                 drop_existing_table=True,
             )
 
-            remote_data_paths_table = get_table_function_for_scope(
-                ctx, REMOTE_DATA_PATHS_TABLE, Scope.SHARD, cluster_name=None
-            )
-
-            local_blobs_query = _get_fill_local_blobs_table_query(
-                ctx, local_blobs_table, remote_data_paths_table, disk_conf.name
-            )
-
-            timeout = config["antijoin_timeout"]
-            query_settings = {"receive_timeout": timeout, "max_execution_time": 0}
-            execute_query(
-                ctx,
-                local_blobs_query,
-                timeout=timeout,
-                settings=query_settings,
-            )
+            if config["local_blobs_scan"]["incremental"]:
+                _fill_local_blobs_table_incrementally(
+                    ctx, local_blobs_table, reuse_local_metadata_cache
+                )
+            else:
+                remote_data_paths_table = get_table_function_for_scope(
+                    ctx, REMOTE_DATA_PATHS_TABLE, Scope.SHARD, cluster_name=None
+                )
+                _fill_local_blobs_table(ctx, local_blobs_table, remote_data_paths_table)
 
             if not ignore_missing_cloud_storage_backups:
                 _insert_missing_s3_backups_blobs(ctx, local_blobs_table, disk_conf)
@@ -511,6 +531,89 @@ def _local_blobs_table(
             delete_table_by_full_name(ctx, local_blobs_table)
 
 
+def _fill_local_blobs_table(
+    ctx: Context, local_blobs_table: str, remote_data_paths_table: str
+) -> None:
+    """
+    Fill local_blobs_table from system.remote_data_paths.
+    """
+    config = ctx.obj["config"]["object_storage"]["space_usage"]
+    disk_conf: S3DiskConfiguration = ctx.obj["disk_configuration"]
+
+    local_blobs_query = _get_fill_local_blobs_table_query(
+        ctx, local_blobs_table, remote_data_paths_table, disk_conf.name
+    )
+
+    timeout = config["antijoin_timeout"]
+    query_settings = {"receive_timeout": timeout, "max_execution_time": 0}
+    execute_query(
+        ctx,
+        local_blobs_query,
+        timeout=timeout,
+        settings=query_settings,
+    )
+
+
+def _fill_local_blobs_table_incrementally(
+    ctx: Context, local_blobs_table: str, reuse_cache: bool = True
+) -> None:
+    """
+    Fill local_blobs_table with objects of the local replica by scanning disk metadata on the local
+    filesystem, reusing the results of the previous scan for unchanged parts if `reuse_cache` is set.
+    Objects of other replicas of the shard are taken from their system.remote_data_paths.
+    """
+    scan_config = ctx.obj["config"]["object_storage"]["space_usage"]["local_blobs_scan"]
+    disk_conf: S3DiskConfiguration = ctx.obj["disk_configuration"]
+
+    local_replica = clickhouse_client(ctx).query_json_data_first_row(
+        query="SELECT hostName()", compact=True
+    )[0]
+    other_replicas = [
+        replica
+        for replica in ClickhouseInfo.get_replicas(ctx)
+        if replica != local_replica
+    ]
+    if other_replicas:
+        _fill_local_blobs_table(
+            ctx,
+            local_blobs_table,
+            get_remote_table_for_hosts(ctx, REMOTE_DATA_PATHS_TABLE, other_replicas),
+        )
+
+    stats = LocalMetadataScanStats()
+
+    def _generate_blobs() -> Iterator[Tuple[LocalState, S3ObjectLocalInfo]]:
+        for directory, item in scan_local_metadata(
+            disk_conf.metadata_path,
+            scan_config["cache_path"].format(disk=disk_conf.name),
+            workers=scan_config["workers"],
+            # Shadow directory is traversed by system.remote_data_paths since 24.3
+            include_shadow=match_ch_version(ctx, "24.3"),
+            stats=stats,
+            reuse_cache=reuse_cache,
+        ):
+            yield _get_local_state(directory), item
+
+    for batch in chunked(_generate_blobs(), INSERT_BATCH_SIZE):
+        _insert_local_blobs_batch(
+            ctx, batch, local_blobs_table, local_replica, disk_conf
+        )
+
+    logging.info("Scanned local disk metadata: {}", stats)
+
+
+def _get_local_state(directory: str) -> LocalState:
+    """
+    Get state of objects by the path of metadata directory relative to the disk path.
+    """
+    path = f"{directory}/"
+    if "shadow/" in path:
+        return LocalState.SHADOW
+    if "detached/" in path:
+        return LocalState.DETACHED
+    return LocalState.ACTIVE
+
+
 def _insert_missing_s3_backups_blobs(
     ctx: Context,
     local_blobs_table: str,
@@ -520,27 +623,31 @@ def _insert_missing_s3_backups_blobs(
     Download cloud storage metadata for missing backups and put it to local_blobs_table.
     """
 
+    workers = ctx.obj["config"]["object_storage"]["space_usage"]["local_blobs_scan"][
+        "workers"
+    ]
+
     def _insert_blobs_from_tar(pipe_path: str) -> None:
-        def _generate_blobs_from_tar_files() -> Iterator[S3ObjectLocalInfo]:
+        def _read_tar_files() -> Iterator[str]:
             with open(pipe_path, "rb") as pipe:
                 with tarfile.open(fileobj=pipe, mode="r|*") as tar:
                     for member in tar:
                         file = tar.extractfile(member)
                         if file:
-                            data = file.read().decode("utf-8")
-                            yield from S3ObjectLocalMetaData.from_string(data).objects
+                            yield file.read().decode("utf-8")
 
         total_blobs = 0
-        for metadata_list in chunked(
-            _generate_blobs_from_tar_files(), INSERT_BATCH_SIZE
-        ):
+        blobs = (
+            (LocalState.SHADOW, item)
+            for item in parse_metadata_strings(_read_tar_files(), workers)
+        )
+        for metadata_list in chunked(blobs, INSERT_BATCH_SIZE):
             total_blobs += len(metadata_list)
             _insert_local_blobs_batch(
                 ctx,
                 metadata_list,
                 local_blobs_table,
                 UNKNOWN_REPLICAS_NAME,
-                LocalState.SHADOW,
                 disk_conf,
             )
 
@@ -802,31 +909,44 @@ def _collect_space_usage(
     delete_table_by_full_name(ctx, space_usage_table_new, shard=True)
 
 
+# Condition on object modification time used in queries to blobs tables.
+TIME_RANGE_CONDITION = """
+        {%- if from_time_cond %}
+            AND last_modified >= toDateTime('{{ from_time_cond }}')
+        {%- endif %}
+        {%- if to_time_cond %}
+            AND last_modified <= toDateTime('{{ to_time_cond }}')
+        {%- endif %}
+"""
+
+
+def _time_range_args(
+    from_time: Optional[timedelta], to_time: Optional[timedelta]
+) -> Dict[str, Any]:
+    now = datetime.now(timezone.utc)
+    return {
+        "from_time_cond": (
+            (now - from_time).strftime(DATETIME_FORMAT)
+            if from_time is not None
+            else None
+        ),
+        "to_time_cond": (
+            (now - to_time).strftime(DATETIME_FORMAT) if to_time is not None else None
+        ),
+    }
+
+
 def _object_list_generator(
     ctx: Context,
     table_name: str,
-    from_time: Optional[timedelta],
-    to_time: Optional[timedelta],
+    time_range_args: Dict[str, Any],
     query_settings: Dict[str, Any],
     timeout: Optional[int] = None,
 ) -> Callable:
-    now = datetime.now(timezone.utc)
-    from_time_cond = (
-        (now - from_time).strftime(DATETIME_FORMAT) if from_time is not None else None
-    )
-    to_time_cond = (
-        (now - to_time).strftime(DATETIME_FORMAT) if to_time is not None else None
-    )
-
-    query = """
-        SELECT * FROM {{ table_name }}
+    query = f"""
+        SELECT last_modified, obj_path, obj_size FROM {{{{ table_name }}}}
         WHERE 1
-        {%- if from_time_cond %}
-            AND last_modified >= toDateTime('{{ from_time_cond }}')
-        {%- endif %}
-        {%- if to_time_cond %}
-            AND last_modified <= toDateTime('{{ to_time_cond }}')
-        {%- endif %}
+        {TIME_RANGE_CONDITION}
         ORDER BY last_modified
         """
 
@@ -834,32 +954,35 @@ def _object_list_generator(
         with execute_query(
             ctx,
             query,
-            format_="JSONEachRow",
+            format_="JSONCompactEachRow",
             timeout=timeout,
             settings=query_settings,
             stream=True,
             table_name=table_name,
-            from_time_cond=from_time_cond,
-            to_time_cond=to_time_cond,
+            **time_range_args,
         ) as resp:
             for line in resp.iter_lines():
-                yield ObjListItem.from_json(line)
+                yield ObjListItem.from_json_compact(line)
 
     return obj_list_iterator
 
 
 def _sanity_check_before_cleanup(
     ctx: Context,
-    orphaned_objects_iterator: Callable,
     ch_client: ClickhouseClient,
     listing_size_in_bucket: int,
     orphaned_blobs_table: str,
+    time_range_args: Dict[str, Any],
+    query_settings: Dict[str, Any],
+    timeout: Optional[int],
     verify_paths_regex: Optional[str],
     dry_run: bool,
 ) -> None:
     """
     Performs safety checks before deleting objects.
     Uses orphaned_blobs_table to check paths and size of objects to delete.
+
+    Checks are performed by a single aggregate query, so the table is not read on the client side.
     """
     size_error_rate_threshold_fraction = ctx.obj["config"]["object_storage"]["clean"][
         "verify_size_error_rate_threshold_fraction"
@@ -871,7 +994,13 @@ def _sanity_check_before_cleanup(
             "verify_paths_regex"
         ]["shard"]
 
-    paths_regex_compiled = re.compile(paths_regex)
+    # re.match() matches at the beginning of the string, while ClickHouse match() searches anywhere.
+    paths_regex_cond = "match(obj_path, {{ paths_regex_literal }})"
+    query_args: Dict[str, Any] = {
+        "table_name": orphaned_blobs_table,
+        "paths_regex_literal": _quote_string(f"^(?:{paths_regex})"),
+        **time_range_args,
+    }
 
     def raise_or_warn(dry_run: bool, msg: str) -> None:
         if not dry_run:
@@ -879,45 +1008,58 @@ def _sanity_check_before_cleanup(
 
         logging.warning(f"Warning: {msg}")
 
+    summary = ch_client.query_rows(
+        f"""
+        SELECT
+            count() AS count,
+            sum(obj_size) AS total_size,
+            countIf(NOT {paths_regex_cond}) AS mismatched_count,
+            anyIf(obj_path, NOT {paths_regex_cond}) AS mismatched_path
+        FROM {{{{ table_name }}}}
+        WHERE 1
+        {TIME_RANGE_CONDITION}
+        """,
+        query_args=query_args,
+        timeout=timeout,
+        settings=query_settings,
+    )[0]
+
+    # Skip validation if no objects to check
+    if int(summary["count"]) == 0:
+        return
+
     def perform_check_paths() -> None:
         """
         Validate that object paths match expected regex pattern.
         This prevents accidental deletion of objects with unexpected paths.
         """
-        orphaned_objects_count = int(
-            ch_client.query_json_data_first_row(
-                query=Query(
-                    f"SELECT count() FROM {orphaned_blobs_table}",
-                    sensitive_args={"user_password": ch_client.password or ""},
-                ),
-                compact=True,
-            )[0]
-        )
-
-        # Skip validation if no objects to check
-        if orphaned_objects_count == 0:
+        if int(summary["mismatched_count"]) == 0:
             return
 
-        # Get a sample path from database for initial validation
-        sample_path = ch_client.query_json_data_first_row(
-            query=Query(
-                f"SELECT obj_path FROM {orphaned_blobs_table} LIMIT 1",
-                sensitive_args={"user_password": ch_client.password or ""},
-            ),
-            compact=True,
-        )[0]
-
-        if not paths_regex_compiled.match(sample_path):
-            raise_or_warn(
-                dry_run,
-                f"Path validation failed: sample path '{sample_path}' doesn't match regex '{paths_regex}'",
+        # Fail on the first mismatched path, report all of them in dry run mode.
+        if not dry_run:
+            raise RuntimeError(
+                f"Path validation failed: object path '{summary['mismatched_path']}' doesn't match regex '{paths_regex}'"
             )
 
-        for orphaned_object in orphaned_objects_iterator():
-            if not paths_regex_compiled.match(orphaned_object.path):
+        with execute_query(
+            ctx,
+            f"""
+            SELECT obj_path FROM {{{{ table_name }}}}
+            WHERE NOT {paths_regex_cond}
+            {TIME_RANGE_CONDITION}
+            ORDER BY last_modified
+            """,
+            format_="JSONCompactEachRow",
+            timeout=timeout,
+            settings=query_settings,
+            stream=True,
+            **query_args,
+        ) as resp:
+            for line in resp.iter_lines():
                 raise_or_warn(
                     dry_run,
-                    f"Path validation failed: object path '{orphaned_object.path}' doesn't match regex '{paths_regex}'",
+                    f"Path validation failed: object path '{json.loads(line)[0]}' doesn't match regex '{paths_regex}'",
                 )
 
     def perform_check_size() -> None:
@@ -928,10 +1070,7 @@ def _sanity_check_before_cleanup(
         if listing_size_in_bucket == 0:
             return
 
-        # Calculate total size of objects to be deleted
-        total_size_to_delete = 0
-        for orphaned_object in orphaned_objects_iterator():
-            total_size_to_delete += orphaned_object.size
+        total_size_to_delete = int(summary["total_size"])
 
         # Check if deletion size exceeds safety threshold
         if (
@@ -952,6 +1091,14 @@ def _sanity_check_before_cleanup(
         perform_check_size()
 
 
+def _quote_string(value: str) -> str:
+    """
+    Format string as ClickHouse string literal.
+    """
+    escaped = value.replace("\\", "\\\\").replace("'", "\\'")
+    return f"'{escaped}'"
+
+
 def _collect_remote_blobs(
     ctx: Context,
     from_time: Optional[timedelta],
@@ -971,28 +1118,69 @@ def _collect_remote_blobs(
         f"Collecting objects... (Disk: '{disk_conf.name}', Endpoint '{disk_conf.endpoint_url}', Bucket: '{disk_conf.bucket_name}', Prefix: '{prefix}')",
     )
 
-    obj_paths_batch: List[ObjListItem] = []
+    listing_config = ctx.obj["config"]["object_storage"]["listing"]
+    listing_stats: Dict[str, ShardListingStats] = {}
     counter = 0
     now = datetime.now(timezone.utc)
-    for obj in s3_object_storage_iterator(
-        ctx.obj["disk_configuration"], object_name_prefix=prefix
-    ):
-        if obj.last_modified > now - to_time:
-            continue
-        if from_time is not None and obj.last_modified < now - from_time:
-            continue
 
-        obj_paths_batch.append(ObjListItem(obj.last_modified, obj.key, obj.size))
-        counter += 1
-        if len(obj_paths_batch) >= INSERT_BATCH_SIZE:
-            _insert_remote_blobs_batch(ctx, obj_paths_batch, remote_blobs_table)
-            obj_paths_batch.clear()
-
-    # Insert the last batch (might be shorter)
-    if obj_paths_batch:
-        _insert_remote_blobs_batch(ctx, obj_paths_batch, remote_blobs_table)
+    def _generate_objects() -> Iterator[ObjListItem]:
+        nonlocal counter
+        for obj in s3_object_storage_iterator(
+            ctx.obj["disk_configuration"],
+            object_name_prefix=prefix,
+            workers=listing_config["workers"],
+            ordered=listing_config["ordered"],
+            stats=listing_stats,
+        ):
+            if obj.last_modified > now - to_time:
+                continue
+            if from_time is not None and obj.last_modified < now - from_time:
+                continue
+
+            counter += 1
+            yield ObjListItem(obj.last_modified, obj.key, obj.size)
+
+    # Batches are inserted by separate threads while listing proceeds.
+    pipeline_stats = execute_pipeline(
+        chunked(_generate_objects(), listing_config["insert_batch_size"]),
+        lambda batch: _insert_remote_blobs_batch(ctx, batch, remote_blobs_table),
+        workers=listing_config["insert_workers"],
+        queue_size=listing_config["insert_queue_size"],
+    )
 
     logging.info("Collected {} objects", counter)
+    logging.info("Listing to insert pipeline (batches): {}", pipeline_stats)
+    _log_listing_stats(listing_stats)
+
+
+def _log_listing_stats(listing_stats: Dict[str, ShardListingStats]) -> None:
+    """
+    Log per-shard throughput of sharded listing.
+    """
+    if not listing_stats:
+        return
+
+    total = ShardListingStats("")
+    for shard_stats in listing_stats.values():
+        total.update(shard_stats)
+        logging.debug(
+            "Listed '{}': {} objects, {}, {} pages in {:.2f}s ({:.0f} objects/s, {}/s)",
+            shard_stats.prefix,
+            shard_stats.objects,
+            format_size(shard_stats.bytes),
+            shard_stats.pages,
+            shard_stats.elapsed,
+            shard_stats.objects_per_second,
+            format_size(shard_stats.bytes_per_second),
+        )
+
+    logging.info(
+        "Listed {} shards: {} objects, {} in {:.2f}s of total listing time",
+        len(listing_stats),
+        total.objects,
+        format_size(total.bytes),
+        total.elapsed,
+    )
 
 
 def _insert_remote_blobs_batch(
@@ -1001,37 +1189,35 @@ def _insert_remote_blobs_batch(
     """
     Insert batch of object names to the listing table.
     """
-    batch_values = ",".join(
-        f"('{item.last_modified.strftime(DATETIME_FORMAT)}','{item.path}',{item.size})"
+    data = "".join(
+        f"{item.last_modified.strftime(DATETIME_FORMAT)}\t{item.path.translate(TSV_ESCAPES)}\t{item.size}\n"
         for item in obj_paths_batch
     )
-    execute_query(
-        ctx,
-        f"INSERT INTO {remote_blobs_table} (last_modified, obj_path, obj_size) VALUES {batch_values}",
-        format_=None,
+    clickhouse_client(ctx).query(
+        f"INSERT INTO {remote_blobs_table} (last_modified, obj_path, obj_size) FORMAT TabSeparated",
+        post_data=data,
         log_query=False,
     )
 
 
 def _insert_local_blobs_batch(
     ctx: Context,
-    obj_paths_batch: List[S3ObjectLocalInfo],
+    obj_paths_batch: List[Tuple[LocalState, S3ObjectLocalInfo]],
     local_blobs_table: str,
     replica: str,
-    state: LocalState,
     disk_conf: S3DiskConfiguration,
 ) -> None:
     """
     Insert batch of object names to the listing table.
     """
-    batch_values = ",".join(
-        f"('{replica}','{item.key if item.key_is_full else os.path.join(disk_conf.prefix, item.key)}','{state}',{item.size},1)"
-        for item in obj_paths_batch
+    replica = replica.translate(TSV_ESCAPES)
+    data = "".join(
+        f"{replica}\t{(item.key if item.key_is_full else os.path.join(disk_conf.prefix, item.key)).translate(TSV_ESCAPES)}\t{state.value}\t{item.size}\t1\n"
+        for state, item in obj_paths_batch
     )
-    execute_query(
-        ctx,
-        f"INSERT INTO {local_blobs_table} (replica, obj_path, state, obj_size, ref_count) VALUES {batch_values}",
-        format_=None,
+    clickhouse_client(ctx).query(
+        f"INSERT INTO {local_blobs_table} (replica, obj_path, state, obj_size, ref_count) FORMAT TabSeparated",
+        post_data=data,
         log_query=False,
     )
 
@@ -3,7 +3,10 @@ from typing import Any, Dict, Tuple
 from click import Context
 from tabulate import tabulate
 
-from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
+from ch_tools.common.clickhouse.replicas_snapshot import (
+    ReplicasSnapshot,
+    get_replicas_snapshot,
+)
 from ch_tools.common.result import Result
 
 
@@ -21,9 +24,9 @@ def estimate_replication_lag(
     Should be: lag >= lag_with_errors, lag >= max_execution
     """
     # pylint: disable=too-many-branches,too-many-locals
-    ch_client = clickhouse_client(ctx)
+    snapshot = get_replicas_snapshot(ctx, with_replication_queue=True)
     lag, lag_with_errors, max_execution, max_merges, chart = get_replication_lag(
-        ch_client
+        snapshot
     )
 
     msg_verbose = ""
@@ -93,7 +96,7 @@ def estimate_replication_lag(
     max_merges_warn_threshold = 1
     max_merges_crit_threshold = 1
     if max_merges > 0:
-        max_replicated_merges_in_queue = get_max_replicated_merges_in_queue(ch_client)
+        max_replicated_merges_in_queue = snapshot.max_replicated_merges_in_queue
         max_merges_warn_threshold = int(max_replicated_merges_in_queue * mwarn / 100.0)
         max_merges_crit_threshold = int(max_replicated_merges_in_queue * mcrit / 100.0)
 
@@ -114,29 +117,27 @@ def estimate_replication_lag(
     return Result(code=2, message=msg, verbose=msg_verbose)
 
 
-def get_replication_lag(ch_client: Any) -> Tuple[int, int, int, int, Any]:
+def get_replication_lag(snapshot: ReplicasSnapshot) -> Tuple[int, int, int, int, Any]:
     """
-    Get max absolute_delay from system.replicas.
+    Get max absolute_delay of replicated tables and the state of their replication queues.
     """
-
-    tables = get_tables_with_replication_delay(ch_client)
     chart: Dict[str, Dict[str, Any]] = {}
-    for t in tables:
-        key = "{database}.{table}".format(database=t["database"], table=t["table"])
-        chart[key] = {}
-        chart[key]["delay"] = int(t["absolute_delay"])
-    tables = count_errors(ch_client, tables, -1)
-
     max_merges = 0
-    for t in tables:
+    for t in snapshot.replicas:
+        if t["absolute_delay"] <= 0 or t["total_replicas"] <= 1:
+            continue
+
         key = "{database}.{table}".format(database=t["database"], table=t["table"])
-        chart[key]["tasks"] = int(t["tasks"])
-        chart[key]["errors"] = int(t["errors"])
-        chart[key]["max_execution"] = int(t["max_execution"])
-        chart[key]["max_execution_part"] = t["max_execution_part"]
-        chart[key]["exceptions"] = t["exceptions"]
-        chart[key]["retried_merges"] = int(t["retried_merges"])
-        max_merges = max(int(t["retried_merges"]), max_merges)
+        chart[key] = {
+            "delay": t["absolute_delay"],
+            "tasks": t["tasks"],
+            "errors": t["errors"],
+            "max_execution": t["max_execution"],
+            "max_execution_part": t["max_execution_part"],
+            "exceptions": t["exceptions"],
+            "retried_merges": t["retried_merges"],
+        }
+        max_merges = max(t["retried_merges"], max_merges)
         for exception in t["exceptions"]:
             if is_userfault_exception(exception):
                 chart[key]["userfault"] = True
@@ -162,53 +163,6 @@ def get_replication_lag(ch_client: Any) -> Tuple[int, int, int, int, Any]:
     return lag, lag_with_errors, max_execution, max_merges, chart
 
 
-def get_tables_with_replication_delay(ch_client: Any) -> Any:
-    """
-    Get tables with absolute_delay > 0 and total_replicas > 1.
-    """
-    query = """
-        SELECT
-            database,
-            table,
-            zookeeper_path,
-            absolute_delay
-        FROM system.replicas
-        WHERE absolute_delay > 0 AND total_replicas > 1
-    """
-    return ch_client.query_json_data(query=query, compact=False)
-
-
-def count_errors(ch_client: Any, tables: Any, exceptions_limit: int) -> Any:
-    """
-    Add count of replication errors.
-    """
-    if not tables:
-        return tables
-
-    limit = "" if exceptions_limit < 0 else "({})".format(exceptions_limit)
-
-    query = """
-        SELECT
-            database,
-            table,
-            count() as tasks,
-            countIf(last_exception != '' AND postpone_reason = '') as errors,
-            max(IF(is_currently_executing, dateDiff('second', last_attempt_time, now()), 0)) as max_execution,
-            groupUniqArray{limit}(IF(last_exception != '', concat(IF(postpone_reason = '', '     ', '<pr> '), last_exception), '')) as exceptions,
-            argMax(new_part_name, IF(is_currently_executing, dateDiff('second', last_attempt_time, now()), 0)) as max_execution_part,
-            countIf(type = 'MERGE_PARTS' and num_tries >= 1000) as retried_merges
-        FROM system.replication_queue
-        WHERE (database, table) IN ({tables})
-        GROUP BY database,table
-        """.format(
-        tables=",".join(
-            "('{0}', '{1}')".format(t["database"], t["table"]) for t in tables
-        ),
-        limit=limit,
-    )
-    return ch_client.query_json_data(query=query, compact=False)
-
-
 def is_userfault_exception(exception: str) -> bool:
     """
     Check if exception was caused by user.
@@ -226,18 +180,3 @@ def is_userfault_exception(exception: str) -> bool:
         return True
 
     return False
-
-
-def get_max_replicated_merges_in_queue(ch_client: Any) -> int:
-    """
-    Get max_replicated_merges_in_queue value
-    """
-    query = """
-        SELECT value FROM system.merge_tree_settings WHERE name='max_replicated_merges_in_queue'
-    """
-    res = ch_client.query_json_data(query=query)
-    if not res:
-        return (
-            16  # 16 is default value for 'max_replicated_merges_in_queue' in ClickHouse
-        )
-    return int(res[0][0])
@@ -0,0 +1,76 @@
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from click import Command, Context
+
+from ch_tools.common import logging
+from ch_tools.common.process_pool import WorkerTask, execute_tasks_with_timeouts
+from ch_tools.common.result import WARNING, Status
+from ch_tools.common.utils import get_full_command_name
+
+
+@dataclass
+class CheckResult:
+    name: str
+    status: Status
+    # Execution time of the check in seconds.
+    duration: float
+
+
+def run_checks(
+    ctx: Context, commands: List[Command], config: Dict[str, Any]
+) -> List[CheckResult]:
+    """
+    Run enabled monitoring checks concurrently and return their results in the order of commands.
+
+    A check not completed within the timeout is reported with WARNING status, it doesn't delay
+    reporting results of other checks.
+    """
+    status_config = ctx.obj["config"]["monitoring"]["status"]
+    tasks = [
+        WorkerTask(str(cmd.name), run_check, {"ctx": ctx, "cmd": cmd})
+        for cmd in commands
+        if not config.get(str(cmd.name), {}).get("@disabled")
+    ]
+
+    results = []
+    for task in execute_tasks_with_timeouts(
+        tasks,
+        timeout=status_config["check_timeout"],
+        total_timeout=status_config["total_timeout"],
+        max_workers=status_config["max_workers"],
+    ):
+        try:
+            status = task.future.result()
+        except Exception as e:
+            logging.warning("Check {} failed: {!r}", task.identifier, e)
+            status = Status()
+            status.append(str(e) if isinstance(e, TimeoutError) else repr(e))
+            status.set_code(WARNING)
+        results.append(CheckResult(task.identifier, status, task.duration))
+
+    return results
+
+
+def run_check(
+    ctx: Context, cmd: Command, obj: Optional[Dict[str, Any]] = None
+) -> Status:
+    """
+    Invoke the check in status mode and return its status. The check is logged under its own
+    command name, so it may be executed concurrently with other checks.
+
+    The check gets its own context object, so caches and clients created by one check are not
+    shared with checks executed concurrently. It's a copy of the context object unless `obj` is
+    passed to keep clients of the check between its runs.
+    """
+    check_ctx = Context(
+        ctx.command,
+        parent=ctx.parent,
+        info_name=ctx.info_name,
+        obj=obj if obj is not None else dict(ctx.obj),
+        default_map=ctx.default_map,
+    )
+    with logging.contextualize(
+        cmd_name=f"{get_full_command_name(ctx)} {cmd.name}".strip()
+    ):
+        return check_ctx.invoke(cmd)
@@ -9,6 +9,7 @@ from ch_tools.common.yaml import load_yaml
 CHADMIN_LOG_FILE = "/var/log/chadmin/chadmin.log"
 CH_MONITORING_LOG_FILE = "/var/log/clickhouse-monitoring/clickhouse-monitoring.log"
 KEEPER_MONITORING_LOG_FILE = "/var/log/keeper-monitoring/keeper-monitoring.log"
+CH_MONITORING_SOCKET_FILE = "/run/clickhouse-monitoring/ch-monitoring.sock"
 
 CONFIG_FILE = "/etc/clickhouse-tools/config.yaml"
 
@@ -32,6 +33,15 @@ DEFAULT_CONFIG = {
         "monitoring_password": None,
         "distributed_ddl_path": "/clickhouse/task_queue/ddl",
         "timeout": 60,
+        # Max number of keep-alive HTTP connections kept open per ClickHouse host.
+        "pool_size": 10,
+        # Use native protocol for queries over TCP ports. It requires "native" extra (clickhouse-driver
+        # package). Otherwise, queries are executed by spawning clickhouse-client.
+        "native_protocol": False,
+        # Compress data transferred over native protocol (requires lz4 and clickhouse-cityhash packages).
+        "compression": False,
+        # Max number of queries executed simultaneously by commands running a query on several replicas.
+        "fan_out_concurrency": 8,
         "attach_table_timeout": 10 * 60,
         "detach_table_timeout": 10 * 60,
         "alter_table_timeout": 10 * 60,
@@ -51,6 +61,19 @@ DEFAULT_CONFIG = {
                 "cluster": r"^(\w+)/(\w+)/",
             },
             "verify_size_error_rate_threshold_fraction": 0.9,
+            # Number of DeleteObjects requests executed concurrently.
+            "delete_in_flight_requests": 4,
+        },
+        "listing": {
+            # Number of threads listing sub-prefixes of the bucket concurrently. 1 disables sharded listing.
+            "workers": 8,
+            # Return objects in the order of keys instead of the order of listing completion.
+            "ordered": False,
+            # Listed objects are inserted into the listing table by batches in TSV format.
+            "insert_batch_size": 100000,
+            "insert_workers": 2,
+            # Maximum number of batches waiting for insert. Listing is suspended when it is reached.
+            "insert_queue_size": 4,
         },
         "space_usage": {
             "service_tables_retention_days": 7,
@@ -67,12 +90,26 @@ DEFAULT_CONFIG = {
                 "timeout": 1800,
                 "named_pipe_path": "/tmp/cloud-storage-metadata-pipe",
             },
+            "local_blobs_scan": {
+                # Scan metadata of the local replica on the filesystem and parse only changed parts
+                # instead of reading system.remote_data_paths. Metadata location is taken from
+                # metadata_path setting of the disk in ClickHouse config. The cache of parsed parts is not
+                # reused by cleanup of orphaned objects.
+                "incremental": False,
+                "cache_path": "/var/tmp/chadmin-local-blobs-{disk}.json",
+                # Number of processes parsing metadata files, including metadata of missing backups.
+                "workers": 4,
+            },
         },
     },
     "zookeeper": {
         "randomize_hosts": True,
         "username": None,
         "password": None,
+        # Number of concurrent requests issued by ZooKeeper tree traversals.
+        "walk_window": 100,
+        # Number of concurrent transactions issued by recursive deletion.
+        "delete_in_flight_transactions": 4,
     },
     # Configuration of chadmin tool commands and options.
     "chadmin": {
@@ -103,6 +140,7 @@ DEFAULT_CONFIG = {
                 "mwarn": 50.0,
                 "sync_query_max_retries": 10,
                 "sync_query_max_backoff": 10,
+                "workers": 4,
             },
         },
         "zookeeper": {
@@ -112,6 +150,13 @@ DEFAULT_CONFIG = {
                 "retry_min_wait_sec": 60,
                 "retry_max_wait_sec": 60 * 10,
                 "max_retries": 25,
+                # Max number of concurrent drops of replicas of objects sharing the parent ZooKeeper node,
+                # i.e. tables of the same database or replicas of the same table in case of per-table paths.
+                # It keeps a single prefix from occupying all workers. Zero value disables the limit.
+                "max_workers_per_zk_path_prefix": 4,
+                # Path of the file where completed drops are persisted to resume interrupted cleanup.
+                # Disabled by default. Replicas from the checkpoint are checked in ZooKeeper on resume.
+                "checkpoint_path": "",
                 "excluded_paths": [
                     ".*clickhouse/task_queue",
                     ".*clickhouse/zero_copy",
@@ -150,9 +195,23 @@ DEFAULT_CONFIG = {
                 },
             ],
         },
+        # Settings of "status" command performing all checks concurrently.
+        "status": {
+            "max_workers": 8,
+            # Checks not completed within the timeouts are reported with WARNING status.
+            "check_timeout": 30,
+            "total_timeout": 50,
+        },
+        # Max age in seconds of the snapshot of system.replicas shared by checks of replicated tables.
+        "replicas_snapshot_max_age": 10,
     },
     # Configuration of ch-monitoring tool commands and options.
     "ch-monitoring": {
+        "daemon": {
+            # Default interval between check runs. It can be overridden for a check by "@interval" setting.
+            "interval": 60,
+            "check_timeout": 30,
+        },
         "log-errors": {
             "@disabled": False,
             "crit": 60,
@@ -160,6 +219,8 @@ DEFAULT_CONFIG = {
             "watch_seconds": 600,
             "exclude": r"e\.displayText\(\) = No message received",
             "logfile": "/var/log/clickhouse-server/clickhouse-server.err.log",
+            # Only lines appended since the previous run are read if it's set. Empty value disables it.
+            "state_file": "/var/tmp/ch-monitoring-log-errors.json",
         },
         "core-dumps": {
             "@disabled": False,
@@ -5,6 +5,7 @@ Logging module.
 import inspect
 import logging
 import sys
+import threading
 import traceback
 from functools import partial
 from logging import (  # noqa # pylint:disable=unused-import
@@ -26,6 +27,7 @@ MESSAGE_HEAD_LIMIT = 800
 MESSAGE_TAIL_LIMIT = 300
 
 logger_config: Dict[str, Any] = {}
+_stdout_logger_lock = threading.Lock()
 
 
 class Filter:
@@ -258,24 +260,34 @@ def disable_stdout_logger() -> None:
     """
     Removes stdout handler. May be used for commands with "quiet" option.
     """
-    if logger_config["stdout_logger_id"]:
-        logger.remove(logger_config["stdout_logger_id"])
-        logger_config["stdout_logger_id"] = None
+    with _stdout_logger_lock:
+        if logger_config["stdout_logger_id"]:
+            logger.remove(logger_config["stdout_logger_id"])
+            logger_config["stdout_logger_id"] = None
 
 
 def enable_stdout_logger() -> None:
     """
     Adds stdout logger.
     """
-    if logger_config.get("stdout_logger_id", None) is None:
-        logger_config["stdout_logger_id"] = logger.add(
-            sink=sys.stdout,
-            level="INFO",
-            format="{message}",
-            filter=make_filter(logger_config["module"]),
-            backtrace=False,
-            diagnose=False,
-        )
+    with _stdout_logger_lock:
+        if logger_config.get("stdout_logger_id", None) is None:
+            logger_config["stdout_logger_id"] = logger.add(
+                sink=sys.stdout,
+                level="INFO",
+                format="{message}",
+                filter=make_filter(logger_config["module"]),
+                backtrace=False,
+                diagnose=False,
+            )
+
+
+def contextualize(**kwargs: Any) -> Any:
+    """
+    Return context manager overriding extra values of log records in the current thread or task.
+    Allows commands executed concurrently to be logged with their own `cmd_name`.
+    """
+    return logger.contextualize(**kwargs)
 
 
 def print_last_exception() -> None:
@@ -1,6 +1,20 @@
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import heapq
+import json
+import os
+import queue
+import random
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ThreadPoolExecutor,
+    as_completed,
+    wait,
+)
 from dataclasses import dataclass
-from typing import Any, Callable, Dict, List
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Set, Tuple
 
 from ch_tools.common import logging
 
@@ -41,3 +55,338 @@ def execute_tasks_in_parallel(
                 else:
                     raise
         return result
+
+
+@dataclass
+class PipelineStats:
+    """
+    Throughput statistics of producer and consumer stages of the pipeline.
+    """
+
+    items: int = 0
+    produce_time: float = 0.0
+    consume_time: float = 0.0
+    backpressure_time: float = 0.0
+    elapsed: float = 0.0
+
+    def __str__(self) -> str:
+        return (
+            f"{self.items} items in {self.elapsed:.2f}s: "
+            f"producing {self.produce_time:.2f}s, consuming {self.consume_time:.2f}s, "
+            f"waiting for consumers {self.backpressure_time:.2f}s"
+        )
+
+
+_STOP = object()
+
+
+def execute_pipeline(
+    items: Iterable[Any],
+    consumer: Callable[[Any], None],
+    workers: int = 1,
+    queue_size: int = 4,
+) -> PipelineStats:
+    """
+    Pass items produced by the iterable to the consumer executed by worker threads.
+
+    Items are passed through a bounded queue, so producing is suspended while consumers are busy
+    and `queue_size` items are pending. The first consumer error stops the pipeline and is raised.
+    """
+    stats = PipelineStats()
+    stats_lock = threading.Lock()
+    pending: queue.Queue = queue.Queue(maxsize=queue_size)
+    failed = threading.Event()
+    errors: List[BaseException] = []
+
+    def _consume() -> None:
+        while True:
+            item = pending.get()
+            if item is _STOP:
+                return
+            if failed.is_set():
+                continue
+            start = time.monotonic()
+            try:
+                consumer(item)
+            except BaseException as e:
+                errors.append(e)
+                failed.set()
+            with stats_lock:
+                stats.consume_time += time.monotonic() - start
+
+    def _put(item: Any) -> None:
+        start = time.monotonic()
+        pending.put(item)
+        stats.backpressure_time += time.monotonic() - start
+
+    start_time = time.monotonic()
+    threads = [
+        threading.Thread(target=_consume, daemon=True) for _ in range(max(workers, 1))
+    ]
+    for thread in threads:
+        thread.start()
+
+    try:
+        items_iter = iter(items)
+        while not failed.is_set():
+            start = time.monotonic()
+            item = next(items_iter, _STOP)
+            stats.produce_time += time.monotonic() - start
+            if item is _STOP:
+                break
+            _put(item)
+            stats.items += 1
+    finally:
+        for _ in threads:
+            _put(_STOP)
+        for thread in threads:
+            thread.join()
+        stats.elapsed = time.monotonic() - start_time
+
+    if errors:
+        raise errors[0]
+
+    return stats
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Policy of delayed retries of failed tasks. The delay grows exponentially with random jitter.
+    """
+
+    should_retry: Callable[[Exception], bool]
+    min_wait: float = 1.0
+    max_wait: float = 60.0
+    max_attempts: int = 3
+
+    def get_delay(self, attempt: int) -> float:
+        upper_bound = min(self.max_wait, self.min_wait * 2**attempt)
+        return random.uniform(self.min_wait, max(self.min_wait, upper_bound))
+
+
+class TaskCheckpoint:
+    """
+    Append-only file with identifiers of completed tasks. Allows to resume interrupted execution
+    without repeating completed tasks.
+
+    The first line holds the key of the execution, the checkpoint of another execution is discarded.
+    """
+
+    def __init__(self, path: str, key: Any) -> None:
+        self.path = path
+        self.completed: Set[str] = set()
+        self._header = json.dumps(key, sort_keys=True)
+
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            if lines and lines[0] == self._header:
+                self.completed.update(json.loads(line) for line in lines[1:] if line)
+            else:
+                logging.warning("Ignoring checkpoint {} of another execution", path)
+
+        # pylint: disable=consider-using-with
+        self._file = open(path, "w", encoding="utf-8")
+        self._file.write(self._header + "\n")
+        for identifier in self.completed:
+            self._file.write(json.dumps(identifier) + "\n")
+        self._file.flush()
+
+    def add(self, identifier: str) -> None:
+        self.completed.add(identifier)
+        self._file.write(json.dumps(identifier) + "\n")
+        self._file.flush()
+
+    def close(self, remove: bool = False) -> None:
+        self._file.close()
+        if remove:
+            os.remove(self.path)
+
+
+def execute_tasks_with_retries(
+    tasks: List[WorkerTask],
+    retry_policy: RetryPolicy,
+    max_workers: int = 4,
+    get_group: Optional[Callable[[WorkerTask], str]] = None,
+    max_workers_per_group: int = 0,
+    checkpoint: Optional[TaskCheckpoint] = None,
+    keep_going: bool = False,
+) -> Dict[str, Any]:
+    """
+    Execute tasks in parallel retrying failed ones according to the retry policy.
+
+    Tasks waiting for retry are kept in the delayed queue and don't occupy workers. If
+    `max_workers_per_group` is set, no more than that number of tasks of the same group
+    (determined by `get_group`) are executed concurrently. Tasks completed according to the
+    checkpoint are skipped, and newly completed tasks are added to it.
+    """
+    # pylint: disable=too-many-locals
+    ready: Deque[Tuple[WorkerTask, int]] = deque(
+        (task, 0)
+        for task in tasks
+        if checkpoint is None or task.identifier not in checkpoint.completed
+    )
+    # Heap of (ready time, sequence number, task, attempt).
+    delayed: List[Tuple[float, int, WorkerTask, int]] = []
+    running: Dict[Future, Tuple[WorkerTask, int]] = {}
+    running_per_group: Dict[str, int] = defaultdict(int)
+    sequence = 0
+    result: Dict[str, Any] = {}
+
+    def _group(task: WorkerTask) -> str:
+        return get_group(task) if get_group else ""
+
+    def _can_run(task: WorkerTask) -> bool:
+        return (
+            not max_workers_per_group
+            or running_per_group[_group(task)] < max_workers_per_group
+        )
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while ready or delayed or running:
+            now = time.monotonic()
+            while delayed and delayed[0][0] <= now:
+                _, _, task, attempt = heapq.heappop(delayed)
+                ready.append((task, attempt))
+
+            # Tasks of groups at the limit are postponed until group tasks complete.
+            postponed: Deque[Tuple[WorkerTask, int]] = deque()
+            while ready and len(running) < max_workers:
+                task, attempt = ready.popleft()
+                if not _can_run(task):
+                    postponed.append((task, attempt))
+                    continue
+                running[executor.submit(task.function, **task.kwargs)] = (task, attempt)
+                running_per_group[_group(task)] += 1
+            ready.extendleft(reversed(postponed))
+
+            timeout = max(delayed[0][0] - now, 0) if delayed else None
+            if not running:
+                time.sleep(timeout or 0)
+                continue
+
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                task, attempt = running.pop(future)
+                running_per_group[_group(task)] -= 1
+                try:
+                    result[task.identifier] = future.result()
+                    if checkpoint is not None:
+                        checkpoint.add(task.identifier)
+                except Exception as e:
+                    if (
+                        retry_policy.should_retry(e)
+                        and attempt + 1 < retry_policy.max_attempts
+                    ):
+                        delay = retry_policy.get_delay(attempt)
+                        logging.info(
+                            "Task {} will be retried in {:.0f}s: {!r}",
+                            task.identifier,
+                            delay,
+                            e,
+                        )
+                        sequence += 1
+                        heapq.heappush(
+                            delayed,
+                            (time.monotonic() + delay, sequence, task, attempt + 1),
+                        )
+                    elif keep_going:
+                        logging.warning(
+                            "Ignoring the exception while executing {} due to keep-going flag: {!r}",
+                            task.identifier,
+                            e,
+                        )
+                    else:
+                        for pending in running:
+                            pending.cancel()
+                        raise
+
+    return result
+
+
+@dataclass
+class CompletedTask:
+    identifier: str
+    # Either completed future of the task or the future failed with TimeoutError.
+    future: Future
+    # Time from the task start to its completion or timeout in seconds.
+    duration: float
+
+
+def execute_tasks_with_timeouts(
+    tasks: List[WorkerTask],
+    timeout: float,
+    total_timeout: Optional[float] = None,
+    max_workers: int = 4,
+) -> List[CompletedTask]:
+    """
+    Execute tasks in parallel limiting execution time of each task by `timeout` seconds from
+    its start and execution time of all tasks by `total_timeout` seconds. Return results in
+    the order of tasks.
+
+    Each task runs in its own daemon thread. Threads of timed out tasks are abandoned rather than
+    joined, so they neither occupy workers nor prevent the process from exiting.
+    """
+    # pylint: disable=too-many-locals
+    deadline = time.monotonic() + total_timeout if total_timeout else None
+    ready = deque(enumerate(tasks))
+    running: Dict[int, Tuple[Future, float]] = {}
+    result: Dict[int, CompletedTask] = {}
+
+    def _run(task: WorkerTask, future: Future) -> None:
+        try:
+            future.set_result(task.function(**task.kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+
+    def _timed_out(task: WorkerTask, message: str, duration: float) -> CompletedTask:
+        future: Future = Future()
+        future.set_exception(TimeoutError(message))
+        return CompletedTask(task.identifier, future, duration)
+
+    while ready or running:
+        while ready and len(running) < max_workers:
+            index, task = ready.popleft()
+            future: Future = Future()
+            future.set_running_or_notify_cancel()
+            threading.Thread(
+                target=_run, args=(task, future), name=task.identifier, daemon=True
+            ).start()
+            running[index] = (future, time.monotonic())
+
+        now = time.monotonic()
+        for index, (future, start) in list(running.items()):
+            task = tasks[index]
+            if future.done():
+                result[index] = CompletedTask(task.identifier, future, now - start)
+            elif now - start >= timeout:
+                result[index] = _timed_out(
+                    task, f"Timed out after {timeout:g}s", now - start
+                )
+            elif deadline is not None and now >= deadline:
+                result[index] = _timed_out(
+                    task, f"Total timeout of {total_timeout:g}s exceeded", now - start
+                )
+            else:
+                continue
+            del running[index]
+
+        if deadline is not None and now >= deadline:
+            while ready:
+                index, task = ready.popleft()
+                result[index] = _timed_out(
+                    task, f"Not started within total timeout of {total_timeout:g}s", 0
+                )
+
+        if running and (len(running) >= max_workers or not ready):
+            expiration = min(start + timeout for _, start in running.values())
+            if deadline is not None:
+                expiration = min(expiration, deadline)
+            wait(
+                [future for future, _ in running.values()],
+                timeout=max(expiration - time.monotonic(), 0),
+                return_when=FIRST_COMPLETED,
+            )
+
+    return [result[index] for index in range(len(tasks))]
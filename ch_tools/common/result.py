@@ -47,13 +47,16 @@ class Status:
 
     def report(self, ctx: Context) -> None:
         """Output formatted status message."""
+        print(self.format_report(ctx))
+
+    def format_report(self, ctx: Context) -> str:
+        """Return formatted status message with details."""
         message = self.message
         for rule in ctx.obj["config"]["monitoring"]["output"]["escaping_rules"]:
             message = re.sub(rule["pattern"], rule["replacement"], message)
 
-        print(f"{self.code};{message}")
-        if self.verbose:
-            for v in self.verbose:
-                if v:
-                    print("\n")
-                    print(v)
+        lines = [f"{self.code};{message}"]
+        for v in self.verbose:
+            if v:
+                lines.extend(["\n", v])
+        return "\n".join(lines)
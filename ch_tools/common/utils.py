@@ -6,6 +6,8 @@ from typing import Any, Dict, List, Union
 
 from click import Context
 
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
 
 def version_ge(version1: str, version2: str) -> bool:
     """
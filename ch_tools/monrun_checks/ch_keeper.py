@@ -1,3 +1,4 @@
+import click
 import cloup
 from kazoo.client import KazooClient, KazooException
 from kazoo.handlers.threading import KazooTimeoutError
@@ -31,7 +32,10 @@ from ch_tools.common.result import CRIT, OK, Result
     default=False,
     help="Allow unverified SSL certificates, e.g. self-signed ones",
 )
-def keeper_command(retries: int, timeout: int, no_verify_ssl_certs: bool) -> Result:
+@cloup.pass_context
+def keeper_command(
+    ctx: click.Context, retries: int, timeout: int, no_verify_ssl_certs: bool
+) -> Result:
     """
     Check ClickHouse Keeper is alive.
     """
@@ -39,19 +43,27 @@ def keeper_command(retries: int, timeout: int, no_verify_ssl_certs: bool) -> Res
     if not keeper_port:
         return Result(OK, "Disabled")
 
-    client = KazooClient(
-        f"127.0.0.1:{keeper_port}",
-        connection_retry=retries,
-        command_retry=retries,
-        timeout=timeout,
-        use_ssl=use_ssl,
-        verify_certs=not no_verify_ssl_certs,
-    )
+    # The client is kept in the context, so the session is reused by periodic runs of the check
+    # in daemon mode. It's stopped on closing the root context.
+    client = ctx.obj.get("keeper_client")
+    if client is None:
+        client = KazooClient(
+            f"127.0.0.1:{keeper_port}",
+            connection_retry=retries,
+            command_retry=retries,
+            timeout=timeout,
+            use_ssl=use_ssl,
+            verify_certs=not no_verify_ssl_certs,
+        )
+        ctx.obj["keeper_client"] = client
+        ctx.find_root().call_on_close(client.stop)
+
     try:
-        client.start()
+        if not client.connected:
+            client.start()
         client.get("/")
-        client.stop()
     except (KazooException, KazooTimeoutError) as e:
+        client.stop()
         return Result(CRIT, repr(e))
 
     return Result(OK)
@@ -1,16 +1,30 @@
+import json
+import mmap
+import os
 import re
+import time
+from contextlib import nullcontext
+from dataclasses import dataclass
 from datetime import datetime, timedelta
-from typing import Any
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Union
 
 import click
 from file_read_backwards import FileReadBackwards
 
+from ch_tools.common import logging
 from ch_tools.common.cli.parameters import RegexpParamType
 from ch_tools.common.result import CRIT, OK, WARNING, Result
 
 REGEXP = re.compile(
     r"^([0-9]{4}\.[0-9]{2}\.[0-9]{2}\ [0-9]{2}\:[0-9]{2}\:[0-9]{2}).*?<(Error|Fatal)>"
 )
+# The same expression matching lines within the mapped log file.
+BYTES_REGEXP = re.compile(REGEXP.pattern.encode(), re.MULTILINE)
+
+STATE_FORMAT_VERSION = 1
+
+LogData = Union[mmap.mmap, bytes]
 
 
 @click.command("log-errors")
@@ -36,12 +50,40 @@ REGEXP = re.compile(
     "logfile",
     help="Log file path.",
 )
+@click.option(
+    "-s",
+    "--state-file",
+    "state_file",
+    help="File to persist log position and error counts between runs. If it's set, "
+    "only lines appended to the log since the previous run are read.",
+)
 def log_errors_command(
-    crit: int, warn: int, watch_seconds: int, exclude: Any, logfile: str
+    crit: int,
+    warn: int,
+    watch_seconds: int,
+    exclude: Any,
+    logfile: str,
+    state_file: Optional[str],
 ) -> Result:
     """
     Check errors in ClickHouse server logs.
     """
+    if state_file:
+        errors = _count_errors_incrementally(
+            logfile, state_file, watch_seconds, exclude
+        )
+    else:
+        errors = _count_errors(logfile, watch_seconds, exclude)
+
+    msg = f"{errors} errors for last {watch_seconds} seconds"
+    if errors >= crit:
+        return Result(CRIT, msg)
+    if errors >= warn:
+        return Result(WARNING, msg)
+    return Result(OK, f"OK, {msg}")
+
+
+def _count_errors(logfile: str, watch_seconds: int, exclude: Any) -> int:
     datetime_start = datetime.now() - timedelta(seconds=watch_seconds)
     errors = 0
 
@@ -57,9 +99,225 @@ def log_errors_command(
                 break
             errors += 1
 
-    msg = f"{errors} errors for last {watch_seconds} seconds"
-    if errors >= crit:
-        return Result(CRIT, msg)
-    if errors >= warn:
-        return Result(WARNING, msg)
-    return Result(OK, f"OK, {msg}")
+    return errors
+
+
+class ErrorCountRing:
+    """
+    Ring buffer of per-second error counts covering the last `size` seconds.
+    """
+
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._seconds = [-1] * size
+        self._counts = [0] * size
+
+    def add(self, second: int, now: float) -> None:
+        if second < now - self.size:
+            return
+        slot = second % self.size
+        if self._seconds[slot] != second:
+            self._seconds[slot] = second
+            self._counts[slot] = 0
+        self._counts[slot] += 1
+
+    def count(self, since: float) -> int:
+        return sum(
+            count
+            for second, count in zip(self._seconds, self._counts)
+            if second >= since
+        )
+
+    def to_list(self) -> List[List[int]]:
+        return [
+            [second, count]
+            for second, count in zip(self._seconds, self._counts)
+            if count
+        ]
+
+    @classmethod
+    def from_list(cls, size: int, items: List[List[int]]) -> "ErrorCountRing":
+        ring = cls(size)
+        for second, count in items:
+            ring._seconds[second % size] = second
+            ring._counts[second % size] = count
+        return ring
+
+
+@dataclass
+class LogScanState:
+    """
+    Position of the previous scan of the log file along with error counts seen so far.
+    """
+
+    logfile: str
+    exclude: str
+    ring: ErrorCountRing
+    inode: int = -1
+    offset: int = 0
+    # Unix time of the previous scan.
+    updated_at: float = 0.0
+
+    @classmethod
+    def load(cls, path: str) -> Optional["LogScanState"]:
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_FORMAT_VERSION:
+                return None
+            return cls(
+                logfile=data["logfile"],
+                exclude=data["exclude"],
+                ring=ErrorCountRing.from_list(data["size"], data["counts"]),
+                inode=data["inode"],
+                offset=data["offset"],
+                updated_at=data["updated_at"],
+            )
+        except Exception as e:
+            logging.warning("Ignoring broken log-errors state {}: {!r}", path, e)
+            return None
+
+    def save(self, path: str) -> None:
+        data: Dict[str, Any] = {
+            "version": STATE_FORMAT_VERSION,
+            "logfile": self.logfile,
+            "exclude": self.exclude,
+            "inode": self.inode,
+            "offset": self.offset,
+            "updated_at": self.updated_at,
+            "size": self.ring.size,
+            "counts": self.ring.to_list(),
+        }
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    def is_reusable(
+        self, logfile: str, exclude: str, watch_seconds: int, now: float
+    ) -> bool:
+        """
+        Check that counts of the state cover the watch window of the current run.
+        """
+        return (
+            self.logfile == logfile
+            and self.exclude == exclude
+            and self.ring.size >= watch_seconds
+            and now - self.updated_at < self.ring.size
+        )
+
+
+def _count_errors_incrementally(
+    logfile: str, state_file: str, watch_seconds: int, exclude: Any
+) -> int:
+    """
+    Count errors reading only lines appended to the log since the previous run.
+
+    If there is no suitable state, errors of the watch window are read backwards from the end
+    of the log. Log rotation is detected by the change of the inode, in that case the rest of
+    the rotated log is read if it's found and not compressed.
+    """
+    now = time.time()
+    since = now - watch_seconds
+
+    state = LogScanState.load(state_file)
+    if state is None or not state.is_reusable(
+        logfile, exclude.pattern, watch_seconds, now
+    ):
+        state = LogScanState(logfile, exclude.pattern, ErrorCountRing(watch_seconds))
+
+    with open(logfile, "rb") as f:
+        inode = os.fstat(f.fileno()).st_ino
+        if state.inode < 0:
+            state.offset = _seed(f, state.ring, exclude, since, now)
+        else:
+            if inode != state.inode:
+                logging.debug("Log file {} was rotated", logfile)
+                _read_rotated(f"{logfile}.0", state, exclude, now)
+                state.offset = 0
+            state.offset = _read_new_lines(f, state.offset, state.ring, exclude, now)
+        state.inode = inode
+
+    state.updated_at = now
+    state.save(state_file)
+    return state.ring.count(since)
+
+
+def _read_rotated(path: str, state: LogScanState, exclude: Any, now: float) -> None:
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_ino == state.inode:
+                _read_new_lines(f, state.offset, state.ring, exclude, now)
+    except FileNotFoundError:
+        pass
+
+
+def _seed(
+    f: BinaryIO, ring: ErrorCountRing, exclude: Any, since: float, now: float
+) -> int:
+    """
+    Count errors of the watch window reading the log backwards. Return the end of the last line.
+    """
+    with _map(f) as data:
+        end = data.rfind(b"\n") + 1
+        for second in _scan_backward(data, end, exclude, since):
+            ring.add(second, now)
+    return end
+
+
+def _read_new_lines(
+    f: BinaryIO, offset: int, ring: ErrorCountRing, exclude: Any, now: float
+) -> int:
+    """
+    Count errors of complete lines after the offset. Return the end of the last line.
+    """
+    with _map(f) as data:
+        # The log was truncated.
+        if offset > len(data):
+            offset = 0
+        end = data.rfind(b"\n", offset) + 1 or offset
+        for second in _scan_forward(data, offset, end, exclude):
+            ring.add(second, now)
+    return end
+
+
+def _map(f: BinaryIO) -> Any:
+    if os.fstat(f.fileno()).st_size == 0:
+        return nullcontext(b"")
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _scan_forward(data: LogData, start: int, end: int, exclude: Any) -> Iterator[int]:
+    for match in BYTES_REGEXP.finditer(data, start, end):
+        line_end = data.find(b"\n", match.end(), end)
+        line = data[match.start() : line_end].decode("utf-8", errors="replace")
+        if not exclude.search(line):
+            yield _parse_timestamp(match.group(1))
+
+
+def _scan_backward(
+    data: LogData, end: int, exclude: Any, since: float
+) -> Iterator[int]:
+    line_end = end - 1
+    while line_end >= 0:
+        line_start = data.rfind(b"\n", 0, line_end) + 1
+        match = BYTES_REGEXP.match(data, line_start, line_end)
+        if match is not None:
+            line = data[line_start:line_end].decode("utf-8", errors="replace")
+            if not exclude.search(line):
+                second = _parse_timestamp(match.group(1))
+                if second < since:
+                    break
+                yield second
+        line_end = line_start - 1
+
+
+@lru_cache(maxsize=1024)
+def _parse_timestamp(value: bytes) -> int:
+    """
+    Return Unix time of the timestamp of the log line in the local timezone.
+    """
+    return int(datetime.strptime(value.decode(), "%Y.%m.%d %H:%M:%S").timestamp())
@@ -1,6 +1,6 @@
 import click
 
-from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
+from ch_tools.common.clickhouse.replicas_snapshot import get_replicas_snapshot
 from ch_tools.common.result import CRIT, OK, Result
 
 
@@ -26,21 +26,11 @@ def ro_replica_command(
     """
     Check for readonly replicated tables.
     """
-    query = """
-        SELECT database, table, replica_path, last_queue_update_exception, zookeeper_exception
-        FROM system.replicas
-        WHERE is_readonly
-        {% if database_pattern -%}
-          AND database {{ format_str_match(database_pattern) }}
-        {% endif -%}
-    """
-    query_result = clickhouse_client(ctx).query_json_data(
-        query=query,
-        query_args={
-            "database_pattern": database_pattern,
-        },
-        compact=False,
-    )
+    query_result = [
+        item
+        for item in get_replicas_snapshot(ctx).filter(database_pattern)
+        if item["is_readonly"]
+    ]
     if not query_result:
         return Result(OK)
 
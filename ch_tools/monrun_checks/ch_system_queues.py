@@ -2,7 +2,7 @@ from typing import Any
 
 from cloup import command, option, pass_context
 
-from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
+from ch_tools.common.clickhouse.replicas_snapshot import get_replicas_snapshot
 from ch_tools.common.result import CRIT, OK, WARNING, Result
 
 
@@ -73,10 +73,6 @@ def system_queues_command(
 
 def _get_metrics(ctx: Any) -> list[dict]:
     """
-    Select and return metrics form system.replicas.
+    Return metrics of replicated tables from the snapshot of system.replicas.
     """
-    query = (
-        "SELECT database, table, future_parts, parts_to_check, queue_size,"
-        " inserts_in_queue, merges_in_queue FROM system.replicas"
-    )
-    return clickhouse_client(ctx).query_json_data(query=query, compact=False)
+    return get_replicas_snapshot(ctx).replicas
@@ -0,0 +1,55 @@
+"""
+Thin client of ch-monitoring daemon.
+
+It returns the latest result of the check from the daemon and falls back to running
+the check by ch-monitoring if the daemon is unavailable or has no fresh result. Only the standard
+library is imported to keep the startup time low.
+"""
+
+import json
+import os
+import socket
+import sys
+from typing import Any, List, Optional
+
+# Kept in sync with CH_MONITORING_SOCKET_FILE of ch_tools.common.config, that is not imported
+# as it pulls the heavy dependencies.
+SOCKET_FILE = "/run/clickhouse-monitoring/ch-monitoring.sock"
+SOCKET_TIMEOUT = 5
+
+
+def get_daemon_output(name: str, socket_path: str = SOCKET_FILE) -> Optional[str]:
+    """
+    Return the output of the check served by the daemon or None if it's not available.
+    """
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(SOCKET_TIMEOUT)
+            sock.connect(socket_path)
+            sock.sendall(name.encode() + b"\n")
+            with sock.makefile("rb") as f:
+                response: Any = json.loads(f.readline())
+    except (OSError, ValueError):
+        return None
+
+    return response.get("output")
+
+
+def main(args: Optional[List[str]] = None) -> None:
+    """
+    Program entry point.
+    """
+    args = sys.argv[1:] if args is None else args
+    # The daemon runs checks with configured options only.
+    if len(args) == 1 and not args[0].startswith("-"):
+        output = get_daemon_output(
+            args[0], os.environ.get("CH_MONITORING_SOCKET", SOCKET_FILE)
+        )
+        if output is not None:
+            print(output)
+            return
+
+    executable = os.path.join(os.path.dirname(sys.argv[0]), "ch-monitoring")
+    if not os.path.exists(executable):
+        executable = "ch-monitoring"
+    os.execvp(executable, [executable, *args])
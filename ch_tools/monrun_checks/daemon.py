@@ -0,0 +1,238 @@
+"""
+Daemon mode of ch-monitoring.
+
+The daemon runs checks on their own schedules within a single long-running process, so the config,
+ClickHouse client and Keeper session are kept warm between runs. The latest results are served
+over a Unix socket to `ch-monitoring-client`.
+"""
+
+import heapq
+import json
+import os
+import signal
+import socketserver
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+import click
+from click import Command, Context
+
+from ch_tools.common import logging
+from ch_tools.common.cli.lazy_group import get_root_commands
+from ch_tools.common.commands.status import run_check
+from ch_tools.common.config import CH_MONITORING_SOCKET_FILE
+from ch_tools.common.result import WARNING, Result, Status
+
+
+@dataclass
+class CheckState:
+    cmd: Command
+    # Interval between check runs in seconds.
+    interval: float
+    status: Optional[Status] = None
+    # Monotonic time of the last completion.
+    completed_at: float = 0.0
+    # Monotonic time of the start of the running check.
+    started_at: Optional[float] = None
+    # Context object of the check kept between its runs.
+    obj: Dict[str, Any] = field(default_factory=dict)
+
+
+class MonitoringDaemon:
+    """
+    Scheduler of checks keeping the latest result of each check.
+
+    A check is never run concurrently with itself. A check running longer than the timeout is
+    reported with WARNING status, and the result older than two intervals is considered outdated.
+
+    Each check has its own context object, so clients created lazily by checks running
+    concurrently don't race. Clients shared by all checks are created before the checks are run.
+    """
+
+    def __init__(
+        self,
+        ctx: Context,
+        commands: List[Command],
+        interval: float,
+        check_timeout: float,
+    ) -> None:
+        self._ctx = ctx
+        self._check_timeout = check_timeout
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.checks: Dict[str, CheckState] = {}
+
+        _create_shared_clients(ctx)
+        config = ctx.obj["config"]["ch-monitoring"]
+        for cmd in commands:
+            check_config = config.get(cmd.name, {})
+            if not check_config.get("@disabled"):
+                self.checks[str(cmd.name)] = CheckState(
+                    cmd, check_config.get("@interval", interval), obj=dict(ctx.obj)
+                )
+
+    def run(self) -> None:
+        """
+        Run checks on their schedules until the daemon is stopped.
+        """
+        # Heap of (next run time, check name).
+        schedule: List[Tuple[float, str]] = [
+            (time.monotonic(), name) for name in self.checks
+        ]
+        while schedule and not self._stopped.is_set():
+            now = time.monotonic()
+            while schedule[0][0] <= now:
+                run_at, name = heapq.heappop(schedule)
+                self._start(name)
+                heapq.heappush(
+                    schedule, (max(run_at, now) + self.checks[name].interval, name)
+                )
+
+            self._stopped.wait(schedule[0][0] - time.monotonic())
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def get_output(self, name: str) -> Dict[str, str]:
+        """
+        Return the formatted latest result of the check or the error if there is no fresh result.
+        """
+        state = self.checks.get(name)
+        if state is None:
+            return {"error": f"Unknown check {name}"}
+
+        now = time.monotonic()
+        with self._lock:
+            status = state.status
+            completed_at = state.completed_at
+            started_at = state.started_at
+
+        if started_at is not None and now - started_at > self._check_timeout:
+            status = Status()
+            status.append(f"Timed out after {now - started_at:.0f}s")
+            status.set_code(WARNING)
+        elif status is None or now - completed_at > 2 * state.interval:
+            return {"error": f"No fresh result of check {name}"}
+
+        return {"output": status.format_report(self._ctx)}
+
+    def _start(self, name: str) -> None:
+        state = self.checks[name]
+        with self._lock:
+            if state.started_at is not None:
+                logging.warning("Skipping run of check {} as it is still running", name)
+                return
+            state.started_at = time.monotonic()
+
+        threading.Thread(
+            target=self._run_check, args=(state,), name=name, daemon=True
+        ).start()
+
+    def _run_check(self, state: CheckState) -> None:
+        try:
+            status = run_check(self._ctx, state.cmd, obj=state.obj)
+        except Exception as e:
+            logging.exception("Check {} failed:", state.cmd.name)
+            status = Status()
+            status.append(repr(e))
+            status.set_code(WARNING)
+
+        with self._lock:
+            state.status = status
+            state.completed_at = time.monotonic()
+            state.started_at = None
+
+
+def _create_shared_clients(ctx: Context) -> None:
+    """
+    Create ClickHouse client along with parsed ClickHouse config in the root context object,
+    so they are reused by all checks.
+    """
+    # The client is imported on first use to keep startup of ch-monitoring fast.
+    # pylint: disable=import-outside-toplevel
+    from ch_tools.common.clickhouse.client.clickhouse_client import clickhouse_client
+
+    try:
+        clickhouse_client(ctx)
+    except Exception as e:
+        # Checks not using ClickHouse still can be run, other checks report the error.
+        logging.warning("Failed to create ClickHouse client: {!r}", e)
+
+
+def daemon_command(check_names: List[str]) -> Command:
+    @click.command("daemon")
+    @click.option(
+        "--socket",
+        "socket_path",
+        default=CH_MONITORING_SOCKET_FILE,
+        help="Path to Unix socket to serve check results on.",
+    )
+    @click.option(
+        "--interval",
+        "interval",
+        type=float,
+        default=60,
+        help="Default interval between check runs in seconds. "
+        'Can be overridden for a check by "@interval" setting.',
+    )
+    @click.option(
+        "--check-timeout",
+        "check_timeout",
+        type=float,
+        default=30,
+        help="Time in seconds after which a running check is reported as timed out.",
+    )
+    @click.pass_context
+    def daemon_impl(
+        ctx: Context, socket_path: str, interval: float, check_timeout: float
+    ) -> Result:
+        """
+        Run checks periodically and serve their latest results.
+        """
+        ctx.obj["status_mode"] = True
+        commands = get_root_commands(ctx, check_names)
+        daemon = MonitoringDaemon(ctx.find_root(), commands, interval, check_timeout)
+
+        server = _create_server(daemon, socket_path)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        for signum in (signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda *_: daemon.stop())
+
+        logging.info(
+            "Serving results of {} checks on {}", len(daemon.checks), socket_path
+        )
+        try:
+            daemon.run()
+        finally:
+            server.shutdown()
+            server.server_close()
+            os.remove(socket_path)
+
+        return Result(message="Stopped")
+
+    return daemon_impl
+
+
+def _create_server(
+    daemon: MonitoringDaemon, socket_path: str
+) -> socketserver.ThreadingUnixStreamServer:
+    class _RequestHandler(socketserver.StreamRequestHandler):
+        """
+        Handler of requests consisting of a check name. The response is a JSON object with
+        either "output" or "error" key.
+        """
+
+        def handle(self) -> None:
+            name = self.rfile.readline().decode().strip()
+            self.wfile.write(json.dumps(daemon.get_output(name)).encode() + b"\n")
+
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        os.remove(socket_path)
+
+    server = socketserver.ThreadingUnixStreamServer(socket_path, _RequestHandler)
+    server.daemon_threads = True
+    return server
@@ -11,6 +11,7 @@ from cloup import group, option, pass_context, version_option
 
 from ch_tools.common import logging
 from ch_tools.common.cli.parameters import YamlParamType
+from ch_tools.common.clickhouse.replicas_snapshot import ReplicasSnapshotCache
 from ch_tools.common.config import CH_MONITORING_LOG_FILE, load_config
 from ch_tools.common.utils import get_full_command_name, update_by_key_path
 
@@ -20,27 +21,10 @@ warnings.filterwarnings(action="ignore", message="Python 3.6 is no longer suppor
 
 from ch_tools import __version__
 from ch_tools.common.cli.context_settings import CONTEXT_SETTINGS
+from ch_tools.common.cli.lazy_group import LazyGroup
 from ch_tools.common.cli.locale_resolver import LocaleResolver
 from ch_tools.common.result import Status
-from ch_tools.monrun_checks.ch_backup import backup_command
-from ch_tools.monrun_checks.ch_core_dumps import core_dumps_command
-from ch_tools.monrun_checks.ch_dist_tables import dist_tables_command
-from ch_tools.monrun_checks.ch_geobase import geobase_command
-from ch_tools.monrun_checks.ch_keeper import keeper_command
-from ch_tools.monrun_checks.ch_log_errors import log_errors_command
-from ch_tools.monrun_checks.ch_orphaned_objects import orphaned_objects_command
-from ch_tools.monrun_checks.ch_ping import ping_command
-from ch_tools.monrun_checks.ch_replication_lag import replication_lag_command
-from ch_tools.monrun_checks.ch_resetup_state import resetup_state_command
-from ch_tools.monrun_checks.ch_ro_replica import ro_replica_command
-from ch_tools.monrun_checks.ch_s3_backup_orphaned import orphaned_backups_command
-from ch_tools.monrun_checks.ch_s3_credentials_config import (
-    s3_credentials_configs_command,
-)
-from ch_tools.monrun_checks.ch_system_metrics import system_metrics_command
-from ch_tools.monrun_checks.ch_system_queues import system_queues_command
-from ch_tools.monrun_checks.ch_tls import tls_command
-from ch_tools.monrun_checks.dns import dns_command
+from ch_tools.monrun_checks.daemon import daemon_command
 from ch_tools.monrun_checks.exceptions import translate_to_status
 from ch_tools.monrun_checks.status import status_command
 
@@ -49,7 +33,7 @@ DEFAULT_USER = "monitor"
 # pylint: disable=too-many-ancestors
 
 
-class MonrunChecks(cloup.Group):
+class MonrunChecks(LazyGroup):
     def add_command(
         self,
         cmd: click.Command,
@@ -71,11 +55,13 @@ class MonrunChecks(cloup.Group):
         @wraps(cmd_callback)
         @pass_context
         def callback_wrapper(ctx: Any, *args: Any, **kwargs: Any) -> Any:
-            logging.configure(
-                ctx.obj["config"]["loguru"],
-                "ch-monitoring",
-                {"cmd_name": get_full_command_name(ctx)},
-            )
+            # Checks of status command are executed concurrently within logging configured for it.
+            if not ctx.obj.get("status_mode", False):
+                logging.configure(
+                    ctx.obj["config"]["loguru"],
+                    "ch-monitoring",
+                    {"cmd_name": get_full_command_name(ctx)},
+                )
 
             logging.debug(
                 "Command starts executing, params: {}, args: {}, version: {}",
@@ -151,34 +137,40 @@ def cli(ctx: click.Context, settings: dict, ensure_monitoring_user: bool) -> Non
     ctx.obj = {
         "config": config,
         "monitoring": True,
+        # Checks executed within a run evaluate the same snapshot of replicated tables.
+        "replicas_snapshot_cache": ReplicasSnapshotCache(
+            config["monitoring"]["replicas_snapshot_max_age"]
+        ),
     }
     ctx.default_map = config["ch-monitoring"]
 
 
-CLI_COMMANDS = [
-    ping_command,
-    log_errors_command,
-    replication_lag_command,
-    system_queues_command,
-    core_dumps_command,
-    dist_tables_command,
-    resetup_state_command,
-    ro_replica_command,
-    geobase_command,
-    backup_command,
-    orphaned_backups_command,
-    s3_credentials_configs_command,
-    tls_command,
-    keeper_command,
-    dns_command,
-    orphaned_objects_command,
-    system_metrics_command,
-]
-
-cli.add_command(status_command(CLI_COMMANDS))
-
-for command in CLI_COMMANDS:
-    cli.add_command(command)
+# Checks are loaded on demand to avoid importing dependencies of all checks on every run.
+CLI_COMMANDS = {
+    "ping": "ch_tools.monrun_checks.ch_ping:ping_command",
+    "log-errors": "ch_tools.monrun_checks.ch_log_errors:log_errors_command",
+    "replication-lag": "ch_tools.monrun_checks.ch_replication_lag:replication_lag_command",
+    "system-queues": "ch_tools.monrun_checks.ch_system_queues:system_queues_command",
+    "core-dumps": "ch_tools.monrun_checks.ch_core_dumps:core_dumps_command",
+    "dist-tables": "ch_tools.monrun_checks.ch_dist_tables:dist_tables_command",
+    "resetup-state": "ch_tools.monrun_checks.ch_resetup_state:resetup_state_command",
+    "ro-replica": "ch_tools.monrun_checks.ch_ro_replica:ro_replica_command",
+    "geobase": "ch_tools.monrun_checks.ch_geobase:geobase_command",
+    "backup": "ch_tools.monrun_checks.ch_backup:backup_command",
+    "orphaned-backups": "ch_tools.monrun_checks.ch_s3_backup_orphaned:orphaned_backups_command",
+    "s3-credentials-config": "ch_tools.monrun_checks.ch_s3_credentials_config:s3_credentials_configs_command",
+    "tls": "ch_tools.monrun_checks.ch_tls:tls_command",
+    "keeper": "ch_tools.monrun_checks.ch_keeper:keeper_command",
+    "dns": "ch_tools.monrun_checks.dns:dns_command",
+    "orphaned-objects": "ch_tools.monrun_checks.ch_orphaned_objects:orphaned_objects_command",
+    "system-metrics": "ch_tools.monrun_checks.ch_system_metrics:system_metrics_command",
+}
+
+cli.add_command(status_command(list(CLI_COMMANDS)))
+cli.add_command(daemon_command(list(CLI_COMMANDS)))
+
+for check_name, import_path in CLI_COMMANDS.items():
+    cli.add_lazy_command(check_name, import_path)
 
 
 def main() -> None:
@@ -1,8 +1,11 @@
-from typing import Any
+from typing import Any, List
 
 import click
 import tabulate
 
+from ch_tools.common.cli.lazy_group import get_root_commands
+from ch_tools.common.commands.status import run_checks
+
 DEFAULT_COLOR = "\033[0m"
 
 COLOR_MAP = {
@@ -12,27 +15,27 @@ COLOR_MAP = {
 }
 
 
-def status_command(commands: Any) -> Any:
+def status_command(check_names: List[str]) -> Any:
     @click.command("status")
     @click.pass_context
     def status_impl(ctx: Any) -> None:
         """
-        Perform all checks.
+        Perform all checks concurrently.
         """
         config = ctx.obj["config"]["ch-monitoring"]
         ctx.obj["status_mode"] = True
         ctx.default_map = config
 
         checks_status = []
-        for cmd in commands:
-            if not config.get(cmd.name, {}).get("@disabled"):
-                status = ctx.invoke(cmd)
-                checks_status.append(
-                    (
-                        cmd.name,
-                        f"{COLOR_MAP[status.code]}{status.message}{DEFAULT_COLOR}",
-                    )
+        commands = get_root_commands(ctx, check_names)
+        for check in run_checks(ctx, commands, config):
+            checks_status.append(
+                (
+                    check.name,
+                    f"{COLOR_MAP[check.status.code]}{check.status.message}{DEFAULT_COLOR}",
+                    f"{check.duration:.2f}s",
                 )
+            )
 
         print(tabulate.tabulate(checks_status))
 
@@ -57,11 +57,13 @@ class KeeperChecks(cloup.Group):
         @wraps(cmd_callback)
         @cloup.pass_context
         def wrapper(ctx: Any, *a: Any, **kw: Any) -> Any:
-            logging.configure(
-                ctx.obj["config"]["loguru"],
-                "keeper-monitoring",
-                {"cmd_name": get_full_command_name(ctx)},
-            )
+            # Checks of status command are executed concurrently within logging configured for it.
+            if not ctx.obj.get("status_mode", False):
+                logging.configure(
+                    ctx.obj["config"]["loguru"],
+                    "keeper-monitoring",
+                    {"cmd_name": get_full_command_name(ctx)},
+                )
 
             logging.debug(
                 "Command starts executing, params: {}, args: {}, version: {}",
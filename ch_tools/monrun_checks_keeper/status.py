@@ -3,6 +3,8 @@ from typing import Any
 import click
 import tabulate
 
+from ch_tools.common.commands.status import run_checks
+
 DEFAULT_COLOR = "\033[0m"
 
 COLOR_MAP = {
@@ -17,22 +19,21 @@ def status_command(commands: Any) -> Any:
     @click.pass_context
     def status_impl(ctx: Any) -> None:
         """
-        Perform all checks.
+        Perform all checks concurrently.
         """
         config = ctx.obj["config"]["keeper-monitoring"]
         ctx.obj.update({"status_mode": True})
         ctx.default_map = config
 
         checks_status = []
-        for cmd in commands:
-            if not config.get(cmd.name, {}).get("@disabled"):
-                status = ctx.invoke(cmd)
-                checks_status.append(
-                    (
-                        cmd.name,
-                        f"{COLOR_MAP[status.code]}{status.message}{DEFAULT_COLOR}",
-                    )
+        for check in run_checks(ctx, commands, config):
+            checks_status.append(
+                (
+                    check.name,
+                    f"{COLOR_MAP[check.status.code]}{check.status.message}{DEFAULT_COLOR}",
+                    f"{check.duration:.2f}s",
                 )
+            )
 
         print(tabulate.tabulate(checks_status))
 
@@ -0,0 +1,190 @@
+import os
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import pytest
+from kazoo.exceptions import (
+    NodeExistsError,
+    NoNodeError,
+    NotEmptyError,
+    RolledBackError,
+)
+from kazoo.protocol.states import ZnodeStat
+
+Operation = Tuple[str, str, bytes]
+
+
+class FakeAsyncResult:
+    def __init__(self, func: Callable[[], Any]) -> None:
+        self._func = func
+
+    def get(self) -> Any:
+        return self._func()
+
+
+class FakeTransaction:
+    def __init__(self, zk: "FakeZookeeper") -> None:
+        self._zk = zk
+        self.operations: List[Operation] = []
+
+    def check(self, path: str, version: int) -> None:
+        # pylint: disable=unused-argument
+        self.operations.append(("check", path, b""))
+
+    def create(self, path: str, value: bytes = b"") -> None:
+        self.operations.append(("create", path, value))
+
+    def set_data(self, path: str, value: bytes) -> None:
+        self.operations.append(("set", path, value))
+
+    def delete(self, path: str) -> None:
+        self.operations.append(("delete", path, b""))
+
+    def commit_async(self) -> FakeAsyncResult:
+        return self._zk.commit(self.operations)
+
+    def commit(self) -> List[Any]:
+        return self.commit_async().get()
+
+
+class FakeZookeeper:
+    """
+    In-memory ZooKeeper tree supporting the part of Kazoo API used by chadmin.
+
+    Nodes are created along with their parents, data of the node is its path unless it's given
+    explicitly. Transactions are applied in order of sending as ZooKeeper does, results of async
+    requests are evaluated on `get()`, so the number of requests in flight can be checked.
+    """
+
+    def __init__(self, paths: Iterable[str] = ()) -> None:
+        self.nodes: Dict[str, bytes] = {"/": b""}
+        for path in paths:
+            self.add(path)
+        self.transactions: List[List[Operation]] = []
+        self.requests = 0
+        self.sync_requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    def add(self, path: str, value: Optional[bytes] = None) -> None:
+        path = _normalize(path)
+        self.nodes[path] = path.encode() if value is None else value
+        while path != "/":
+            path = os.path.dirname(path)
+            self.nodes.setdefault(path, path.encode())
+
+    def transaction(self) -> FakeTransaction:
+        return FakeTransaction(self)
+
+    def commit(self, operations: List[Operation]) -> FakeAsyncResult:
+        self.transactions.append(operations)
+        nodes = dict(self.nodes)
+        results: List[Any] = []
+        for i, (operation, path, value) in enumerate(operations):
+            try:
+                self._apply(nodes, operation, _normalize(path), value)
+            except (NodeExistsError, NoNodeError, NotEmptyError) as e:
+                # Multi-op transaction is atomic, so other operations are rolled back.
+                results = (
+                    [RolledBackError()] * i
+                    + [e]
+                    + [RolledBackError()] * (len(operations) - i - 1)
+                )
+                break
+        else:
+            self.nodes = nodes
+            results = [True] * len(operations)
+
+        return self._request(lambda: results)
+
+    def exists(self, path: str) -> Optional[ZnodeStat]:
+        self.sync_requests += 1
+        return self._stat(_normalize(path))
+
+    def get_children(self, path: str) -> List[str]:
+        self.sync_requests += 1
+        return self._children(_normalize(path))
+
+    def delete(self, path: str, recursive: bool = False) -> None:
+        self.sync_requests += 1
+        path = _normalize(path)
+        if self._children(path) and not recursive:
+            raise NotEmptyError()
+        for node in list(self.nodes):
+            if node == path or node.startswith(path + "/"):
+                del self.nodes[node]
+
+    def exists_async(self, path: str) -> FakeAsyncResult:
+        return self._request(lambda: self._stat(_normalize(path)))
+
+    def get_async(self, path: str) -> FakeAsyncResult:
+        def _get() -> Tuple[bytes, ZnodeStat]:
+            stat = self._stat(_normalize(path))
+            if stat is None:
+                raise NoNodeError()
+            return self.nodes[_normalize(path)], stat
+
+        return self._request(_get)
+
+    def get_children_async(self, path: str) -> FakeAsyncResult:
+        return self._request(lambda: self._children(_normalize(path)))
+
+    def _request(self, func: Callable[[], Any]) -> FakeAsyncResult:
+        self.requests += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        def _complete() -> Any:
+            self.in_flight -= 1
+            return func()
+
+        return FakeAsyncResult(_complete)
+
+    def _children(
+        self, path: str, nodes: Optional[Dict[str, bytes]] = None
+    ) -> List[str]:
+        nodes = self.nodes if nodes is None else nodes
+        if path not in nodes:
+            raise NoNodeError()
+        return sorted(
+            os.path.basename(node)
+            for node in nodes
+            if node != "/" and os.path.dirname(node) == path
+        )
+
+    def _stat(self, path: str) -> Optional[ZnodeStat]:
+        if path not in self.nodes:
+            return None
+        data_length = len(self.nodes[path])
+        num_children = len(self._children(path))
+        return ZnodeStat(0, 0, 0, 0, 0, 0, 0, 0, data_length, num_children, 0)
+
+    def _apply(
+        self, nodes: Dict[str, bytes], operation: str, path: str, value: bytes
+    ) -> None:
+        if operation == "create":
+            if path in nodes:
+                raise NodeExistsError()
+            if os.path.dirname(path) not in nodes:
+                raise NoNodeError()
+            nodes[path] = value
+        elif path not in nodes:
+            raise NoNodeError()
+        elif operation == "set":
+            nodes[path] = value
+        elif operation == "delete":
+            if self._children(path, nodes):
+                raise NotEmptyError()
+            del nodes[path]
+
+
+def _normalize(path: str) -> str:
+    # Kazoo prepends the root to relative paths.
+    return "/" + path.strip("/")
+
+
+@pytest.fixture
+def fake_zookeeper() -> Any:
+    """
+    Factory of in-memory ZooKeeper trees created from the list of node paths.
+    """
+    return FakeZookeeper
@@ -0,0 +1,50 @@
+from typing import Any, List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.chadmin.internal.utils import execute_query_on_shard
+
+REPLICAS = ["host1", "host2", "host3"]
+
+
+@patch("ch_tools.chadmin.internal.utils.ClickhouseInfo.get_replicas")
+@patch("ch_tools.chadmin.internal.utils.clickhouse_client")
+def test_execute_query_on_shard_stops_at_first_failure(
+    clickhouse_client_mock: MagicMock, get_replicas_mock: MagicMock
+) -> None:
+    get_replicas_mock.return_value = REPLICAS
+    hosts: List[Optional[str]] = []
+
+    def _query(host: Optional[str] = None, **kwargs: Any) -> None:
+        # pylint: disable=unused-argument
+        hosts.append(host)
+        if host == "host2":
+            raise RuntimeError("DDL failed")
+
+    clickhouse_client_mock.return_value.query.side_effect = _query
+
+    with pytest.raises(RuntimeError):
+        execute_query_on_shard(MagicMock(), "DROP TABLE t")
+
+    assert hosts == ["host1", "host2"]
+
+
+@patch("ch_tools.chadmin.internal.utils.ClickhouseInfo.get_replicas")
+@patch("ch_tools.chadmin.internal.utils.query_on_hosts")
+@patch("ch_tools.chadmin.internal.utils.clickhouse_client")
+def test_execute_query_on_shard_concurrent(
+    clickhouse_client_mock: MagicMock,
+    query_on_hosts_mock: MagicMock,
+    get_replicas_mock: MagicMock,
+) -> None:
+    get_replicas_mock.return_value = REPLICAS
+    ctx = MagicMock()
+    ctx.obj = {"config": {"clickhouse": {"fan_out_concurrency": 2}}}
+
+    execute_query_on_shard(ctx, "SYSTEM SYNC REPLICA t", concurrent=True)
+
+    clickhouse_client_mock.return_value.query.assert_not_called()
+    query_on_hosts_mock.assert_called_once()
+    assert query_on_hosts_mock.call_args.args[2] == REPLICAS
+    assert query_on_hosts_mock.call_args.kwargs["max_concurrency"] == 2
@@ -0,0 +1,88 @@
+import os
+from pathlib import Path
+from typing import Dict, List, Tuple
+from unittest.mock import patch
+
+import pytest
+
+from ch_tools.chadmin.internal.object_storage.local_metadata_scan import (
+    LocalMetadataScanStats,
+    parse_metadata_strings,
+    scan_local_metadata,
+)
+
+
+def _metadata(*objects: Tuple[str, int]) -> str:
+    lines = ["3", f"{len(objects)} {sum(size for _, size in objects)}"]
+    lines.extend(f"{size} {key}" for key, size in objects)
+    lines.extend(["0", "0"])
+    return "\n".join(lines) + "\n"
+
+
+def _write(path: Path, content: str) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(content, encoding="utf-8")
+
+
+def _scan(
+    disk_path: Path, cache_path: Path, reuse_cache: bool = True
+) -> Tuple[Dict[str, List], LocalMetadataScanStats]:
+    stats = LocalMetadataScanStats()
+    result: Dict[str, List] = {}
+    for directory, obj in scan_local_metadata(
+        str(disk_path), str(cache_path), stats=stats, reuse_cache=reuse_cache
+    ):
+        result.setdefault(directory, []).append((obj.key, obj.size))
+    return result, stats
+
+
+@patch(
+    "ch_tools.chadmin.internal.object_storage.local_metadata_scan.MIN_CACHED_DIRECTORY_AGE",
+    0,
+)
+def test_incremental_scan(tmp_path: Path) -> None:
+    disk_path = tmp_path / "disk"
+    cache_path = tmp_path / "cache.json"
+    part_1 = disk_path / "store" / "123" / "uuid" / "all_1_1_0"
+    part_2 = disk_path / "store" / "123" / "uuid" / "detached" / "all_2_2_0"
+    _write(part_1 / "data.bin", _metadata(("abc", 10), ("abd", 20)))
+    _write(part_1 / "columns.txt", _metadata(("xyz", 5)))
+    _write(part_2 / "data.bin", _metadata(("qqq", 1)))
+    _write(part_2 / "broken.txt", "broken")
+
+    result, stats = _scan(disk_path, cache_path)
+    assert sorted(result["store/123/uuid/all_1_1_0"]) == [
+        ("abc", 10),
+        ("abd", 20),
+        ("xyz", 5),
+    ]
+    assert result["store/123/uuid/detached/all_2_2_0"] == [("qqq", 1)]
+    assert (stats.parsed_directories, stats.cached_directories) == (2, 0)
+    assert stats.parse_errors == 1
+
+    # Unchanged directories are taken from the cache.
+    cached_result, stats = _scan(disk_path, cache_path)
+    assert cached_result == result
+    assert (stats.parsed_directories, stats.cached_directories) == (0, 2)
+
+    # Cache is not trusted without reuse_cache, but it is still updated.
+    result, stats = _scan(disk_path, cache_path, reuse_cache=False)
+    assert result == cached_result
+    assert (stats.parsed_directories, stats.cached_directories) == (2, 0)
+    _, stats = _scan(disk_path, cache_path)
+    assert (stats.parsed_directories, stats.cached_directories) == (0, 2)
+
+    # Changed directory is parsed again.
+    os.remove(part_2 / "broken.txt")
+    os.utime(part_2, ns=(1, 1))
+    result, stats = _scan(disk_path, cache_path)
+    assert result["store/123/uuid/detached/all_2_2_0"] == [("qqq", 1)]
+    assert (stats.parsed_directories, stats.cached_directories) == (1, 1)
+    assert stats.parse_errors == 0
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_parse_metadata_strings(workers: int) -> None:
+    values = [_metadata(("a", 1), ("b", 2)), _metadata(("c", 3))]
+    objects = list(parse_metadata_strings(iter(values), workers))
+    assert [(obj.key, obj.size) for obj in objects] == [("a", 1), ("b", 2), ("c", 3)]
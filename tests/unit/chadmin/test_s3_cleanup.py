@@ -0,0 +1,111 @@
+from datetime import datetime, timezone
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+from botocore.exceptions import ClientError
+
+from ch_tools.chadmin.internal.object_storage.obj_list_item import ObjListItem
+from ch_tools.chadmin.internal.object_storage.s3_cleanup import (
+    BULK_DELETE_CHUNK_SIZE,
+    S3DeleteError,
+    S3ObjectDeleter,
+)
+from ch_tools.chadmin.internal.object_storage.s3_cleanup_stats import ResultStat
+
+
+class FakeS3Client:
+    def __init__(self, failed_keys: Dict[str, str], throttled_requests: int) -> None:
+        self.failed_keys = failed_keys
+        self.throttled_requests = throttled_requests
+        self.requests: List[int] = []
+
+    def delete_objects(self, Bucket: str, Delete: Dict[str, Any]) -> Dict[str, Any]:
+        # pylint: disable=invalid-name,unused-argument
+        if self.throttled_requests:
+            self.throttled_requests -= 1
+            raise ClientError(
+                {
+                    "Error": {"Code": "SlowDown", "Message": "Please reduce rate"},
+                    "ResponseMetadata": {"HTTPStatusCode": 503},
+                },
+                "DeleteObjects",
+            )
+
+        keys = [obj["Key"] for obj in Delete["Objects"]]
+        self.requests.append(len(keys))
+        return {
+            "Deleted": [{"Key": key} for key in keys if key not in self.failed_keys],
+            "Errors": [
+                {"Key": key, "Code": self.failed_keys[key], "Message": "error"}
+                for key in keys
+                if key in self.failed_keys
+            ],
+        }
+
+
+def _items(count: int) -> List[ObjListItem]:
+    timestamp = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [ObjListItem(timestamp, f"data/{i}", 10) for i in range(count)]
+
+
+@pytest.mark.parametrize("dry_run", [True, False])
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.create_s3_client")
+def test_delete_accounts_only_deleted_keys(
+    mock_client: MagicMock, _mock_logging: MagicMock, dry_run: bool
+) -> None:
+    client = FakeS3Client({"data/7": "AccessDenied"}, throttled_requests=2)
+    mock_client.return_value = client
+    stat = ResultStat()
+
+    with S3ObjectDeleter(MagicMock(), stat, dry_run, max_in_flight=3) as deleter:
+        deleter.delete(_items(2500))
+
+    if dry_run:
+        assert stat.total == {"deleted": 2500, "total_size": 25000}
+        assert not deleter.errors
+        return
+
+    assert sorted(client.requests) == [
+        500,
+        BULK_DELETE_CHUNK_SIZE,
+        BULK_DELETE_CHUNK_SIZE,
+    ]
+    assert stat.total == {"deleted": 2499, "total_size": 24990}
+    assert [(e.key, e.code) for e in deleter.errors] == [("data/7", "AccessDenied")]
+
+
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.create_s3_client")
+def test_delete_retries_throttled_keys(
+    mock_client: MagicMock, _mock_logging: MagicMock
+) -> None:
+    client = FakeS3Client({"data/1": "SlowDown"}, throttled_requests=0)
+    mock_client.return_value = client
+    stat = ResultStat()
+
+    with S3ObjectDeleter(MagicMock(), stat, max_retries=1) as deleter:
+        deleter.delete(_items(3))
+
+    # The throttled key is retried once and then reported as failed.
+    assert client.requests == [3, 1]
+    assert stat.total["deleted"] == 2
+    assert [(e.key, e.code) for e in deleter.errors] == [("data/1", "SlowDown")]
+
+
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_cleanup.create_s3_client")
+def test_delete_raises_for_failed_keys(
+    mock_client: MagicMock, _mock_logging: MagicMock
+) -> None:
+    mock_client.return_value = FakeS3Client(
+        {"data/1": "AccessDenied", "data/2": "AccessDenied"}, throttled_requests=0
+    )
+
+    with S3ObjectDeleter(MagicMock(), ResultStat()) as deleter:
+        deleter.delete(_items(3))
+
+    with pytest.raises(S3DeleteError, match="Failed to delete 2 objects") as exc_info:
+        deleter.raise_for_errors()
+    assert len(exc_info.value.errors) == 2
@@ -0,0 +1,181 @@
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.chadmin.internal.object_storage.s3_iterator import (
+    MAX_QUEUED_PAGES,
+    ShardListingStats,
+    s3_object_storage_iterator,
+)
+
+KEYS = [
+    "data/.SCHEMA_VERSION",
+    "data/a00/abc",
+    "data/a00/abd",
+    "data/b01/xyz",
+    "data/b01/xyz/nested",
+    "data/b010",
+    "data/c02/operations/op1",
+    "data/c02/qqq",
+    "data/d03/aaa",
+    "data/zzz",
+    "other/a00/abc",
+]
+
+
+class FakePaginator:
+    def __init__(self, keys: List[str]) -> None:
+        self._keys = keys
+
+    def paginate(
+        self, Bucket: str, Prefix: str, Delimiter: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        # pylint: disable=invalid-name,unused-argument
+        contents = []
+        prefixes: List[str] = []
+        for key in self._keys:
+            if not key.startswith(Prefix):
+                continue
+            if Delimiter and Delimiter in key[len(Prefix) :]:
+                sub_prefix = key[: key.index(Delimiter, len(Prefix)) + 1]
+                if sub_prefix not in prefixes:
+                    prefixes.append(sub_prefix)
+                continue
+            contents.append(
+                {
+                    "Key": key,
+                    "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                    "Size": len(key),
+                }
+            )
+
+        # Return results in 2 pages to check pagination handling.
+        yield {"Contents": contents[:1], "CommonPrefixes": []}
+        yield {
+            "Contents": contents[1:],
+            "CommonPrefixes": [{"Prefix": p} for p in prefixes],
+        }
+
+
+def _disk() -> MagicMock:
+    disk = MagicMock()
+    disk.bucket_name = "bucket"
+    return disk
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.create_s3_client")
+def test_sharded_listing(
+    mock_client: MagicMock, _mock_logging: MagicMock, ordered: bool
+) -> None:
+    mock_client.return_value.get_paginator.return_value = FakePaginator(KEYS)
+    stats: Dict[str, ShardListingStats] = {}
+
+    keys = [
+        obj.key
+        for obj in s3_object_storage_iterator(
+            _disk(), object_name_prefix="data", workers=3, ordered=ordered, stats=stats
+        )
+    ]
+
+    expected = [
+        "data/a00/abc",
+        "data/a00/abd",
+        "data/b01/xyz",
+        "data/b01/xyz/nested",
+        "data/b010",
+        "data/c02/qqq",
+        "data/d03/aaa",
+        "data/zzz",
+    ]
+    if ordered:
+        assert keys == expected
+    else:
+        assert sorted(keys) == expected
+
+    assert sorted(stats) == ["data/a00/", "data/b01/", "data/c02/", "data/d03/"]
+    assert stats["data/a00/"].objects == 2
+    assert stats["data/a00/"].bytes == 24
+    assert stats["data/c02/"].objects == 2
+    assert stats["data/c02/"].pages == 2
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.MAX_EXPANDED_OBJECTS", 2)
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.create_s3_client")
+def test_sharded_listing_expands_sub_prefixes(
+    mock_client: MagicMock, _mock_logging: MagicMock, ordered: bool
+) -> None:
+    keys = [
+        "data/shard1/aaa/1",
+        "data/shard1/aaa/2",
+        "data/shard1/bbb/1",
+        "data/shard1/bbb/2",
+        "data/shard1/bbb/3",
+        "data/shard1/ccc",
+    ]
+    mock_client.return_value.get_paginator.return_value = FakePaginator(keys)
+    stats: Dict[str, ShardListingStats] = {}
+
+    result = [
+        obj.key
+        for obj in s3_object_storage_iterator(
+            _disk(), object_name_prefix="data", workers=4, ordered=ordered, stats=stats
+        )
+    ]
+
+    assert (result if ordered else sorted(result)) == keys
+    # Objects of "data/shard1/aaa/" are taken from delimiter listing, "data/shard1/bbb/" has too many
+    # objects to expand it and is listed as a whole.
+    assert sorted(stats) == ["data/shard1/bbb/"]
+
+
+class EndlessPaginator:
+    def __init__(self) -> None:
+        self.pages = 0
+
+    def paginate(
+        self, Bucket: str, Prefix: str, Delimiter: Optional[str] = None
+    ) -> Iterator[Dict[str, Any]]:
+        # pylint: disable=invalid-name,unused-argument
+        if Delimiter:
+            yield {"CommonPrefixes": [{"Prefix": f"{Prefix}a/"}]}
+            return
+
+        while True:
+            self.pages += 1
+            yield {
+                "Contents": [
+                    {
+                        "Key": f"{Prefix}{self.pages}",
+                        "LastModified": datetime(2024, 1, 1, tzinfo=timezone.utc),
+                        "Size": 1,
+                    }
+                ]
+            }
+
+
+@pytest.mark.parametrize("ordered", [True, False])
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.PUT_TIMEOUT", 0.01)
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.logging")
+@patch("ch_tools.chadmin.internal.object_storage.s3_iterator.create_s3_client")
+def test_sharded_listing_is_bounded(
+    mock_client: MagicMock, _mock_logging: MagicMock, ordered: bool
+) -> None:
+    paginator = EndlessPaginator()
+    mock_client.return_value.get_paginator.return_value = paginator
+
+    objects: Any = s3_object_storage_iterator(
+        _disk(), object_name_prefix="data", workers=2, ordered=ordered
+    )
+    next(objects)
+    time.sleep(0.1)
+    objects.close()
+
+    # Listing is suspended until the consumer takes listed pages, and stops on close.
+    assert paginator.pages <= MAX_QUEUED_PAGES * 2 + 2
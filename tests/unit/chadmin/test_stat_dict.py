@@ -50,3 +50,13 @@ def test_partitioning_day() -> None:
     assert stat.total == {"total_size": 6, "deleted": 2}
     assert stat["2025-11-05"] == {"total_size": 4, "deleted": 1}
     assert stat["2025-11-06"] == {"total_size": 2, "deleted": 1}
+
+
+def test_item_from_json_compact() -> None:
+    item = ObjListItem.from_json_compact(
+        '["2025-11-05 10:15:20","some/path/on/s3","4"]'
+    )
+
+    assert item == ObjListItem.from_tab_separated(
+        "2025-11-05 10:15:20\tsome/path/on/s3\t4"
+    )
@@ -0,0 +1,10 @@
+from ch_tools.chadmin.cli.wait_group import wait_replication_sync_command
+
+
+def test_short_options() -> None:
+    ctx = wait_replication_sync_command.make_context(
+        "replication-sync", ["-w", "100", "--workers", "8"], resilient_parsing=True
+    )
+
+    assert ctx.params["warn"] == 100
+    assert ctx.params["workers"] == 8
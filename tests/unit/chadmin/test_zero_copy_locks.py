@@ -0,0 +1,142 @@
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.chadmin.internal import zero_copy, zookeeper_clean
+from ch_tools.chadmin.internal.zero_copy import (
+    ZeroCopyLockCreator,
+    ZeroCopyLockInfo,
+    ZeroCopyPartLocks,
+)
+
+ZERO_COPY_PATH = "/clickhouse/zero_copy/zero_copy_s3"
+TABLE_PATH = "/clickhouse/tables/table1"
+
+
+def _part_locks(part: str, replicas: List[str]) -> ZeroCopyPartLocks:
+    set_value_path = f"{ZERO_COPY_PATH}/uuid1/{part}"
+    return ZeroCopyPartLocks(
+        identifier=part,
+        lock_infos=[
+            ZeroCopyLockInfo(
+                lock_path=f"{set_value_path}/blob_{part}/{replica}",
+                part_path=f"{TABLE_PATH}/replicas/{replica}/parts/{part}",
+                replica=replica,
+            )
+            for replica in replicas
+        ],
+        set_value_path=set_value_path,
+        old_value_path=f"/old/uuid1/{part}",
+        copy_values=True,
+    )
+
+
+@patch("ch_tools.chadmin.internal.zero_copy.logging")
+def test_create_locks_in_batch(_mock_logging: MagicMock, fake_zookeeper: Any) -> None:
+    parts = [f"all_{i}_{i}_0" for i in range(20)]
+    zk: Any = fake_zookeeper(
+        [f"{TABLE_PATH}/replicas/{r}/parts/{p}" for r in ("r1", "r2") for p in parts]
+        + [f"{ZERO_COPY_PATH}/uuid1/all_0_0_0/blob_all_0_0_0/r1"]
+    )
+    zk.add("/old/uuid1/all_1_1_0", b"hardlinks")
+    # Part is removed on the second replica.
+    del zk.nodes[f"{TABLE_PATH}/replicas/r2/parts/all_2_2_0"]
+
+    creator = ZeroCopyLockCreator(zk)
+    with patch.object(zero_copy, "LOCKS_TRANSACTION_MAX_OPERATIONS", 30):
+        creator.create([_part_locks(part, ["r1", "r2"]) for part in parts])
+
+    for part in parts:
+        for replica in ("r1", "r2"):
+            lock_path = f"{ZERO_COPY_PATH}/uuid1/{part}/blob_{part}/{replica}"
+            expected = not (part == "all_2_2_0" and replica == "r2")
+            assert (lock_path in zk.nodes) == expected
+    assert zk.nodes[f"{ZERO_COPY_PATH}/uuid1/all_1_1_0"] == b"hardlinks"
+    assert 1 < len(zk.transactions) < len(parts)
+    assert all(len(operations) <= 30 for operations in zk.transactions)
+    assert zk.sync_requests == 0
+
+
+@patch("ch_tools.chadmin.internal.zero_copy.logging")
+def test_create_locks_dry_run(mock_logging: MagicMock, fake_zookeeper: Any) -> None:
+    parts = ["all_1_1_0", "all_2_2_0"]
+    zk: Any = fake_zookeeper(
+        [f"{TABLE_PATH}/replicas/{r}/parts/{p}" for r in ("r1", "r2") for p in parts]
+        + [f"{ZERO_COPY_PATH}/uuid1/all_1_1_0/blob_all_1_1_0/r1"]
+    )
+    nodes = dict(zk.nodes)
+
+    ZeroCopyLockCreator(zk, dry_run=True).create(
+        [_part_locks(part, ["r1", "r2"]) for part in parts]
+    )
+
+    assert zk.nodes == nodes
+    assert not zk.transactions
+    mock_logging.info.assert_called_once_with(
+        "Would create {} zero-copy locks for {} parts", 3, 2
+    )
+
+
+@patch("ch_tools.chadmin.internal.zero_copy.logging")
+def test_failed_transaction_falls_back_to_single_parts(
+    _mock_logging: MagicMock, fake_zookeeper: Any
+) -> None:
+    parts = [f"all_{i}_{i}_0" for i in range(3)]
+    zk: Any = fake_zookeeper(
+        [f"{TABLE_PATH}/replicas/r1/parts/{p}" for p in parts] + [ZERO_COPY_PATH]
+    )
+
+    creator = ZeroCopyLockCreator(zk, check_part_exist=False)
+    creator.create([_part_locks(parts[0], ["r1"])])
+    # Cached parent node is removed concurrently.
+    del zk.nodes[f"{ZERO_COPY_PATH}/uuid1/{parts[0]}/blob_{parts[0]}/r1"]
+    del zk.nodes[f"{ZERO_COPY_PATH}/uuid1/{parts[0]}/blob_{parts[0]}"]
+    del zk.nodes[f"{ZERO_COPY_PATH}/uuid1/{parts[0]}"]
+    del zk.nodes[f"{ZERO_COPY_PATH}/uuid1"]
+    creator.create([_part_locks(part, ["r1"]) for part in parts[1:]])
+
+    for part in parts[1:]:
+        assert f"{ZERO_COPY_PATH}/uuid1/{part}/blob_{part}/r1" in zk.nodes
+    assert zk.sync_requests > 0
+
+
+@pytest.mark.parametrize(
+    "path, expected",
+    [
+        ("/a/b/c", ["/a", "/a/b"]),
+        ("/a", []),
+    ],
+)
+def test_get_parent_paths(path: str, expected: List[str]) -> None:
+    # pylint: disable=protected-access
+    assert zero_copy._get_parent_paths(path) == expected
+
+
+@pytest.mark.parametrize("batch_size", [1, 3, 100])
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_clean_locks_deletes_single_child_ancestors(
+    _mock_logging: MagicMock, batch_size: int, fake_zookeeper: Any
+) -> None:
+    zk: Any = fake_zookeeper(
+        [
+            f"{ZERO_COPY_PATH}/uuid1/all_0_0_0/blob1/r1",
+            f"{ZERO_COPY_PATH}/uuid2/all_0_0_0/blob1/r1",
+        ]
+    )
+    ctx = MagicMock()
+    ctx.obj = {
+        "config": {"zookeeper": {"walk_window": 10, "delete_in_flight_transactions": 2}}
+    }
+    # pylint: disable=protected-access
+    matcher = zookeeper_clean._get_zero_copy_locks_matcher(
+        ZERO_COPY_PATH, "uuid1", "all_0_0_0", None, "r1"
+    )
+
+    with patch.object(zookeeper_clean, "ZERO_COPY_LOCKS_TO_DELETE_BATCH", batch_size):
+        zookeeper_clean._clean_zero_copy_locks_for_remote_path_and_replica(
+            ctx, zk, matcher, dry_run=False
+        )
+
+    assert f"{ZERO_COPY_PATH}/uuid1" not in zk.nodes
+    assert f"{ZERO_COPY_PATH}/uuid2/all_0_0_0/blob1/r1" in zk.nodes
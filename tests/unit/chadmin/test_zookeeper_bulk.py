@@ -0,0 +1,107 @@
+from typing import Any, Dict
+from unittest.mock import MagicMock, patch
+
+import pytest
+from kazoo.exceptions import NodeExistsError, RolledBackError
+
+from ch_tools.chadmin.internal import database_replica, zookeeper
+from ch_tools.chadmin.internal.zookeeper import (
+    bulk_create_zk_nodes,
+    bulk_get_zk_nodes,
+    bulk_set_zk_nodes,
+)
+
+
+def _zk(fake_zookeeper: Any, nodes: Dict[str, bytes]) -> Any:
+    zk = fake_zookeeper()
+    for path, value in nodes.items():
+        zk.add(path, value)
+    return zk
+
+
+def test_bulk_get(fake_zookeeper: Any) -> None:
+    zk = _zk(fake_zookeeper, {f"/t{i}": f"{i}".encode() for i in range(10)})
+
+    result = bulk_get_zk_nodes(zk, [f"/t{i}" for i in range(12)], window=3)
+
+    assert result == {f"/t{i}": f"{i}".encode() for i in range(10)}
+    assert zk.requests == 12
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_bulk_create_and_set(_mock_logging: MagicMock, fake_zookeeper: Any) -> None:
+    zk = fake_zookeeper()
+    nodes = [("/db", b"")] + [(f"/db/t{i}", b"x" * 100) for i in range(50)]
+
+    with patch.object(zookeeper, "WRITE_TRANSACTION_MAX_OPERATIONS", 20):
+        with patch.object(zookeeper, "WRITE_TRANSACTION_MAX_BYTES", 1500):
+            bulk_create_zk_nodes(zk, nodes)
+            bulk_set_zk_nodes(zk, [(path, b"y") for path, _ in nodes])
+
+    assert zk.nodes == {"/": b"", **{path: b"y" for path, _ in nodes}}
+    assert 2 * 4 <= len(zk.transactions) < 2 * len(nodes)
+    assert all(len(operations) <= 20 for operations in zk.transactions)
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_bulk_create_raises_error(
+    _mock_logging: MagicMock, fake_zookeeper: Any
+) -> None:
+    zk = _zk(fake_zookeeper, {"/db": b"", "/db/t1": b""})
+
+    with pytest.raises(NodeExistsError):
+        bulk_create_zk_nodes(zk, [("/db/t0", b""), ("/db/t1", b"")])
+
+    assert "/db/t0" not in zk.nodes
+
+
+@pytest.mark.parametrize("replica_exists", [False, True])
+@patch("ch_tools.chadmin.internal.database_replica.logging")
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_create_replica_nodes_with_bulk_metadata(
+    _mock_zk_logging: MagicMock,
+    _mock_logging: MagicMock,
+    replica_exists: bool,
+    fake_zookeeper: Any,
+) -> None:
+    zk = fake_zookeeper(
+        ["/db/log/query-0000000001/finished", "/db/replicas", "/db/metadata"]
+    )
+    if replica_exists:
+        zk.add("/db/replicas/shard1|replica1")
+    metadata = [(f"/db/metadata/t{i}", f"CREATE TABLE t{i}") for i in range(10)]
+    ctx = MagicMock()
+    ctx.obj = {
+        "zk_client_args": {"no_ch_config": True},
+        "config": {"zookeeper": {"walk_window": 4}},
+    }
+    manager = database_replica.ZookeeperDatabaseManager(ctx)
+
+    with (
+        patch.object(database_replica, "zk_client") as zk_client_mock,
+        patch.object(database_replica, "WRITE_TRANSACTION_MAX_OPERATIONS", 15),
+        patch.object(zookeeper, "WRITE_TRANSACTION_MAX_OPERATIONS", 15),
+        patch.multiple(
+            manager,
+            _generate_counter=MagicMock(return_value="0000000002"),
+            _get_table_metadata_nodes=MagicMock(return_value=metadata),
+            _get_shard_and_replica=MagicMock(return_value=("shard1", "replica1")),
+            _get_host_id=MagicMock(return_value="host1:9000:uuid"),
+            _get_server_uuid=MagicMock(return_value="uuid"),
+        ),
+    ):
+        zk_client_mock.return_value.__enter__.return_value = zk
+        if replica_exists:
+            with pytest.raises((NodeExistsError, RolledBackError)):
+                manager.create_replica_nodes(
+                    "db", first_replica=True, db_replica_path="/db"
+                )
+        else:
+            manager.create_replica_nodes(
+                "db", first_replica=True, db_replica_path="/db"
+            )
+
+    # Metadata doesn't fit into the registration transaction along with other operations.
+    assert all(len(operations) <= 15 for operations in zk.transactions)
+    assert ("/db/metadata/t0" in zk.nodes) != replica_exists
+    assert ("/db/replicas/shard1|replica1/log_ptr" in zk.nodes) != replica_exists
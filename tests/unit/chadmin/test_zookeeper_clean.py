@@ -0,0 +1,54 @@
+import os
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from ch_tools.chadmin.internal import zookeeper_clean
+from ch_tools.common.process_pool import TaskCheckpoint, WorkerTask
+
+TABLE_PATH = "/clickhouse/tables/shard1/db1/table1"
+DATABASE_PATH = "/clickhouse/db1"
+
+
+def _table_task(replica: str) -> WorkerTask:
+    return WorkerTask(
+        f"drop_replica_task_{TABLE_PATH}_{replica}",
+        MagicMock(),
+        {"table_zk_path": TABLE_PATH, "replica": replica},
+    )
+
+
+def test_object_zk_path_prefix() -> None:
+    database_task = WorkerTask(
+        "task", MagicMock(), {"database_zk_path": DATABASE_PATH, "replica": "s1|r1"}
+    )
+
+    # pylint: disable=protected-access
+    assert (
+        zookeeper_clean._get_object_zk_path_prefix(_table_task("r1"))
+        == "/clickhouse/tables/shard1/db1"
+    )
+    assert zookeeper_clean._get_object_zk_path_prefix(database_task) == "/clickhouse"
+
+
+@patch("ch_tools.chadmin.internal.zookeeper_clean.logging")
+@patch("ch_tools.common.process_pool.logging")
+def test_verify_checkpoint_discards_existing_replicas(
+    _mock_pool_logging: MagicMock,
+    _mock_logging: MagicMock,
+    tmp_path: Any,
+    fake_zookeeper: Any,
+) -> None:
+    zk: Any = fake_zookeeper([f"{TABLE_PATH}/replicas/r2"])
+    tasks = [_table_task("r1"), _table_task("r2"), _table_task("r3")]
+    path = os.path.join(tmp_path, "checkpoint")
+    checkpoint = TaskCheckpoint(path, {"nodes": ["r1", "r2", "r3"]})
+    checkpoint.add(tasks[0].identifier)
+    checkpoint.add(tasks[1].identifier)
+    checkpoint.close()
+
+    checkpoint = TaskCheckpoint(path, {"nodes": ["r1", "r2", "r3"]})
+    # pylint: disable=protected-access
+    zookeeper_clean._verify_checkpoint(zk, checkpoint, tasks, window=2)
+    checkpoint.close(remove=True)
+
+    assert checkpoint.completed == {tasks[0].identifier}
@@ -0,0 +1,83 @@
+import time
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+from click import Command, Context
+from kazoo.client import KazooClient
+from kazoo.protocol.states import KazooState, KeeperState
+from kazoo.retry import KazooRetry
+
+from ch_tools.chadmin.internal.zookeeper import zk_client
+from ch_tools.common.config import DEFAULT_CONFIG
+
+
+def _client() -> Any:
+    zk = MagicMock(spec=KazooClient)
+    zk.state = KazooState.LOST
+    zk.client_state = KeeperState.CLOSED
+
+    def _start() -> None:
+        zk.state = KazooState.CONNECTED
+        zk.client_state = KeeperState.CONNECTED
+
+    zk.start.side_effect = _start
+    return zk
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_zk_client_is_shared_until_context_close(_mock_logging: MagicMock) -> None:
+    zk = _client()
+    ctx = Context(Command("zookeeper"), obj=dict(config=DEFAULT_CONFIG))
+
+    with patch(
+        "ch_tools.chadmin.internal.zookeeper._get_zk_client", return_value=zk
+    ) as get_zk_client:
+        with ctx:
+            for _ in range(3):
+                with zk_client(ctx) as client:
+                    assert client is zk
+
+            # Expired session is reestablished by Kazoo.
+            zk.state = KazooState.LOST
+            zk.client_state = KeeperState.EXPIRED_SESSION
+            with zk_client(ctx) as client:
+                assert client is zk
+            assert zk.start.call_count == 1
+
+            # Client that gave up reconnecting is started again.
+            zk.client_state = KeeperState.CLOSED
+            with zk_client(ctx) as client:
+                assert client is zk
+
+            zk.stop.assert_not_called()
+
+    assert get_zk_client.call_count == 1
+    assert zk.start.call_count == 2
+    zk.stop.assert_called_once()
+    assert "zk_client" not in ctx.obj
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_zk_client_does_not_restart_connecting_client(_mock_logging: MagicMock) -> None:
+    # Nothing listens on the port, so the client keeps reconnecting.
+    zk = KazooClient(
+        "127.0.0.1:1",
+        connection_retry=KazooRetry(max_tries=-1, delay=0.01, max_delay=0.05),
+    )
+    zk.start_async()
+    ctx = Context(Command("zookeeper"), obj=dict(config=DEFAULT_CONFIG, zk_client=zk))
+    try:
+        deadline = time.monotonic() + 5
+        while zk.client_state != KeeperState.CONNECTING:
+            assert time.monotonic() < deadline
+            time.sleep(0.01)
+        assert zk.state == KazooState.LOST
+
+        with patch.object(zk, "start") as start:
+            with zk_client(ctx) as client:
+                assert client is zk
+
+        start.assert_not_called()
+    finally:
+        zk.stop()
+        zk.close()
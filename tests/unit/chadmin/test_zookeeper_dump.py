@@ -0,0 +1,106 @@
+from typing import Any, List
+from unittest.mock import patch
+
+import pytest
+from kazoo.exceptions import NoNodeError
+
+from ch_tools.chadmin.internal.zookeeper import find_leafs_and_nodes, find_paths
+from ch_tools.chadmin.internal.zookeeper_dump import (
+    ZookeeperDump,
+    dump_zk_tree,
+    find_paths_in_dump,
+)
+
+ZK_PATHS = [
+    "/clickhouse/zero_copy/uuid1/part1/blob1/replica1",
+    "/clickhouse/zero_copy/uuid1/part2/blob2/replica2",
+    "/clickhouse/tables/table1/replicas/replica1",
+    "/clickhouse/tables2",
+    "/clickhouse/tables-1",
+]
+
+
+@pytest.fixture(params=[False, True], ids=["stat", "data"])
+def dump(request: Any, tmp_path: Any, fake_zookeeper: Any) -> Any:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+    dump_path = str(tmp_path / "zk.dump")
+
+    with patch("ch_tools.chadmin.internal.zookeeper_dump.logging"):
+        stats = dump_zk_tree(zk, "/clickhouse", dump_path, with_data=request.param)
+
+    assert stats.nodes == 15
+    dump = ZookeeperDump(dump_path)
+    yield dump
+    dump.stop()
+
+
+def test_dump_reads(dump: Any) -> None:
+    assert sorted(dump.get_children("/clickhouse")) == [
+        "tables",
+        "tables-1",
+        "tables2",
+        "zero_copy",
+    ]
+    assert dump.get_children("/clickhouse/tables2") == []
+    assert dump.exists("/clickhouse/tables/table1/").numChildren == 1
+    assert dump.exists("/clickhouse/missing") is None
+    assert dump.exists("/") is None
+    with pytest.raises(NoNodeError):
+        dump.get_children("/clickhouse/missing")
+
+    if dump.with_data:
+        assert dump.get("/clickhouse/tables2")[0] == b"/clickhouse/tables2"
+    else:
+        with pytest.raises(RuntimeError):
+            dump.get("/clickhouse/tables2")
+
+    with pytest.raises(RuntimeError):
+        dump.delete("/clickhouse")
+
+
+def test_dump_iter_paths(dump: Any) -> None:
+    assert list(dump.iter_paths("/clickhouse/tables")) == [
+        "/clickhouse/tables",
+        "/clickhouse/tables/table1",
+        "/clickhouse/tables/table1/replicas",
+        "/clickhouse/tables/table1/replicas/replica1",
+    ]
+    assert list(dump.iter_paths("/clickhouse/tables2/")) == ["/clickhouse/tables2"]
+    assert not list(dump.iter_paths("/clickhouse/missing"))
+    assert len(list(dump.iter_paths("/"))) == 15
+
+
+def test_traversals_on_dump(dump: Any) -> None:
+    assert sorted(find_paths(dump, "/clickhouse", [".*/part\\d$"])) == [
+        "/clickhouse/zero_copy/uuid1/part1",
+        "/clickhouse/zero_copy/uuid1/part2",
+    ]
+    assert sorted(
+        find_leafs_and_nodes(
+            dump, "/clickhouse/zero_copy", lambda path: path.endswith("replica1")
+        )
+    ) == [
+        "/clickhouse/zero_copy/uuid1/part1",
+        "/clickhouse/zero_copy/uuid1/part1/blob1",
+        "/clickhouse/zero_copy/uuid1/part1/blob1/replica1",
+    ]
+
+
+@pytest.mark.parametrize(
+    "root_path, regexps, excluded_paths",
+    [
+        ("/clickhouse", [".*/part\\d$"], None),
+        ("/clickhouse", ["/clickhouse/tables.*"], None),
+        ("/clickhouse", [".*/replica1$"], [".*/tables$"]),
+        ("/clickhouse/tables", [".*"], None),
+        ("/", [".*/blob\\d$", ".*/tables2$"], None),
+        ("/clickhouse", [".*"], ["/clickhouse"]),
+    ],
+)
+def test_find_paths_in_dump(
+    dump: Any, root_path: str, regexps: List[str], excluded_paths: Any
+) -> None:
+    # Scan of the dump returns the same paths as the traversal of the tree.
+    assert sorted(
+        find_paths_in_dump(dump, root_path, regexps, excluded_paths)
+    ) == sorted(find_paths(dump, root_path, regexps, excluded_paths))
@@ -0,0 +1,72 @@
+from typing import Any
+from unittest.mock import patch
+
+from kazoo.client import KazooClient
+from kazoo.exceptions import NoNodeError
+from kazoo.protocol.serialization import (
+    Create,
+    Delete,
+    Exists,
+    GetChildren,
+    GetData,
+    Transaction,
+)
+from kazoo.protocol.states import ZnodeStat
+
+from ch_tools.chadmin.internal.zookeeper_stats import (
+    InstrumentedKazooClient,
+    ZookeeperRequestStats,
+    get_payload_size,
+)
+
+STAT = ZnodeStat(1, 2, 3, 4, 5, 6, 7, 0, 4, 0, 8)
+
+
+def test_client_records_requests() -> None:
+    zk = InstrumentedKazooClient("localhost:2181")
+
+    with patch.object(KazooClient, "_call", return_value=True):
+        for request, value, exception in [
+            (GetChildren("/clickhouse", None), ["tables", "zero_copy"], None),
+            (GetData("/clickhouse", None), (b"data", STAT), None),
+            (GetData("/missing", None), None, NoNodeError()),
+            (Exists("/clickhouse", None), STAT, None),
+            (
+                Transaction([Create("/t1", b"data", [], 0), Delete("/t2", -1)]),
+                [True, True],
+                None,
+            ),
+        ]:
+            async_result: Any = zk.handler.async_result()
+            zk._call(request, async_result)  # pylint: disable=protected-access
+            if exception:
+                async_result.set_exception(exception)
+            else:
+                async_result.set(value)
+
+    operations = zk.request_stats.operations
+    assert sorted(operations) == ["exists", "get", "get_children", "multi"]
+    assert operations["get"].requests == 2
+    assert operations["get"].errors == 1
+    assert operations["get"].received_bytes == 4 + 68
+    assert operations["get_children"].received_bytes == len("tableszero_copy")
+    assert operations["exists"].sent_bytes == len("/clickhouse")
+    assert operations["multi"].sent_bytes == len("/t1data/t2")
+    assert zk.request_stats.requests == 5
+
+
+def test_request_stats_histogram() -> None:
+    stats = ZookeeperRequestStats()
+    for latency in [0.0005, 0.0015, 0.0015, 0.03, 10.0]:
+        stats.record("get", latency)
+
+    assert stats.histogram() == "<= 1ms: 1, <= 2ms: 2, <= 50ms: 1, > 5s: 1"
+    assert stats.operations["get"].latency_quantile(0.5) == 0.002
+    assert stats.operations["get"].latency_quantile(1.0) == 10.0
+    assert str(stats).startswith("5 requests, latency histogram: <= 1ms: 1")
+
+
+def test_payload_size() -> None:
+    assert get_payload_size(["a", "bc"]) == 3
+    assert get_payload_size([True, "/path"]) == 5
+    assert get_payload_size(None) == 0
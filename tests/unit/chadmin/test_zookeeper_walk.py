@@ -0,0 +1,275 @@
+import os
+import re
+from typing import Any, List, Optional
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.chadmin.internal import zookeeper
+from ch_tools.chadmin.internal.zookeeper import (
+    PathLevelsMatcher,
+    WalkOrder,
+    WalkPrefetch,
+    delete_recursive,
+    estimate_matching_zk_subtrees,
+    estimate_zk_subtrees,
+    find_leafs_and_nodes,
+    find_paths,
+    walk_zk_tree,
+)
+
+ZK_PATHS = [
+    "/zero_copy/uuid1/part1/blob1/replica1",
+    "/zero_copy/uuid1/part1/blob1/replica2",
+    "/zero_copy/uuid1/part2/blob2/replica1",
+    "/zero_copy/uuid2/part3/blob3/replica2",
+    "/tables/table1/replicas/replica1",
+]
+
+
+@pytest.mark.parametrize("order", [WalkOrder.BFS, WalkOrder.DFS])
+@pytest.mark.parametrize("window", [1, 3, 100])
+def test_walk_visits_parents_before_children(
+    order: WalkOrder, window: int, fake_zookeeper: Any
+) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+
+    visited = [
+        node.path for node in walk_zk_tree(zk, ["/"], order=order, window=window)
+    ]
+
+    assert sorted(visited) == sorted(zk.nodes)
+    for path in visited[1:]:
+        assert visited.index(os.path.dirname(path)) < visited.index(path)
+    assert zk.max_in_flight <= window
+    if window > 1:
+        assert zk.max_in_flight > 1
+
+
+def test_walk_prunes_and_prefetches(fake_zookeeper: Any) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+
+    nodes = list(
+        walk_zk_tree(
+            zk,
+            ["/", "/missing"],
+            prefetch=WalkPrefetch.DATA,
+            expand=lambda node: "replicas" not in node.children,
+            child_filter=lambda path: not path.startswith("/zero_copy"),
+        )
+    )
+
+    assert [node.path for node in nodes] == [
+        "/",
+        "/missing",
+        "/tables",
+        "/tables/table1",
+    ]
+    assert nodes[-1].data == b"/tables/table1"
+    assert nodes[1].children == [] and nodes[1].data is None
+
+
+@pytest.mark.parametrize(
+    "excluded_paths, expected",
+    [
+        (None, ["/zero_copy/uuid1/part1", "/zero_copy/uuid1/part2"]),
+        ([".*/uuid1/part1"], ["/zero_copy/uuid1/part1", "/zero_copy/uuid1/part2"]),
+        ([".*/uuid1$"], []),
+        (["/zero_copy"], []),
+    ],
+)
+def test_find_paths(
+    excluded_paths: Optional[List[str]], expected: List[str], fake_zookeeper: Any
+) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+
+    paths = find_paths(
+        zk,
+        "/zero_copy",
+        [r"/zero_copy/uuid1/part\d$"],
+        excluded_paths,
+    )
+
+    assert sorted(paths) == expected
+
+
+@pytest.mark.parametrize("window", [1, 100])
+def test_find_leafs_and_nodes(window: int, fake_zookeeper: Any) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+
+    paths = list(
+        find_leafs_and_nodes(
+            zk,
+            "/zero_copy",
+            re.compile(".*/replica1$").match,
+            window=window,
+        )
+    )
+
+    assert sorted(paths) == [
+        "/zero_copy/uuid1/part1/blob1/replica1",
+        "/zero_copy/uuid1/part2",
+        "/zero_copy/uuid1/part2/blob2",
+        "/zero_copy/uuid1/part2/blob2/replica1",
+    ]
+    # Children are returned before their parents.
+    assert paths.index("/zero_copy/uuid1/part2/blob2") < paths.index(
+        "/zero_copy/uuid1/part2"
+    )
+
+
+def test_find_leafs_and_nodes_matches_root(fake_zookeeper: Any) -> None:
+    zk: Any = fake_zookeeper(["/zero_copy/uuid1/replica1"])
+
+    paths = list(find_leafs_and_nodes(zk, "/zero_copy", lambda _: True))
+
+    assert paths == ["/zero_copy/uuid1/replica1", "/zero_copy/uuid1", "/zero_copy"]
+
+
+@pytest.mark.parametrize("max_in_flight_transactions", [1, 4])
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_delete_recursive(
+    _mock_logging: MagicMock, max_in_flight_transactions: int, fake_zookeeper: Any
+) -> None:
+    paths = [f"/zero_copy/uuid{i}/part{j}/replica" for i in range(5) for j in range(20)]
+    zk: Any = fake_zookeeper(paths + ["/tables/table1"])
+
+    with patch.object(zookeeper, "DELETE_TRANSACTION_MAX_OPERATIONS", 7):
+        stats = delete_recursive(
+            zk,
+            ["/zero_copy/uuid1", "/zero_copy", "/missing"],
+            window=5,
+            max_in_flight_transactions=max_in_flight_transactions,
+        )
+
+    assert sorted(zk.nodes) == ["/", "/tables", "/tables/table1"]
+    assert stats.deleted == len(paths) * 2 + 5 + 2
+    assert stats.failed_transactions == 1
+    assert all(len(transaction) <= 7 for transaction in zk.transactions)
+    assert zk.max_in_flight <= 5 + max_in_flight_transactions
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_delete_recursive_limits_transaction_size(
+    _mock_logging: MagicMock, fake_zookeeper: Any
+) -> None:
+    long_name = "n" * 1000
+    zk: Any = fake_zookeeper([f"/root/{long_name}{i}" for i in range(100)])
+
+    with patch.object(zookeeper, "DELETE_TRANSACTION_MAX_BYTES", 10000):
+        delete_recursive(zk, ["/root"])
+
+    assert zk.nodes == {"/": b""}
+    assert max(len(transaction) for transaction in zk.transactions) < 10
+
+
+@patch("ch_tools.chadmin.internal.zookeeper.logging")
+def test_delete_recursive_dry_run(
+    _mock_logging: MagicMock, fake_zookeeper: Any
+) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS)
+    nodes = dict(zk.nodes)
+
+    stats = delete_recursive(zk, ["/zero_copy"], dry_run=True)
+
+    assert zk.nodes == nodes
+    assert stats.deleted == 13
+    assert not zk.transactions
+
+
+@pytest.mark.parametrize(
+    "path, matches, should_visit",
+    [
+        ("/zero_copy", False, True),
+        ("/zero_copy/uuid1", False, True),
+        ("/zero_copy/uuid2", False, False),
+        ("/zero_copy/uuid1/part1/blob1", False, True),
+        ("/zero_copy/uuid1/part1/blob1/replica1", True, True),
+        ("/zero_copy/uuid1/part1/blob1/replica2", False, False),
+        ("/zero_copy/uuid1/part1/blob1/replica1/child", False, False),
+    ],
+)
+def test_path_levels_matcher(path: str, matches: bool, should_visit: bool) -> None:
+    matcher = PathLevelsMatcher(
+        "/zero_copy", ["uuid1", re.compile(r"part\d"), re.compile(".+"), "replica1"]
+    )
+
+    assert matcher.start_path == "/zero_copy/uuid1"
+    assert matcher.matches(path) == matches
+    assert matcher.should_visit(path) == should_visit
+
+
+def test_find_leafs_and_nodes_prunes_subtrees(fake_zookeeper: Any) -> None:
+    zk: Any = fake_zookeeper(ZK_PATHS + ["/zero_copy/uuid1/part2/blob2/replica3"])
+    matcher = PathLevelsMatcher(
+        "/zero_copy", ["uuid1", re.compile(".+"), re.compile(".+"), "replica1"]
+    )
+    visited: List[str] = []
+    get_children_async = zk.get_children_async
+
+    def _get_children_async(path: str) -> Any:
+        visited.append(path)
+        return get_children_async(path)
+
+    zk.get_children_async = _get_children_async
+
+    paths = find_leafs_and_nodes(
+        zk,
+        matcher.start_path,
+        matcher.matches,
+        child_filter=matcher.should_visit,
+    )
+
+    assert sorted(paths) == [
+        "/zero_copy/uuid1/part1/blob1/replica1",
+        "/zero_copy/uuid1/part2/blob2/replica1",
+    ]
+    assert "/zero_copy/uuid2" not in visited
+    assert "/zero_copy/uuid1/part1/blob1/replica2" not in visited
+
+
+def test_estimate_zk_subtrees(fake_zookeeper: Any) -> None:
+    paths = [
+        f"/zero_copy/uuid{i}/part{j}/replica" for i in range(10) for j in range(50)
+    ]
+    zk: Any = fake_zookeeper(paths + ["/tables/table1"])
+    subtree = [path for path in zk.nodes if path.startswith("/zero_copy/")]
+    data_bytes = sum(len(zk.nodes[path]) for path in subtree)
+
+    exact = estimate_zk_subtrees(zk, ["/zero_copy/uuid1", "/zero_copy"], sample_size=50)
+    assert exact.exact
+    assert exact.nodes == len(subtree) + 1
+    assert exact.data_bytes == data_bytes + len(b"/zero_copy")
+
+    estimate = estimate_zk_subtrees(zk, ["/zero_copy", "/missing"], sample_size=5)
+    assert not estimate.exact
+    assert estimate.nodes == pytest.approx(len(subtree) + 1, rel=0.01)
+    assert estimate.data_bytes == pytest.approx(data_bytes, rel=0.1)
+
+
+def test_estimate_matching_zk_subtrees(fake_zookeeper: Any) -> None:
+    paths = [
+        f"/zero_copy/uuid{i}/part{j}/blob{j}/replica{k}"
+        for i in range(10)
+        for j in range(50)
+        for k in range(2)
+    ]
+    zk: Any = fake_zookeeper(paths)
+    matcher = PathLevelsMatcher(
+        "/zero_copy", [re.compile(".+"), re.compile(".+"), re.compile(".+"), "replica1"]
+    )
+    matching = [path for path in paths if matcher.matches(path)]
+    data_bytes = sum(len(zk.nodes[path]) for path in matching)
+
+    exact = estimate_matching_zk_subtrees(zk, matcher, sample_size=1000)
+    assert exact.exact
+    assert exact.nodes == len(matching)
+    assert exact.data_bytes == data_bytes
+
+    zk.requests = 0
+    estimate = estimate_matching_zk_subtrees(zk, matcher, sample_size=20)
+    assert not estimate.exact
+    assert estimate.nodes == pytest.approx(len(matching))
+    assert estimate.data_bytes == pytest.approx(data_bytes, rel=0.1)
+    # Up to sample_size nodes are read on every level.
+    assert zk.requests <= 1 + 20 * 4
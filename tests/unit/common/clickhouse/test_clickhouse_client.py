@@ -0,0 +1,118 @@
+import asyncio
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Iterator, Tuple
+
+import pytest
+
+from ch_tools.common.clickhouse.client.async_client import gather, query_on_hosts
+from ch_tools.common.clickhouse.client.clickhouse_client import (
+    ClickhouseClient,
+    ClickhousePort,
+)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_POST(self) -> None:  # pylint: disable=invalid-name
+        length = int(self.headers.get("Content-Length") or 0)
+        # Echo request body to check how data is sent.
+        body = self.rfile.read(length) or b"1\n"
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+
+@pytest.fixture
+def http_server() -> Iterator[Tuple[str, int]]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server.server_address  # type: ignore[misc]
+    server.shutdown()
+    server.server_close()
+
+
+def test_http_connections_reused(http_server: Tuple[str, int]) -> None:
+    host, port = http_server
+    client = ClickhouseClient(
+        host=host,
+        ports={ClickhousePort.HTTP: port},
+        timeout=10,
+    )
+
+    for _ in range(5):
+        assert client.query("SELECT 1", log_query=False) == "1"
+
+    assert client.get_connection_stats() == {
+        "requests": 5,
+        "connections_opened": 1,
+        "connections_reused": 4,
+    }
+
+    client.close()
+    assert client.get_connection_stats()["requests"] == 0
+
+
+def test_http_post_data(http_server: Tuple[str, int]) -> None:
+    host, port = http_server
+    client = ClickhouseClient(
+        host=host,
+        ports={ClickhousePort.HTTP: port},
+        timeout=10,
+    )
+
+    assert (
+        client.query(
+            "INSERT INTO t FORMAT TabSeparated",
+            post_data="1\ta\n2\tb\n",
+            log_query=False,
+        )
+        == "1\ta\n2\tb"
+    )
+    assert (
+        client.query(
+            "INSERT INTO t FORMAT JSONEachRow", post_data={"a": 1}, log_query=False
+        )
+        == '{"a": 1}'
+    )
+
+
+def test_query_on_hosts(http_server: Tuple[str, int]) -> None:
+    host, port = http_server
+    client = ClickhouseClient(
+        host="unused",
+        ports={ClickhousePort.HTTP: port},
+        timeout=10,
+    )
+
+    result = query_on_hosts(
+        client, "SELECT 1", [host, "localhost"], max_concurrency=2, log_query=False
+    )
+
+    assert result == {host: "1", "localhost": "1"}
+
+
+def test_gather_raises_first_error() -> None:
+    async def _result(value: Any, delay: float) -> Any:
+        await asyncio.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    async def _run() -> Any:
+        return await gather(
+            [
+                _result(1, 0.02),
+                _result(ValueError("first"), 0.01),
+                _result(RuntimeError("second"), 0),
+            ]
+        )
+
+    with pytest.raises(ValueError, match="first"):
+        asyncio.run(_run())
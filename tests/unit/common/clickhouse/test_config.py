@@ -7,6 +7,9 @@ from ch_tools.common.clickhouse.config.path import (
     CLICKHOUSE_SERVER_CONFIG_PATH,
     CLICKHOUSE_SERVER_PREPROCESSED_CONFIG_PATH,
 )
+from ch_tools.common.clickhouse.config.storage_configuration import (
+    S3DiskConfiguration,
+)
 
 # type: ignore
 
@@ -178,3 +181,44 @@ def test_config_zookeeper(fs: Any, files: Any, result: Any) -> None:
         fs.create_file(file_path, contents=contents)
 
     assert ClickhouseConfig.load().zookeeper.is_empty() == result
+
+
+@pytest.mark.parametrize(
+    "metadata_path_config,result",
+    [
+        pytest.param(
+            "<metadata_path>/data/clickhouse/disks/object_storage/</metadata_path>",
+            "/data/clickhouse/disks/object_storage",
+            id="explicit metadata path",
+        ),
+        pytest.param(
+            "",
+            "/var/lib/clickhouse/disks/object_storage",
+            id="default metadata path",
+        ),
+    ],
+)
+def test_s3_disk_metadata_path(fs: Any, metadata_path_config: str, result: str) -> None:
+    fs.create_file(
+        CLICKHOUSE_SERVER_CONFIG_PATH,
+        contents=f"""
+            <clickhouse>
+                <storage_configuration>
+                    <disks>
+                        <object_storage>
+                            <type>s3</type>
+                            <endpoint>https://cloud-storage-test.s3.net/data/</endpoint>
+                            <access_key_id>key</access_key_id>
+                            <secret_access_key>secret</secret_access_key>
+                            {metadata_path_config}
+                        </object_storage>
+                    </disks>
+                </storage_configuration>
+            </clickhouse>
+            """,
+    )
+
+    disk = S3DiskConfiguration.from_config(
+        ClickhouseConfig.load().storage_configuration, "object_storage", "cloud-storage"
+    )
+    assert disk.metadata_path == result
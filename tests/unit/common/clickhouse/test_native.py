@@ -0,0 +1,85 @@
+from datetime import date, datetime
+from typing import Any, Optional
+from uuid import UUID
+
+import pytest
+
+from ch_tools.common.clickhouse.client.native import format_line, format_result
+
+COLUMNS = [
+    ("name", "String"),
+    ("rows", "UInt64"),
+    ("level", "UInt32"),
+    ("modification_time", "DateTime"),
+]
+ROWS = [
+    ("all_1_1_0", 10, 0, datetime(2025, 11, 5, 10, 15, 20)),
+    ("all_2_2\t0", 5, 1, datetime(2025, 11, 6, 10, 15, 20)),
+]
+
+
+def test_json() -> None:
+    assert format_result(ROWS, COLUMNS, "JSON")["data"] == [
+        {
+            "name": "all_1_1_0",
+            "rows": "10",
+            "level": 0,
+            "modification_time": "2025-11-05 10:15:20",
+        },
+        {
+            "name": "all_2_2\t0",
+            "rows": "5",
+            "level": 1,
+            "modification_time": "2025-11-06 10:15:20",
+        },
+    ]
+
+
+def test_json_compact() -> None:
+    result = format_result(ROWS, COLUMNS, "JSONCompact")
+    assert result["rows"] == 2
+    assert result["meta"][1] == {"name": "rows", "type": "UInt64"}
+    assert result["data"][0] == ["all_1_1_0", "10", 0, "2025-11-05 10:15:20"]
+
+
+@pytest.mark.parametrize(
+    "format_,expected",
+    [
+        (
+            None,
+            "all_1_1_0\t10\t0\t2025-11-05 10:15:20\nall_2_2\\t0\t5\t1\t2025-11-06 10:15:20",
+        ),
+        (
+            "TabSeparatedRaw",
+            "all_1_1_0\t10\t0\t2025-11-05 10:15:20\nall_2_2\t0\t5\t1\t2025-11-06 10:15:20",
+        ),
+    ],
+)
+def test_tab_separated(format_: Optional[str], expected: str) -> None:
+    assert format_result(ROWS, COLUMNS, format_) == expected
+
+
+@pytest.mark.parametrize(
+    "value,type_,expected",
+    [
+        (None, "Nullable(String)", "\\N"),
+        (True, "Bool", "true"),
+        (["a", "b'c"], "Array(String)", "['a','b\\'c']"),
+        ([1, 2], "Array(UInt8)", "[1,2]"),
+        (date(2025, 1, 2), "Date", "2025-01-02"),
+        (
+            UUID("61f0c404-5cb3-11e7-907b-a6006ad3dba0"),
+            "UUID",
+            "61f0c404-5cb3-11e7-907b-a6006ad3dba0",
+        ),
+    ],
+)
+def test_tab_separated_values(value: Any, type_: str, expected: str) -> None:
+    assert format_line((value,), [("value", type_)], None) == expected
+
+
+def test_json_each_row() -> None:
+    assert (
+        format_line(ROWS[0], COLUMNS, "JSONEachRow")
+        == '{"name": "all_1_1_0", "rows": "10", "level": 0, "modification_time": "2025-11-05 10:15:20"}'
+    )
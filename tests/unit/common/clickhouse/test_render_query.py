@@ -0,0 +1,60 @@
+from ch_tools.common.clickhouse.client.clickhouse_client import (
+    ClickhouseClient,
+    ClickhousePort,
+    compile_template,
+)
+
+QUERY = """
+    SELECT database, name
+    FROM system.tables
+    {% if database -%}
+    WHERE database {{ format_str_match(database) }}
+    {% endif -%}
+    {% if version_ge('23.3') -%}
+    SETTINGS allow_experimental_analyzer = 1
+    {% endif -%}
+    """
+
+
+def _client(version: str) -> ClickhouseClient:
+    client = ClickhouseClient(
+        host="localhost", ports={ClickhousePort.HTTP: 8123}, timeout=10
+    )
+    client._ch_version = version  # pylint: disable=protected-access
+    return client
+
+
+def test_render_query() -> None:
+    assert _client("24.8.1.1").render_query(QUERY, database="db1,db2").split() == [
+        "SELECT",
+        "database,",
+        "name",
+        "FROM",
+        "system.tables",
+        "WHERE",
+        "database",
+        "IN",
+        "('db1','db2')",
+        "SETTINGS",
+        "allow_experimental_analyzer",
+        "=",
+        "1",
+    ]
+
+
+def test_render_query_uses_client_version() -> None:
+    # Compiled template is shared, but version_ge must be evaluated against each client.
+    assert "SETTINGS" in _client("24.8.1.1").render_query(QUERY)
+    assert "SETTINGS" not in _client("22.8.1.1").render_query(QUERY)
+
+
+def test_render_query_compiles_template_once() -> None:
+    client = _client("24.8.1.1")
+    query = QUERY + "LIMIT 10"
+    client.render_query(query, database="db1")
+    hits = compile_template.cache_info().hits
+
+    for _ in range(10):
+        client.render_query(query, database="db2")
+
+    assert compile_template.cache_info().hits == hits + 10
@@ -0,0 +1,173 @@
+from typing import Any, Dict, List
+
+import pytest
+from click import Command, Context
+
+from ch_tools.common.clickhouse.replicas_snapshot import (
+    REPLICATION_QUEUE_INT_COLUMNS,
+    SNAPSHOT_QUERY,
+    ReplicasSnapshot,
+    ReplicasSnapshotCache,
+    get_replicas_snapshot,
+)
+from ch_tools.common.commands.replication_lag import estimate_replication_lag
+
+
+def _row(database: str, table: str, **kwargs: Any) -> Dict[str, Any]:
+    # UInt64 values are returned as strings in JSON output format.
+    row: Dict[str, Any] = {
+        "database": database,
+        "table": table,
+        "zookeeper_path": f"/clickhouse/{database}/{table}",
+        "replica_path": f"/clickhouse/{database}/{table}/replicas/host",
+        "is_readonly": 0,
+        "absolute_delay": "0",
+        "total_replicas": 2,
+        "future_parts": 0,
+        "parts_to_check": 0,
+        "queue_size": 0,
+        "inserts_in_queue": 0,
+        "merges_in_queue": 0,
+        "last_queue_update_exception": "",
+        "zookeeper_exception": "",
+        "tasks": "0",
+        "errors": "0",
+        "max_execution": "0",
+        "exceptions": [],
+        "max_execution_part": "",
+        "retried_merges": "0",
+        "max_replicated_merges_in_queue": "20",
+    }
+    row.update(kwargs)
+    return row
+
+
+class FakeClickhouseClient:
+    def __init__(self, rows: List[Dict[str, Any]]) -> None:
+        self.rows = rows
+        self.queries: List[str] = []
+
+    def query_json_data(self, query: str, compact: bool = True) -> Any:
+        # pylint: disable=unused-argument
+        self.queries.append(query)
+        if query != SNAPSHOT_QUERY:
+            return [dict(row) for row in self.rows]
+        # Base snapshot doesn't contain columns of the replication queue.
+        excluded = {
+            *REPLICATION_QUEUE_INT_COLUMNS,
+            "exceptions",
+            "max_execution_part",
+            "max_replicated_merges_in_queue",
+        }
+        return [
+            {column: value for column, value in row.items() if column not in excluded}
+            for row in self.rows
+        ]
+
+
+def _context(rows: List[Dict[str, Any]], cache: bool = True) -> Any:
+    obj: Dict[str, Any] = {"chcli": FakeClickhouseClient(rows)}
+    if cache:
+        obj["replicas_snapshot_cache"] = ReplicasSnapshotCache(max_age=60)
+    return Context(Command("ch-monitoring"), obj=obj)
+
+
+def test_snapshot_fetch() -> None:
+    ctx = _context([_row("db1", "t1", absolute_delay="5", is_readonly=1)])
+
+    snapshot = get_replicas_snapshot(ctx)
+
+    assert snapshot.max_replicated_merges_in_queue == 16
+    assert snapshot.replicas[0]["absolute_delay"] == 5
+    assert snapshot.replicas[0]["is_readonly"] is True
+    assert "total_replicas" not in snapshot.replicas[0]
+    assert "total_replicas" not in SNAPSHOT_QUERY
+    assert "replication_queue" not in SNAPSHOT_QUERY
+
+
+def test_snapshot_fetch_with_replication_queue() -> None:
+    ctx = _context([_row("db1", "t1", tasks="3")])
+
+    snapshot = get_replicas_snapshot(ctx, with_replication_queue=True)
+
+    assert snapshot.max_replicated_merges_in_queue == 20
+    assert snapshot.replicas[0]["tasks"] == 3
+    assert snapshot.replicas[0]["total_replicas"] == 2
+    assert "max_replicated_merges_in_queue" not in snapshot.replicas[0]
+
+
+def test_snapshot_is_shared_within_run() -> None:
+    ctx = _context([_row("db1", "t1")])
+
+    assert get_replicas_snapshot(ctx) is get_replicas_snapshot(ctx)
+    assert len(ctx.obj["chcli"].queries) == 1
+
+    # Snapshot with the replication queue is fetched once and reused by other checks.
+    snapshot = get_replicas_snapshot(ctx, with_replication_queue=True)
+    assert snapshot is get_replicas_snapshot(ctx, with_replication_queue=True)
+    assert snapshot is get_replicas_snapshot(ctx)
+    assert len(ctx.obj["chcli"].queries) == 2
+
+
+def test_snapshot_without_cache() -> None:
+    ctx = _context([_row("db1", "t1")], cache=False)
+
+    get_replicas_snapshot(ctx)
+    get_replicas_snapshot(ctx)
+
+    assert len(ctx.obj["chcli"].queries) == 2
+
+
+@pytest.mark.parametrize(
+    "pattern, expected",
+    [
+        pytest.param(None, ["db1", "db2", "other"], id="no pattern"),
+        pytest.param("db%", ["db1", "db2"], id="like"),
+        pytest.param("db_", ["db1", "db2"], id="like single char"),
+        pytest.param("db1, other", ["db1", "other"], id="list"),
+        pytest.param("db", [], id="exact"),
+    ],
+)
+def test_snapshot_filter(pattern: Any, expected: List[str]) -> None:
+    snapshot = ReplicasSnapshot(
+        replicas=[_row(database, "t") for database in ("db1", "db2", "other")]
+    )
+
+    assert [row["database"] for row in snapshot.filter(pattern)] == expected
+
+
+def test_replication_lag() -> None:
+    ctx = _context(
+        [
+            _row("db1", "ok"),
+            _row("db1", "single", absolute_delay="1000", total_replicas=1),
+            _row(
+                "db1",
+                "lagging",
+                absolute_delay="400",
+                tasks="3",
+                errors="1",
+                exceptions=["     DB::Exception: Some error"],
+            ),
+            _row(
+                "db2",
+                "user_fault",
+                absolute_delay="700",
+                errors="1",
+                exceptions=[
+                    "     DB::Exception: Cannot reserve 1.00 MiB, not enough space"
+                ],
+            ),
+        ]
+    )
+
+    result = estimate_replication_lag(
+        ctx, xcrit=3600, crit=600, warn=300, mwarn=50.0, mcrit=90.0
+    )
+
+    assert result.code == 1
+    assert result.message == (
+        "Max 700 seconds, with errors 400 seconds, max task execution 0 seconds,"
+        " max merges in queue 0"
+    )
+    assert len(ctx.obj["chcli"].queries) == 1
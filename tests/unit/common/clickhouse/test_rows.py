@@ -0,0 +1,34 @@
+from ch_tools.common.clickhouse.client.rows import make_rows
+
+RESULT = {
+    "meta": [
+        {"name": "database", "type": "String"},
+        {"name": "name", "type": "String"},
+        {"name": "rows", "type": "UInt64"},
+    ],
+    "data": [
+        ["db1", "all_1_1_0", "10"],
+        ["db1", "all_2_2_0", "5"],
+    ],
+    "rows": 2,
+}
+
+
+def test_make_rows() -> None:
+    rows = make_rows(RESULT)
+
+    assert len(rows) == 2
+    assert rows[0]["name"] == "all_1_1_0"
+    assert rows[1].get("rows") == "5"
+    assert rows[1].get("missing") is None
+    assert list(rows[0].keys()) == ["database", "name", "rows"]
+    assert rows[0] == {"database": "db1", "name": "all_1_1_0", "rows": "10"}
+    assert {**rows[1]} == {"database": "db1", "name": "all_2_2_0", "rows": "5"}
+
+
+def test_rows_share_column_index() -> None:
+    rows = make_rows(RESULT)
+
+    # pylint: disable=protected-access
+    assert rows[0]._index is rows[1]._index
+    assert not hasattr(rows[0], "__dict__")
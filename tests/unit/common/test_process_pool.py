@@ -0,0 +1,226 @@
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.common.process_pool import (
+    RetryPolicy,
+    TaskCheckpoint,
+    WorkerTask,
+    execute_pipeline,
+    execute_tasks_with_retries,
+    execute_tasks_with_timeouts,
+)
+
+
+@pytest.mark.parametrize("workers", [1, 3])
+def test_pipeline_consumes_all_items(workers: int) -> None:
+    consumed: List[int] = []
+    lock = threading.Lock()
+
+    def _consume(item: int) -> None:
+        with lock:
+            consumed.append(item)
+
+    stats = execute_pipeline(range(100), _consume, workers=workers, queue_size=2)
+
+    assert sorted(consumed) == list(range(100))
+    assert stats.items == 100
+
+
+def test_pipeline_backpressure() -> None:
+    produced: List[int] = []
+
+    def _produce():  # type: ignore[no-untyped-def]
+        for i in range(10):
+            produced.append(i)
+            yield i
+
+    def _consume(item: int) -> None:
+        # The producer can be ahead of the consumer by the queue size and the item being consumed.
+        assert len(produced) <= item + 3
+        time.sleep(0.01)
+
+    stats = execute_pipeline(_produce(), _consume, workers=1, queue_size=1)
+
+    assert stats.items == 10
+    assert stats.backpressure_time > 0
+
+
+def test_pipeline_raises_consumer_error() -> None:
+    def _consume(item: int) -> None:
+        if item == 5:
+            raise ValueError("failed")
+
+    with pytest.raises(ValueError, match="failed"):
+        execute_pipeline(range(1000), _consume, workers=2)
+
+
+class RetryableError(Exception):
+    pass
+
+
+@patch("ch_tools.common.process_pool.logging")
+def test_tasks_with_retries_release_workers(_mock_logging: MagicMock) -> None:
+    attempts: Dict[str, int] = defaultdict(int)
+    running: Dict[str, int] = defaultdict(int)
+    max_running: Dict[str, int] = defaultdict(int)
+    lock = threading.Lock()
+
+    def _task(name: str, group: str) -> str:
+        with lock:
+            attempts[name] += 1
+            running[group] += 1
+            max_running[group] = max(max_running[group], running[group])
+        time.sleep(0.01)
+        with lock:
+            running[group] -= 1
+        if name == "slow" and attempts[name] < 3:
+            raise RetryableError()
+        return name
+
+    tasks = [WorkerTask("slow", _task, {"name": "slow", "group": "g0"})] + [
+        WorkerTask(f"t{i}", _task, {"name": f"t{i}", "group": f"g{i % 3}"})
+        for i in range(12)
+    ]
+    policy = RetryPolicy(
+        should_retry=lambda e: isinstance(e, RetryableError),
+        min_wait=0.05,
+        max_wait=0.05,
+        max_attempts=3,
+    )
+
+    result = execute_tasks_with_retries(
+        tasks,
+        policy,
+        max_workers=2,
+        get_group=lambda task: task.kwargs["group"],
+        max_workers_per_group=1,
+    )
+
+    assert sorted(result) == sorted(task.identifier for task in tasks)
+    assert attempts["slow"] == 3
+    assert all(count == 1 for count in max_running.values())
+
+
+@patch("ch_tools.common.process_pool.logging")
+def test_tasks_waiting_for_retry_do_not_block_workers(
+    _mock_logging: MagicMock,
+) -> None:
+    started: List[str] = []
+
+    def _task(name: str) -> None:
+        started.append(name)
+        if name == "slow" and started.count(name) == 1:
+            raise RetryableError()
+
+    tasks = [
+        WorkerTask("slow", _task, {"name": "slow"}),
+        WorkerTask("fast", _task, {"name": "fast"}),
+    ]
+    policy = RetryPolicy(should_retry=lambda _: True, min_wait=0.05, max_wait=0.05)
+
+    execute_tasks_with_retries(tasks, policy, max_workers=1)
+
+    assert started == ["slow", "fast", "slow"]
+
+
+@patch("ch_tools.common.process_pool.logging")
+def test_tasks_with_retries_raise_error(_mock_logging: MagicMock) -> None:
+    def _task() -> None:
+        raise RetryableError()
+
+    policy = RetryPolicy(should_retry=lambda _: True, min_wait=0, max_attempts=2)
+
+    with pytest.raises(RetryableError):
+        execute_tasks_with_retries([WorkerTask("t", _task, {})], policy)
+
+    policy = RetryPolicy(should_retry=lambda _: False)
+    result = execute_tasks_with_retries(
+        [WorkerTask("t", _task, {})], policy, keep_going=True
+    )
+    assert not result
+
+
+@patch("ch_tools.common.process_pool.logging")
+def test_tasks_resume_from_checkpoint(_mock_logging: MagicMock, tmp_path: Any) -> None:
+    executed: List[str] = []
+
+    def _task(name: str) -> None:
+        executed.append(name)
+        if name == "t3":
+            raise ValueError("interrupted")
+
+    tasks = [WorkerTask(f"t{i}", _task, {"name": f"t{i}"}) for i in range(5)]
+    policy = RetryPolicy(should_retry=lambda _: False)
+    path = str(tmp_path / "checkpoint")
+
+    checkpoint = TaskCheckpoint(path, {"hosts": ["host1"]})
+    with pytest.raises(ValueError):
+        execute_tasks_with_retries(tasks, policy, max_workers=1, checkpoint=checkpoint)
+    checkpoint.close()
+
+    executed.clear()
+    checkpoint = TaskCheckpoint(path, {"hosts": ["host1"]})
+    assert checkpoint.completed == {"t0", "t1", "t2"}
+    tasks[3].kwargs["name"] = "t3_fixed"
+    execute_tasks_with_retries(tasks, policy, max_workers=1, checkpoint=checkpoint)
+    checkpoint.close()
+    assert executed == ["t3_fixed", "t4"]
+
+    # Checkpoint of another execution is discarded.
+    checkpoint = TaskCheckpoint(path, {"hosts": ["host2"]})
+    assert not checkpoint.completed
+    checkpoint.close(remove=True)
+
+
+def test_tasks_with_timeouts() -> None:
+    hang = threading.Event()
+
+    def _task(value: int, hung: bool = False) -> int:
+        if hung:
+            hang.wait()
+        if value < 0:
+            raise ValueError(value)
+        return value
+
+    tasks = [
+        WorkerTask("hung", _task, {"value": 0, "hung": True}),
+        WorkerTask("failed", _task, {"value": -1}),
+    ] + [WorkerTask(f"task{i}", _task, {"value": i}) for i in range(4)]
+
+    start = time.monotonic()
+    results = execute_tasks_with_timeouts(tasks, timeout=0.2, max_workers=2)
+    hang.set()
+
+    # The hung task doesn't hold its worker until timeout.
+    assert time.monotonic() - start < 1
+    assert [result.identifier for result in results] == [
+        task.identifier for task in tasks
+    ]
+    with pytest.raises(TimeoutError, match="Timed out after 0.2s"):
+        results[0].future.result()
+    assert results[0].duration >= 0.2
+    with pytest.raises(ValueError):
+        results[1].future.result()
+    assert [result.future.result() for result in results[2:]] == [0, 1, 2, 3]
+
+
+def test_tasks_with_total_timeout() -> None:
+    hang = threading.Event()
+    tasks = [WorkerTask(f"task{i}", hang.wait, {}) for i in range(3)]
+
+    results = execute_tasks_with_timeouts(
+        tasks, timeout=10, total_timeout=0.1, max_workers=2
+    )
+    hang.set()
+
+    for result in results[:2]:
+        with pytest.raises(TimeoutError, match="Total timeout of 0.1s exceeded"):
+            result.future.result()
+    with pytest.raises(TimeoutError, match="Not started"):
+        results[2].future.result()
+    assert results[2].duration == 0
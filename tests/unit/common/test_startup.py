@@ -0,0 +1,71 @@
+"""
+Startup tests of command-line tools based on `python -X importtime`.
+"""
+
+import subprocess
+import sys
+from typing import Dict, Iterable, Set
+
+import pytest
+
+# Heavy dependencies that must be imported only by commands using them.
+HEAVY_MODULES = ["boto3", "botocore", "kazoo", "dns", "pygments", "deepdiff", "jinja2"]
+
+
+def _import_times(code: str) -> Dict[str, float]:
+    """
+    Return cumulative import time in seconds by module imported by the code.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        times[name.strip()] = int(cumulative) / 1_000_000
+    return times
+
+
+def _top_level_modules(modules: Iterable[str]) -> Set[str]:
+    return {name.split(".")[0] for name in modules}
+
+
+@pytest.mark.parametrize(
+    "module",
+    ["ch_tools.chadmin.chadmin_cli", "ch_tools.monrun_checks.main"],
+)
+def test_entry_point_imports(module: str) -> None:
+    times = _import_times(f"import {module}")
+
+    assert module in times
+    assert not set(HEAVY_MODULES) & _top_level_modules(times)
+
+
+def test_check_imports_only_its_dependencies() -> None:
+    # Modules loaded by importlib are not reported by -X importtime, so sys.modules is checked.
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import sys\n"
+            "from click import Context\n"
+            "from ch_tools.monrun_checks.main import cli\n"
+            "cli.get_command(Context(cli), 'ping')\n"
+            "print('\\n'.join(sys.modules))",
+        ],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = result.stdout.splitlines()
+
+    assert "ch_tools.monrun_checks.ch_ping" in modules
+    assert "ch_tools.monrun_checks.ch_backup" not in modules
+    assert not {"boto3", "kazoo", "dns", "pygments", "deepdiff"} & (
+        _top_level_modules(modules)
+    )
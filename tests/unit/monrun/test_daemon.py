@@ -0,0 +1,97 @@
+import threading
+import time
+from copy import deepcopy
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+
+import click
+from click import Command, Context
+
+from ch_tools.common.config import CH_MONITORING_SOCKET_FILE, DEFAULT_CONFIG
+from ch_tools.common.result import WARNING, Status
+from ch_tools.monrun_checks import client
+from ch_tools.monrun_checks.daemon import MonitoringDaemon, _create_server
+
+
+def _command(name: str, runs: List[str], hang: threading.Event) -> Command:
+    @click.command(name)
+    @click.option("--message", "message", default="OK")
+    def _check(message: str) -> Status:
+        runs.append(name)
+        if name == "slow":
+            hang.wait()
+        status = Status()
+        status.append(message)
+        return status
+
+    return _check
+
+
+@patch("ch_tools.monrun_checks.daemon.logging")
+def test_daemon_serves_latest_results(_mock_logging: MagicMock, tmp_path: Any) -> None:
+    runs: List[str] = []
+    hang = threading.Event()
+    config: Any = deepcopy(DEFAULT_CONFIG)
+    config["ch-monitoring"]["fast"] = {"@interval": 0.1, "message": "fast is fine"}
+    config["ch-monitoring"]["disabled"] = {"@disabled": True}
+    ctx = Context(Command("ch-monitoring"), obj={"config": config})
+    ctx.default_map = config["ch-monitoring"]
+    commands = [_command(name, runs, hang) for name in ["fast", "slow", "disabled"]]
+
+    daemon = MonitoringDaemon(ctx, commands, interval=60, check_timeout=0.1)
+    assert sorted(daemon.checks) == ["fast", "slow"]
+
+    thread = threading.Thread(target=daemon.run)
+    thread.start()
+    time.sleep(0.35)
+
+    socket_path = str(tmp_path / "ch-monitoring.sock")
+    server = _create_server(daemon, socket_path)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        assert client.get_daemon_output("fast", socket_path) == "0;fast is fine"
+        assert str(client.get_daemon_output("slow", socket_path)).startswith(
+            f"{WARNING};Timed out after"
+        )
+        assert client.get_daemon_output("disabled", socket_path) is None
+    finally:
+        daemon.stop()
+        hang.set()
+        thread.join()
+        server.shutdown()
+        server.server_close()
+
+    # Periodic runs of the fast check are not blocked by the hung one.
+    assert runs.count("fast") >= 3
+    assert runs.count("slow") == 1
+    assert client.get_daemon_output("fast", socket_path) is None
+
+
+def test_client_socket_file() -> None:
+    assert client.SOCKET_FILE == CH_MONITORING_SOCKET_FILE
+
+
+@patch("ch_tools.monrun_checks.daemon.logging")
+def test_daemon_checks_have_own_context_objects(_mock_logging: MagicMock) -> None:
+    def _counter(name: str) -> Command:
+        @click.command(name)
+        @click.pass_context
+        def _check(ctx: Context) -> Status:
+            ctx.obj["runs"] = ctx.obj.get("runs", 0) + 1
+            return Status()
+
+        return _check
+
+    config: Any = deepcopy(DEFAULT_CONFIG)
+    ctx = Context(Command("ch-monitoring"), obj={"config": config})
+    daemon = MonitoringDaemon(
+        ctx, [_counter("first"), _counter("second")], interval=60, check_timeout=1
+    )
+
+    for name in ["first", "second", "first"]:
+        daemon._run_check(daemon.checks[name])  # pylint: disable=protected-access
+
+    assert daemon.checks["first"].obj["runs"] == 2
+    assert daemon.checks["second"].obj["runs"] == 1
+    assert "runs" not in ctx.obj
+    assert daemon.checks["first"].obj["config"] is config
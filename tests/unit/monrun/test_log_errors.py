@@ -0,0 +1,115 @@
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, List
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from ch_tools.common.result import CRIT, OK, WARNING
+from ch_tools.monrun_checks.ch_log_errors import log_errors_command
+
+
+def _lines(errors: int, age: int = 0, message: str = "Some error") -> List[str]:
+    timestamp = (datetime.now() - timedelta(seconds=age)).strftime("%Y.%m.%d %H:%M:%S")
+    return [
+        f"{timestamp}.123456 [ 1 ] {{}} <Error> executeQuery: {message}\n"
+        for _ in range(errors)
+    ] + [f"{timestamp}.123456 [ 1 ] {{}} <Information> Application: Ready\n"]
+
+
+def _append(path: Path, lines: List[str]) -> None:
+    with open(path, "a", encoding="utf-8") as f:
+        f.writelines(lines)
+
+
+def _run(logfile: Path, state_file: Any, watch_seconds: int = 600) -> Any:
+    args = [
+        "-c",
+        "10",
+        "-w",
+        "3",
+        "-n",
+        str(watch_seconds),
+        "-e",
+        "No message received",
+        "-f",
+        str(logfile),
+    ]
+    if state_file:
+        args += ["-s", str(state_file)]
+    return log_errors_command.main(args, standalone_mode=False)
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_log_errors(tmp_path: Path, incremental: bool) -> None:
+    logfile = tmp_path / "clickhouse-server.err.log"
+    state_file = tmp_path / "state.json" if incremental else None
+    _append(logfile, _lines(5, age=3600) + _lines(2, message="No message received"))
+    _append(logfile, _lines(2))
+
+    result = _run(logfile, state_file)
+    assert (result.code, result.message) == (OK, "OK, 2 errors for last 600 seconds")
+
+    _append(logfile, _lines(3))
+    result = _run(logfile, state_file)
+    assert (result.code, result.message) == (WARNING, "5 errors for last 600 seconds")
+
+    _append(logfile, _lines(5))
+    result = _run(logfile, state_file)
+    assert (result.code, result.message) == (CRIT, "10 errors for last 600 seconds")
+
+
+@patch("ch_tools.monrun_checks.ch_log_errors._scan_backward")
+def test_log_errors_reads_only_new_lines(
+    scan_backward_mock: MagicMock, tmp_path: Path
+) -> None:
+    logfile = tmp_path / "clickhouse-server.err.log"
+    state_file = tmp_path / "state.json"
+    scan_backward_mock.return_value = []
+    _append(logfile, _lines(1))
+
+    _run(logfile, state_file)
+    # Incomplete line is read by the next run.
+    _append(logfile, _lines(2) + ["2000.01.01 00:00:00.000000 [ 1 ] {} <Error> "])
+    result = _run(logfile, state_file)
+    _append(logfile, ["Partial line\n"])
+    _run(logfile, state_file)
+
+    assert scan_backward_mock.call_count == 1
+    assert result.message == "OK, 2 errors for last 600 seconds"
+
+
+@patch("ch_tools.monrun_checks.ch_log_errors.logging")
+def test_log_errors_rotation(_mock_logging: MagicMock, tmp_path: Path) -> None:
+    logfile = tmp_path / "clickhouse-server.err.log"
+    state_file = tmp_path / "state.json"
+    _append(logfile, _lines(1))
+    _run(logfile, state_file)
+
+    _append(logfile, _lines(2))
+    os.rename(logfile, f"{logfile}.0")
+    _append(logfile, _lines(3))
+    result = _run(logfile, state_file)
+    assert result.message == "6 errors for last 600 seconds"
+
+    # Truncated log is read from the beginning.
+    logfile.write_text("".join(_lines(1)), encoding="utf-8")
+    result = _run(logfile, state_file)
+    assert result.message == "7 errors for last 600 seconds"
+
+
+@patch("ch_tools.monrun_checks.ch_log_errors.logging")
+def test_log_errors_state_reset(_mock_logging: MagicMock, tmp_path: Path) -> None:
+    logfile = tmp_path / "clickhouse-server.err.log"
+    state_file = tmp_path / "state.json"
+    _append(logfile, _lines(3, age=300) + _lines(1))
+    _run(logfile, state_file, watch_seconds=60)
+
+    # Counts of the state don't cover the wider window, so the log is read again.
+    result = _run(logfile, state_file, watch_seconds=600)
+    assert result.message == "4 errors for last 600 seconds"
+
+    state_file.write_text("broken", encoding="utf-8")
+    result = _run(logfile, state_file, watch_seconds=60)
+    assert result.message == "OK, 1 errors for last 60 seconds"
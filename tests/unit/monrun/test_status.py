@@ -0,0 +1,55 @@
+import threading
+import time
+from copy import deepcopy
+from typing import Any
+from unittest.mock import MagicMock, patch
+
+import click
+from click import Command, Context
+
+from ch_tools.common.commands.status import run_checks
+from ch_tools.common.config import DEFAULT_CONFIG
+from ch_tools.common.result import CRIT, OK, WARNING, Status
+
+
+@patch("ch_tools.common.commands.status.logging")
+def test_run_checks(_mock_logging: MagicMock) -> None:
+    hang = threading.Event()
+
+    def _command(name: str, code: int = OK, hung: bool = False) -> Command:
+        @click.command(name)
+        @click.pass_context
+        def _check(ctx: Any) -> Status:
+            ctx.obj["touched_by"] = name
+            if hung:
+                hang.wait()
+            status = Status()
+            status.set_code(code)
+            return status
+
+        return _check
+
+    config: Any = deepcopy(DEFAULT_CONFIG)
+    config["monitoring"]["status"]["check_timeout"] = 0.2
+    ctx = Context(Command("status"), obj={"config": config})
+    commands = [
+        _command("slow", hung=True),
+        _command("crit", CRIT),
+        _command("disabled"),
+        _command("ok"),
+    ]
+
+    start = time.monotonic()
+    results = run_checks(ctx, commands, {"disabled": {"@disabled": True}})
+    hang.set()
+
+    assert time.monotonic() - start < 1
+    assert [(r.name, r.status.code) for r in results] == [
+        ("slow", WARNING),
+        ("crit", CRIT),
+        ("ok", OK),
+    ]
+    assert results[0].status.message == "Timed out after 0.2s"
+    assert results[0].duration >= 0.2
+    # Checks don't share the context object.
+    assert "touched_by" not in ctx.obj